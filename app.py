@@ -1,12 +1,18 @@
 import streamlit as st
-import OpenDartReader
 import pandas as pd
-import io
-import zipfile
 import re
 import requests
 import json
-from bs4 import BeautifulSoup
+from core.catalog import get_filing_catalog
+from core.chunks import DEFAULT_TOKEN_BUDGET
+from core.classify import select_reports
+from core.corp_index import get_corp_index
+from core.dart_api import make_session
+from core.job_view import remember_job, show_jobs
+from core.jobs import get_job_manager, make_spec
+from core.metrics import stage, track_cache
+from core.metrics_view import debug_toggle, show_metrics
+from core.rate_limit import get_dart_limiter
 
 # --- 페이지 설정 ---
 st.set_page_config(
@@ -28,144 +34,72 @@ if 'api_key' not in st.session_state:
 
 api_key = st.session_state.api_key
 
+# --- 공용 HTTP 세션 (커넥션 풀 재사용) ---
+@st.cache_resource
+def get_http_session():
+    return make_session(pool_size=16)
+
 # --- 2. DART 직접 접속 함수 (6자리 종목코드 지원 업그레이드) ---
-@st.cache_data(ttl=600)
+@track_cache("fetch_report_list_direct", st.cache_data(ttl=600))
 def fetch_report_list_direct(corp_query, start_date, end_date):
     try:
-        dart = OpenDartReader(api_key)
-        
-        # 입력값이 6자리 숫자인지 판단
-        if corp_query.isdigit() and len(corp_query) == 6:
-            corp_list = dart.corp_codes
-            target_row = corp_list[corp_list['stock_code'] == corp_query]
-            if target_row.empty:
-                return None, corp_query
-            corp_code = target_row.iloc[0]['corp_code']
-            actual_corp_name = target_row.iloc[0]['corp_name']
-        else:
-            corp_code = dart.find_corp_code(corp_query)
-            actual_corp_name = corp_query
-            
-        if not corp_code:
+        # 6자리 종목코드 / 회사명 모두 로컬 색인에서 바로 조회
+        with stage("corp_lookup", key=corp_query):
+            corp = get_corp_index(api_key).resolve(corp_query)
+        if corp is None:
             return None, corp_query
+        corp_code = corp['corp_code']
+        actual_corp_name = corp['corp_name']
     except:
         return None, corp_query
 
-    url = "https://opendart.fss.or.kr/api/list.json"
-    params = {
-        'crtfc_key': api_key,
-        'corp_code': corp_code,
-        'bgn_de': start_date,
-        'end_de': end_date,
-        'pblntf_ty': 'A',
-        'page_count': 100
-    }
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Referer': 'https://dart.fss.or.kr/',
-        'Accept': 'application/json, text/javascript, */*; q=0.01',
-        'Connection': 'keep-alive'
-    }
-
     try:
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
-        data = resp.json()
-        
-        if data.get('status') == '000':
-            df = pd.DataFrame(data['list'])
-            return df, actual_corp_name
-        else:
-            return pd.DataFrame(), actual_corp_name 
+        # 로컬 카탈로그에 없는 구간(마지막 공시일 이후 등)만 DART에 요청
+        df = get_filing_catalog().report_list(get_http_session(), api_key, corp_code, start_date, end_date)
+        return df, actual_corp_name
     except Exception as e:
         raise Exception(f"접속 실패: {str(e)}")
 
 # --- 3. 분류 및 필터링 로직 ---
 def classify_and_filter(df, selected_types):
-    if df is None or len(df) == 0:
-        return df
-
-    df = df.copy()
-    df = df.sort_values(by='rcept_dt', ascending=False).reset_index(drop=True)
-
-    smart_types = []
-    for idx, row in df.iterrows():
-        nm = row['report_nm']
-        dt = row['rcept_dt']
-        month = int(dt[4:6]) 
-        
-        r_type = "기타"
-        if "사업보고서" in nm: r_type = "사업보고서"
-        elif "반기보고서" in nm: r_type = "반기보고서"
-        elif "분기보고서" in nm:
-            if "1분기" in nm: r_type = "1분기보고서"
-            elif "3분기" in nm: r_type = "3분기보고서"
-            elif 4 <= month <= 6: r_type = "1분기보고서"
-            elif 9 <= month <= 12: r_type = "3분기보고서"
-            else: r_type = "분기보고서(기타)"
-        smart_types.append(r_type)
-
-    df['smart_type'] = smart_types
-    
-    filtered_df = df[df['smart_type'].isin(selected_types)].copy()
-    
-    if not filtered_df.empty:
-        filtered_df['year_key'] = filtered_df['rcept_dt'].str[:4]
-        final_df = filtered_df.drop_duplicates(subset=['smart_type', 'year_key'], keep='first')
-        return final_df.drop(columns=['year_key'])
+    return select_reports(df, selected_types, latest_per_year=True)
+
+# --- 4. 관심종목 (증분 동기화) ---
+with st.sidebar:
+    st.subheader("⭐ 관심종목")
+    catalog = get_filing_catalog()
+    watch_query = st.text_input("회사명 또는 종목코드", key="watch_query")
+    col_add, col_del = st.columns(2)
+    if col_add.button("추가", use_container_width=True) and watch_query:
+        corp = get_corp_index(api_key).resolve(watch_query.strip())
+        if corp is None:
+            st.warning("회사를 찾을 수 없습니다.")
+        else:
+            catalog.watch(corp['corp_code'], corp['corp_name'])
+    if col_del.button("삭제", use_container_width=True) and watch_query:
+        corp = get_corp_index(api_key).resolve(watch_query.strip())
+        if corp is not None:
+            catalog.unwatch(corp['corp_code'])
+
+    watch_items = catalog.watchlist()
+    if watch_items:
+        st.dataframe(pd.DataFrame(watch_items)[['corp_name', 'last_rcept_dt']], hide_index=True, use_container_width=True)
+        if st.button("🔄 새 공시 동기화", use_container_width=True):
+            with st.spinner("마지막 공시일 이후만 가져오는 중..."):
+                results = catalog.sync_watchlist(get_http_session(), api_key)
+            added = sum(n for n, err in results.values() if err is None)
+            failed = [code for code, (n, err) in results.items() if err is not None]
+            st.success(f"새 공시 {added}건")
+            if failed:
+                st.warning(f"실패: {', '.join(failed)}")
     else:
-        return filtered_df
-
-# --- 4. 텍스트 변환 함수 (토큰 절약 로직 이식 완료) ---
-def extract_ai_friendly_text(html_content):
-    soup = BeautifulSoup(html_content, "html.parser")
-    for s in soup(["script", "style", "head", "svg", "img"]):
-        s.decompose()
-        
-    for nav in soup.find_all(text=re.compile(r"본문\s*위치로\s*이동|목차|TOP")):
-        nav.extract()
-
-    for table in soup.find_all("table"):
-        rows = []
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        if headers:
-            rows.append("| " + " | ".join(headers) + " |")
-            rows.append("| " + " | ".join(["---"] * len(headers)) + " |")
-        for tr in table.find_all("tr"):
-            cells = [td.get_text(strip=True) for td in tr.find_all("td")]
-            if cells:
-                rows.append("| " + " | ".join(cells) + " |")
-        if rows:
-            table_md = "\n" + "\n".join(rows) + "\n"
-            table.replace_with(table_md)
-            
-    raw_text = soup.get_text(separator="\n")
-    lines = raw_text.split('\n')
-    
-    # [블랙리스트 필터링 - AI 분석용 토큰 절약]
-    blacklist = ["V. 회계감사인", "VI. 이사회", "X. 대주주", "XII. 상세표"]
-    all_markers = [
-        "I. 회사의 개요", "II. 사업의 내용", "III. 재무에 관한 사항",
-        "IV. 이사의 진단", "V. 회계감사인", "VI. 이사회", "VII. 주주에 관한 사항",
-        "VIII. 임원 및 직원", "IX. 계열회사", "X. 대주주", "XI. 그 밖에 투자자 보호",
-        "XII. 상세표", "【", "첨부서류"
-    ]
+        st.caption("추가한 회사는 마지막 공시일 이후 공시만 받아 로컬 목록을 최신으로 유지합니다.")
 
-    extracted_lines = []
-    skip_mode = False
-    for line in lines:
-        clean_line = line.strip()
-        if any(clean_line.startswith(m) for m in all_markers):
-            skip_mode = any(clean_line.startswith(b) for b in blacklist)
-                
-        if not skip_mode: 
-            extracted_lines.append(line)
-            
-    filtered_text = "\n".join(extracted_lines)
-    filtered_text = re.sub(r' +', ' ', filtered_text)
-    filtered_text = re.sub(r'\n\s*\n+', '\n\n', filtered_text)
-    filtered_text = re.sub(r'[-=+#]{5,}', '', filtered_text)
-    return filtered_text.strip()
+    # OpenDART 요청 사용량 (키별 일일 한도, 한도 초과 시 동시 요청 수 자동 감소)
+    limiter = get_dart_limiter().snapshot(api_key)
+    st.caption(f"📶 오늘 OpenDART 요청 {limiter['used_today']:,} / {limiter['daily_quota']:,}건 · "
+               f"동시 요청 {limiter['concurrency']}/{limiter['max_concurrency']} · 재시도 {limiter['retries']}회")
+    debug_toggle()
 
 # --- 5. UI 구성 ---
 with st.container(border=True):
@@ -184,6 +118,17 @@ with st.container(border=True):
         with col3:
             report_options = ["1분기보고서", "반기보고서", "3분기보고서", "사업보고서"]
             selected_types = st.multiselect("종류", report_options, default=["사업보고서"])
+        max_workers = st.slider("동시 다운로드 수", 1, 16, 4, help="1이면 한 건씩 순차 처리합니다.")
+        save_tables = st.checkbox("📊 표를 Parquet 파일로 함께 저장", help="보고서마다 표를 숫자/문자 타입이 지정된 열 단위 파일로 ZIP에 함께 넣습니다 (pyarrow 필요).")
+        col_chunk, col_budget = st.columns([2, 1])
+        with col_chunk:
+            save_chunks = st.checkbox("🧩 AI 적재용 청크(JSONL) 함께 만들기", help="장/표 경계에서 토큰 예산 안으로 자른 레코드(회사, rcept_no, 분류, 장 제목, 위치, 토큰 수)를 JSONL로 만듭니다.")
+        with col_budget:
+            token_budget = st.number_input("청크당 최대 토큰", 200, 8000, DEFAULT_TOKEN_BUDGET, step=100, disabled=not save_chunks)
+        dedupe_options = {"끄기": None, "번들 전체에서 처음 나온 문단만 남기기": "bundle", "같은 종류 직전 보고서 대비 변경분만": "delta"}
+        dedupe_label = st.selectbox("♻️ 보고서 간 중복 문단 처리", list(dedupe_options),
+                                    help="여러 해 보고서에 그대로 반복되는 문단(회사 개요, 회계정책 등)을 앞 보고서 참조 한 줄로 바꿔 파일 크기와 토큰을 줄입니다. 최신 보고서가 원문을 가집니다.")
+        dedupe_mode = dedupe_options[dedupe_label]
 
 # --- 6. 실행 로직 ---
 if btn_start:
@@ -210,37 +155,6 @@ if btn_start:
                     st.success(f"✅ 총 {len(df)}건 검색! 즉시 다운로드를 시작합니다. (기업명: {actual_corp_name})")
                     st.dataframe(df[['rcept_dt', 'report_nm', 'smart_type']], use_container_width=True, hide_index=True)
                     
-                    with st.status("🚀 텍스트 변환 및 ZIP 생성 중...", expanded=True) as status:
-                        zip_buffer = io.BytesIO()
-                        headers_download = {'User-Agent': 'Mozilla/5.0'}
-                        total = len(df)
-
-                        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-                            for i, (idx, row) in enumerate(df.iterrows()):
-                                
-                                rpt_name = row['report_nm']
-                                fname = re.sub(r'[\\/*?:"<>|]', "", f"{actual_corp_name}_{rpt_name}.txt")
-                                
-                                status.write(f"📥 ({i+1}/{total}) 저장: {fname}")
-                                
-                                try:
-                                    d_url = f"https://opendart.fss.or.kr/api/document.xml?crtfc_key={api_key}&rcept_no={row['rcept_no']}"
-                                    res = requests.get(d_url, headers=headers_download, timeout=15)
-                                    with zipfile.ZipFile(io.BytesIO(res.content)) as z:
-                                        t_file = max(z.infolist(), key=lambda f: f.file_size).filename
-                                        content = z.read(t_file).decode('utf-8', 'ignore')
-                                        final_txt = extract_ai_friendly_text(content)
-                                        
-                                        header_info = f"### {actual_corp_name} {rpt_name} ###\n"
-                                        header_info += f"접수일: {row['rcept_dt']}\n"
-                                        header_info += f"분류: {row['smart_type']}\n\n"
-                                        
-                                        zip_file.writestr(fname, header_info + final_txt)
-                                except Exception as e:
-                                    status.write(f"⚠️ 실패: {fname}")
-                        
-                        status.update(label="🎉 생성 완료! 아래 버튼을 누르세요.", state="complete", expanded=False)
-                    
                     if start_year == end_year:
                         year_str = f"{start_year}"
                     else:
@@ -255,14 +169,24 @@ if btn_start:
 
                     final_zip_name = f"{actual_corp_name}_{year_str}_{type_str}_모음.zip"
 
-                    st.download_button(
-                        label=f"💾 {final_zip_name} 저장",
-                        data=zip_buffer.getvalue(),
-                        file_name=final_zip_name,
-                        mime="application/zip",
-                        type="primary",
-                        use_container_width=True
-                    )
+                    # ZIP은 백그라운드 작업으로 만든다 (다른 위젯을 눌러도, 새로고침해도 작업은 계속됨)
+                    items = []
+                    for _, row in df.iterrows():
+                        rpt_name = row['report_nm']
+                        fname = re.sub(r'[\\/*?:"<>|]', "", f"{actual_corp_name}_{rpt_name}.txt")
+
+                        header_info = f"### {actual_corp_name} {rpt_name} ###\n"
+                        header_info += f"접수일: {row['rcept_dt']}\n"
+                        header_info += f"분류: {row['smart_type']}\n\n"
+                        items.append({"rcept_no": row['rcept_no'], "file_name": fname, "header": header_info, "meta": {
+                            "corp_name": actual_corp_name, "corp_code": row.get('corp_code'),
+                            "rcept_dt": row['rcept_dt'], "report_nm": rpt_name, "smart_type": row['smart_type'],
+                        }})
+
+                    spec = make_spec(items, title=f"{actual_corp_name} {year_str} {type_str}", zip_name=final_zip_name,
+                                     extractor="ai", save_tables=save_tables, save_chunks=save_chunks,
+                                     token_budget=token_budget, dedupe=dedupe_mode)
+                    remember_job(get_job_manager().submit(spec, api_key, fetch_workers=max_workers))
                     
                 else:
                     st.warning("조건에 맞는 보고서가 없습니다.")
@@ -270,3 +194,7 @@ if btn_start:
                 st.error("❌ 검색된 공시가 없습니다.")
         except Exception as e:
             st.error(f"오류 발생: {e}")
+
+# --- 7. 번들 작업 진행 상황 / 완성된 ZIP ---
+show_jobs(api_key)
+show_metrics()
@@ -0,0 +1,250 @@
+import argparse
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import make_document
+
+# --- OpenDART 대역(stand-in) 서버 ---
+# list.json / document.xml / corpCode.xml 을 OpenDART와 같은 모양으로 돌려준다.
+#   - 응답 지연(latency + jitter), 오류율(HTTP 500 또는 status 900), 초당 요청 한도(status 020)를 설정
+#   - 원문은 합성 문서를 쓰거나, --from-cache 이면 로컬 DocumentCache에 저장된 실제 ZIP을 먼저 쓴다
+#   - GET /_stats 로 엔드포인트별 요청/오류/한도초과 횟수 확인
+# 사용법:
+#   python -m benchmarks.dart_server --port 8765 --latency-ms 80 --error-rate 0.02 --rate-limit 100
+#   DART_BASE_URL=http://127.0.0.1:8765/api streamlit run app.py
+
+LIST_STATUS_LIMIT = {"status": "020", "message": "요청 제한을 초과하였습니다."}
+LIST_STATUS_ERROR = {"status": "900", "message": "정의되지 않은 오류가 발생하였습니다."}
+LIST_STATUS_EMPTY = {"status": "013", "message": "조회된 데이타가 없습니다."}
+PERIODIC = [  # (접수 월, 보고서명, 보고 기간 월)
+    (3, "사업보고서", 12), (5, "분기보고서", 3), (8, "반기보고서", 6), (11, "분기보고서", 9),
+]
+DOC_VARIANTS = 4
+
+
+def _xml_status(status, message):
+    return (f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><result><status>{status}</status>"
+            f"<message>{message}</message></result>").encode("utf-8")
+
+
+def _zip_bytes(name, data):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(name, data)
+    return buf.getvalue()
+
+
+def _seed(text):
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+
+
+# 초당 rate개, 최대 burst개까지 모아 두는 토큰 버킷 (서버 전체 한도)
+class _TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class FakeDart:
+    def __init__(self, latency_ms=50, jitter_ms=20, error_rate=0.0, rate_limit=0, burst=None,
+                 doc_mb=0.5, n_corps=1000, from_cache=False, seed=0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.bucket = _TokenBucket(rate_limit, burst) if rate_limit else None
+        self.doc_mb = doc_mb
+        self.n_corps = n_corps
+        self.cache = None
+        if from_cache:
+            from core.doc_cache import get_document_cache
+            self.cache = get_document_cache()
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+        self._docs = None
+        self._docs_lock = threading.Lock()
+
+    # --- 합성 데이터 ---
+    def corp_records(self):
+        for i in range(self.n_corps):
+            listed = i % 3 != 2
+            yield f"{i + 1:08d}", f"테스트기업{i + 1}", f"{i + 1:06d}" if listed else ""
+
+    def filings(self, corp_code, bgn_de, end_de):
+        rows = []
+        name = f"테스트기업{int(corp_code)}" if corp_code.isdigit() else corp_code
+        for year in range(int(bgn_de[:4]), int(end_de[:4]) + 1):
+            for seq, (month, report_nm, period) in enumerate(PERIODIC):
+                period_year = year - 1 if period == 12 else year
+                rcept_dt = f"{year}{month:02d}{14 + seq:02d}"
+                if not bgn_de <= rcept_dt <= end_de:
+                    continue
+                rows.append({
+                    "corp_code": corp_code, "corp_name": name, "stock_code": corp_code[-6:],
+                    "corp_cls": "Y", "report_nm": f"{report_nm} ({period_year}.{period:02d})",
+                    "rcept_no": f"{rcept_dt}{int(corp_code) % 1000000:06d}",
+                    "flr_nm": name, "rcept_dt": rcept_dt, "rm": "",
+                })
+        rows.sort(key=lambda r: r["rcept_no"], reverse=True)
+        return rows
+
+    def document_zip(self, rcept_no):
+        if self.cache is not None:
+            raw = self.cache.get_raw(rcept_no)
+            if raw is not None:
+                return raw
+        with self._docs_lock:
+            if self._docs is None:
+                self._docs = [
+                    _zip_bytes(f"{i}.xml", make_document(int(self.doc_mb * 1e6), seed=i).encode("utf-8"))
+                    for i in range(DOC_VARIANTS)
+                ]
+        return self._docs[_seed(rcept_no) % DOC_VARIANTS]
+
+    def corp_code_zip(self):
+        items = "".join(
+            f"<list><corp_code>{c}</corp_code><corp_name>{n}</corp_name>"
+            f"<stock_code>{s or ' '}</stock_code><modify_date>20250101</modify_date></list>"
+            for c, n, s in self.corp_records()
+        )
+        return _zip_bytes("CORPCODE.xml", f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><result>{items}</result>".encode("utf-8"))
+
+    # --- 요청 처리 ---
+    def count(self, endpoint, outcome):
+        with self.stats_lock:
+            per = self.stats.setdefault(endpoint, {})
+            per[outcome] = per.get(outcome, 0) + 1
+
+    def delay_and_fault(self):
+        with self.rng_lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            roll = self.rng.random()
+        time.sleep(delay)
+        if self.bucket is not None and not self.bucket.take():
+            return "limited"
+        if roll < self.error_rate / 2:
+            return "http_error"
+        if roll < self.error_rate:
+            return "api_error"
+        return None
+
+    def handle(self, path, query):
+        """(HTTP 상태, content-type, 본문) 반환."""
+        endpoint = path.rsplit("/", 1)[-1]
+        if endpoint == "_stats":
+            with self.stats_lock:
+                return 200, "application/json", json.dumps(self.stats).encode()
+        if endpoint not in ("list.json", "document.xml", "corpCode.xml"):
+            return 404, "text/plain", b"not found"
+
+        fault = self.delay_and_fault()
+        self.count(endpoint, fault or "ok")
+        is_json = endpoint == "list.json"
+        if fault == "http_error":
+            return 500, "text/plain", b"internal error"
+        if fault in ("limited", "api_error"):
+            body = LIST_STATUS_LIMIT if fault == "limited" else LIST_STATUS_ERROR
+            if is_json:
+                return 200, "application/json", json.dumps(body, ensure_ascii=False).encode("utf-8")
+            return 200, "application/xml", _xml_status(body["status"], body["message"])
+
+        if endpoint == "list.json":
+            rows = self.filings(query.get("corp_code", "00000001"),
+                                query.get("bgn_de", "20200101"), query.get("end_de", "20251231"))
+            if not rows:
+                return 200, "application/json", json.dumps(LIST_STATUS_EMPTY, ensure_ascii=False).encode("utf-8")
+            page_no = int(query.get("page_no", 1))
+            page_count = int(query.get("page_count", 10))
+            total_page = (len(rows) + page_count - 1) // page_count
+            body = {
+                "status": "000", "message": "정상", "page_no": page_no, "page_count": page_count,
+                "total_count": len(rows), "total_page": total_page,
+                "list": rows[(page_no - 1) * page_count: page_no * page_count],
+            }
+            return 200, "application/json", json.dumps(body, ensure_ascii=False).encode("utf-8")
+        if endpoint == "document.xml":
+            return 200, "application/x-msdownload", self.document_zip(query.get("rcept_no", ""))
+        return 200, "application/x-msdownload", self.corp_code_zip()
+
+
+def _make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            status, ctype, body = fake.handle(url.path, query)
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def make_server(host="127.0.0.1", port=0, **options):
+    fake = FakeDart(**options)
+    server = ThreadingHTTPServer((host, port), _make_handler(fake))
+    server.daemon_threads = True
+    server.fake = fake
+    return server
+
+
+# 다른 프로세스에서 띄울 때 (부하 하네스가 자기 GIL과 섞이지 않게)
+def serve(conn=None, host="127.0.0.1", port=0, **options):
+    server = make_server(host, port, **options)
+    server.fake.document_zip("warmup")
+    if conn is not None:
+        conn.send(server.server_address[1])
+        conn.close()
+    server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenDART 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="0~1, 절반은 HTTP 500 / 절반은 status 900")
+    parser.add_argument("--rate-limit", type=float, default=0, help="초당 허용 요청 수 (0이면 무제한)")
+    parser.add_argument("--burst", type=int, default=None)
+    parser.add_argument("--doc-mb", type=float, default=0.5, help="합성 원문 크기")
+    parser.add_argument("--corps", type=int, default=1000, help="corpCode.xml 법인 수")
+    parser.add_argument("--from-cache", action="store_true", help="로컬 원문 캐시의 실제 ZIP을 우선 사용")
+    args = parser.parse_args(argv)
+
+    print(f"OpenDART 대역 서버: http://{args.host}:{args.port}/api  (DART_BASE_URL로 지정)")
+    serve(host=args.host, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+          error_rate=args.error_rate, rate_limit=args.rate_limit, burst=args.burst,
+          doc_mb=args.doc_mb, n_corps=args.corps, from_cache=args.from_cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+# --- 동시 사용자 부하 하네스 (검색 → 보고서 ZIP 생성 전 과정) ---
+# Streamlit은 세션마다 스레드 하나로 스크립트를 돌리므로, 사용자도 한 프로세스 안의 스레드로 흉내 낸다.
+# 대역 서버는 별도 프로세스로 띄워 하네스의 GIL과 섞이지 않게 한다.
+# 사용법:
+#   python -m benchmarks.load --users 8 --rounds 2 --latency-ms 80 --error-rate 0.02
+#   python -m benchmarks.load --base-url http://127.0.0.1:8765/api --users 16   # 이미 떠 있는 서버 사용
+# 결과: 단계별(검색/원문/번들) p50·p99 지연, 초당 보고서 수, 오류 수 → JSON (DATA_DIR/benchmarks/load-*.json)
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def _summary(values):
+    return {
+        "count": len(values),
+        "p50_ms": round(_percentile(values, 0.50) * 1000, 1) if values else None,
+        "p99_ms": round(_percentile(values, 0.99) * 1000, 1) if values else None,
+        "max_ms": round(max(values) * 1000, 1) if values else None,
+    }
+
+
+def _start_server(options):
+    from benchmarks.dart_server import serve
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=serve, args=(child,), kwargs=options, daemon=True)
+    proc.start()
+    port = parent.recv()
+    return proc, f"http://127.0.0.1:{port}/api"
+
+
+class _Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {"search": [], "document": [], "bundle": []}
+        self.errors = {}
+        self.reports = 0
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.timings[stage].append(seconds)
+
+    def error(self, stage, exc):
+        with self.lock:
+            key = f"{stage}:{type(exc).__name__}"
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def done(self, n):
+        with self.lock:
+            self.reports += n
+
+
+def _user(user_id, rounds, corp_pool, years, session, api_key, workers, rec, workdir):
+    from core.bundle import BundleWriter
+    from core.classify import REPORT_TYPES, select_reports
+    from core.dart_api import fetch_report_list
+    from core.pipeline import iter_pipeline
+    from core.reports import ReportLoader
+
+    rng = random.Random(user_id)
+    loader = ReportLoader(session, api_key, extractor="ai", cache=None)
+
+    def fetch(row):
+        t0 = time.perf_counter()
+        try:
+            return loader.fetch(row['rcept_no'])
+        finally:
+            rec.add("document", time.perf_counter() - t0)
+
+    def parse(row, payload):
+        return loader.parse(row['rcept_no'], payload)
+
+    for r in range(rounds):
+        corp_code = rng.choice(corp_pool)
+        end_year = 2025
+        t0 = time.perf_counter()
+        try:
+            df = fetch_report_list(session, api_key, corp_code, f"{end_year - years + 1}0101", f"{end_year}1231")
+            df = select_reports(df, REPORT_TYPES, latest_per_year=True)
+        except Exception as e:
+            rec.error("search", e)
+            continue
+        rec.add("search", time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        rows = [row for _, row in df.iterrows()] if df is not None else []
+        ok = 0
+        with BundleWriter(os.path.join(workdir, f"user{user_id}_{r}.zip")) as bundle:
+            for row, text, err in iter_pipeline(rows, fetch, parse, fetch_workers=workers, parse_workers=2):
+                if err is not None:
+                    rec.error("document", err)
+                    continue
+                bundle.write_text(f"{row['rcept_no']}.txt", text)
+                ok += 1
+        rec.add("bundle", time.perf_counter() - t0)
+        rec.done(ok)
+
+
+def run(users=4, rounds=1, years=3, workers=4, base_url=None, server_options=None, out=None, pool_size=16):
+    server = None
+    if base_url is None:
+        server, base_url = _start_server(server_options or {})
+    from core import config
+    from core.dart_api import make_session
+
+    # 주소는 세션에 직접 준다 (환경변수는 core가 이미 불러와졌으면 소용없다 — 대역 서버 기동이 core를 불러온다)
+    session = make_session(pool_size=pool_size, base_url=base_url)
+    corp_pool = [f"{i:08d}" for i in range(1, 201)]
+    rec = _Recorder()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            t0 = time.perf_counter()
+            threads = [
+                threading.Thread(target=_user, name=f"user-{u}",
+                                 args=(u, rounds, corp_pool, years, session, "LOADTEST", workers, rec, workdir))
+                for u in range(users)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            wall = time.perf_counter() - t0
+        stats = session.get(f"{base_url}/_stats", timeout=5).json()
+    finally:
+        if server is not None:
+            server.terminate()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "base_url": base_url, "users": users, "rounds": rounds, "years": years,
+            "fetch_workers": workers, "server": server_options or {},
+        },
+        "wall_s": round(wall, 3),
+        "reports": rec.reports,
+        "reports_per_s": round(rec.reports / wall, 2) if wall else None,
+        "latency": {stage: _summary(v) for stage, v in rec.timings.items()},
+        "errors": rec.errors,
+        "server_stats": stats,
+    }
+    if out is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = config.data_path("benchmarks", f"load-{stamp}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"사용자 {users}명 × {rounds}회, {wall:.1f}s, 보고서 {rec.reports}건 ({report['reports_per_s']}/s)")
+    for stage, s in report["latency"].items():
+        print(f"  {stage:<9} n={s['count']:<5} p50={s['p50_ms']} ms  p99={s['p99_ms']} ms")
+    if rec.errors:
+        print(f"  오류: {rec.errors}")
+    print(f"→ {out}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동시 사용자 부하 하네스 (OpenDART 대역 서버 사용)")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=1, help="사용자당 검색+번들 반복 횟수")
+    parser.add_argument("--years", type=int, default=3, help="검색 기간(년)")
+    parser.add_argument("--workers", type=int, default=4, help="사용자당 동시 다운로드 수")
+    parser.add_argument("--base-url", help="이미 떠 있는 서버 주소 (없으면 자체 서버를 띄움)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0)
+    parser.add_argument("--doc-mb", type=float, default=0.5)
+    parser.add_argument("--out", help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    run(
+        users=args.users, rounds=args.rounds, years=args.years, workers=args.workers,
+        base_url=args.base_url, out=args.out,
+        server_options={
+            "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+            "rate_limit": args.rate_limit, "doc_mb": args.doc_mb,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import concurrent.futures as cf
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+
+from core import config
+
+# --- 추출/분류/ZIP 번들 벤치마크 ---
+# 사용법:
+#   python -m benchmarks.run                        # 기본 크기(0.1/1/5/20MB), stream 엔진
+#   python -m benchmarks.run --engines stream,lxml,bs4 --sizes 0.1,1
+#   python -m benchmarks.run --compare .dart_data/benchmarks/이전결과.json
+# 각 측정은 새 프로세스(spawn)에서 돌려 최대 RSS가 다른 측정과 섞이지 않게 한다.
+# 결과는 JSON 파일(기본: DATA_DIR/benchmarks/<시각>-<커밋>.json)로 남는다.
+
+DEFAULT_SIZES_MB = [0.1, 1, 5, 20]
+DEFAULT_ENGINES = ["stream"]
+LISTING_ROWS = 100_000
+BUNDLE_REPORTS = 20
+
+
+def _rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+# --- 개별 측정 (자식 프로세스에서 실행) ---
+def _bench_extract(case):
+    from core.extract import extract_ai_sections, extract_full_text
+    with open(case["path"], encoding="utf-8") as f:
+        html = f.read()
+    base = _rss_mb()
+    if case["stage"] == "extract_ai":
+        fn = lambda: extract_ai_sections(html, engine=case["engine"])
+    else:
+        fn = lambda: extract_full_text(html, engine=case["engine"])
+    return base, _timed(fn, case["repeat"])
+
+
+def _bench_classify(case):
+    import pandas as pd
+    from benchmarks.synthetic import make_listing
+    from core.classify import REPORT_TYPES, select_reports
+    df = pd.DataFrame(make_listing(case["rows"]))
+    base = _rss_mb()
+    return base, _timed(lambda: select_reports(df, REPORT_TYPES), case["repeat"])
+
+
+def _bench_bundle(case):
+    from core.bundle import BundleWriter
+    from core.extract import extract_ai_sections
+    with open(case["path"], encoding="utf-8") as f:
+        text = extract_ai_sections(f.read(), engine=case["engine"])[0]
+    base = _rss_mb()
+    case["bytes"] = len(text.encode("utf-8")) * case["reports"]  # 처리량은 압축 전 텍스트 기준
+
+    def build():
+        with tempfile.TemporaryDirectory() as tmp:
+            with BundleWriter(os.path.join(tmp, "bench.zip")) as bundle:
+                for i in range(case["reports"]):
+                    bundle.write_text(f"report_{i}.txt", f"### 보고서 {i} ###\n\n", text)
+    return base, _timed(build, case["repeat"])
+
+
+STAGES = {
+    "extract_ai": _bench_extract,
+    "extract_full": _bench_extract,
+    "classify": _bench_classify,
+    "bundle": _bench_bundle,
+}
+
+
+def _run_case(case):
+    base, times = STAGES[case["stage"]](case)
+    best = min(times)
+    result = {k: v for k, v in case.items() if k != "path"}
+    result.update({
+        "wall_s": round(best, 6),
+        "wall_all_s": [round(t, 6) for t in times],
+        "mb_s": round(case["bytes"] / 1e6 / best, 3) if case["bytes"] and best > 0 else None,
+        "rss_base_mb": round(base, 1),
+        "rss_peak_mb": round(_peak_rss_mb(), 1),
+    })
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=config.BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_cases(sizes_mb, engines, stages, repeat, workdir):
+    from benchmarks.synthetic import make_document
+    cases = []
+    for size in sizes_mb:
+        path = os.path.join(workdir, f"doc_{size}MB.html")
+        html = make_document(int(size * 1e6), seed=int(size * 1000))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        nbytes = os.path.getsize(path)
+        for engine in engines:
+            for stage in ("extract_ai", "extract_full"):
+                if stage in stages:
+                    cases.append({"stage": stage, "engine": engine, "size_mb": size,
+                                  "bytes": nbytes, "repeat": repeat, "path": path})
+            if "bundle" in stages:
+                cases.append({"stage": "bundle", "engine": engine, "size_mb": size,
+                              "bytes": None, "reports": BUNDLE_REPORTS,
+                              "repeat": repeat, "path": path})
+    if "classify" in stages:
+        cases.append({"stage": "classify", "rows": LISTING_ROWS, "bytes": None, "repeat": repeat})
+    return cases
+
+
+def run(sizes_mb=DEFAULT_SIZES_MB, engines=DEFAULT_ENGINES, stages=tuple(STAGES), repeat=3, out=None):
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = build_cases(sizes_mb, engines, stages, repeat, workdir)
+        for case in cases:
+            with cf.ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                r = pool.submit(_run_case, case).result()
+            results.append(r)
+            print(_format(r), flush=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if out is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = config.data_path("benchmarks", f"{stamp}-{report['meta']['commit'] or 'nogit'}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"→ {out}")
+    return report
+
+
+def _key(r):
+    return (r["stage"], r.get("engine"), r.get("size_mb"), r.get("rows"))
+
+
+def _format(r):
+    label = f"{r['stage']:<13} {r.get('engine') or '-':<7} "
+    label += f"{r['size_mb']:>6}MB" if "size_mb" in r else f"{r['rows']:>6}rows"
+    speed = f"{r['mb_s']:8.2f} MB/s" if r.get("mb_s") else " " * 13
+    return f"{label}  {r['wall_s'] * 1000:10.1f} ms  {speed}  peak {r['rss_peak_mb']:7.1f} MB"
+
+
+# 두 결과 파일을 같은 측정끼리 비교 (현재/이전 시간 비율)
+def compare(old_path, new_report):
+    with open(old_path, encoding="utf-8") as f:
+        old = {_key(r): r for r in json.load(f)["results"]}
+    print(f"\n비교 기준: {old_path}")
+    for r in new_report["results"]:
+        prev = old.get(_key(r))
+        if prev:
+            ratio = r["wall_s"] / prev["wall_s"] if prev["wall_s"] else float("nan")
+            print(f"{_format(r)}  x{ratio:5.2f} (이전 {prev['wall_s'] * 1000:.1f} ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DART 추출/분류/번들 벤치마크")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES_MB), help="문서 크기(MB), 쉼표 구분")
+    parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES), help="stream,lxml,bs4 중 선택")
+    parser.add_argument("--stages", default=",".join(STAGES), help=",".join(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    report = run(
+        sizes_mb=[float(s) for s in args.sizes.split(",") if s],
+        engines=[e for e in args.engines.split(",") if e],
+        stages=[s for s in args.stages.split(",") if s],
+        repeat=args.repeat,
+        out=args.out,
+    )
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import random
+
+from core.extract import ALL_MARKERS
+
+# --- 벤치마크용 DART 스타일 HTML 생성기 ---
+# 실제 document.xml 본문과 비슷하게: head/style, 네비 문구(본문 위치로 이동/목차/TOP),
+# 모든 장 표지(ALL_MARKERS), 중첩 표/colspan/rowspan, 긴 문단, 엔티티를 섞는다.
+# 같은 seed면 항상 같은 문서가 나온다.
+
+WORDS = [
+    "당사는", "연결실체", "매출액", "영업이익", "전기", "당기", "증가", "감소", "반도체", "디스플레이",
+    "부문", "주요", "제품", "원재료", "생산설비", "연구개발", "투자", "위험", "관리", "정책",
+    "환율", "금리", "유동성", "자본", "부채", "배당", "주주", "이사회", "감사", "계약",
+]
+
+HEAD = (
+    "<html><head><meta charset=\"utf-8\"><title>사업보고서</title>"
+    "<style>.xforms_title{font-weight:bold} td{border:1px solid #000}</style>"
+    "<script>var dart = {};</script></head><body>\n"
+)
+NAV = "<p><a href=\"#top\">본문 위치로 이동</a></p><p>목차</p>\n"
+
+
+def _sentence(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)) + "."
+
+
+def _paragraph(rng):
+    text = " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(2, 6)))
+    if rng.random() < 0.2:
+        text += " (단위 : 백만원 &amp; 주)"
+    return f"<p class=\"p\"><span>{text}</span></p>\n"
+
+
+def _number(rng):
+    return f"{rng.randint(-99999, 9999999):,}"
+
+
+def _table(rng, depth=0):
+    cols = rng.randint(3, 7)
+    rows = rng.randint(3, 14)
+    out = ["<table border=\"1\"><thead><tr>"]
+    out.append("".join(f"<th>{rng.choice(WORDS)} {c}</th>" for c in range(cols)))
+    out.append("</tr></thead><tbody>")
+    for r in range(rows):
+        out.append("<tr>")
+        c = 0
+        while c < cols:
+            roll = rng.random()
+            if roll < 0.08 and c + 1 < cols:
+                out.append(f"<td colspan=\"2\">{rng.choice(WORDS)}</td>")
+                c += 2
+                continue
+            if roll < 0.12:
+                out.append(f"<td rowspan=\"2\">{_number(rng)}</td>")
+            elif roll < 0.15 and depth < 2:
+                out.append(f"<td>{_table(rng, depth + 1)}</td>")
+            elif roll < 0.2:
+                out.append(f"<td><p>{_sentence(rng, 4)}</p><br/>{_sentence(rng, 3)}</td>")
+            else:
+                out.append(f"<td align=\"right\">{_number(rng)}</td>")
+            c += 1
+        out.append("</tr>")
+    out.append("</tbody></table>\n")
+    return "".join(out)
+
+
+def _chapter(rng, marker, index):
+    title = marker
+    if marker == "【":
+        title = f"【 전문가의 확인 {index} 】"
+    return (
+        f"<p>TOP</p><h2 class=\"xforms_title\"><span>{title}</span></h2>\n"
+        f"<p><span>{index}. {rng.choice(WORDS)} {rng.choice(WORDS)}</span></p>\n"
+    )
+
+
+def make_document(size_bytes, seed=0):
+    """size_bytes(UTF-8 기준) 이상이 될 때까지 장/문단/표를 채운 HTML 문자열."""
+    rng = random.Random(seed)
+    parts = [HEAD, NAV]
+    total = len(HEAD.encode()) + len(NAV.encode())
+    chapter = 0
+    while True:
+        for marker in ALL_MARKERS:
+            block = [_chapter(rng, marker, chapter)]
+            for _ in range(rng.randint(1, 4)):
+                block.append(_paragraph(rng))
+                if rng.random() < 0.6:
+                    block.append(_table(rng))
+                if rng.random() < 0.1:
+                    block.append(NAV)
+            chunk = "".join(block)
+            parts.append(chunk)
+            total += len(chunk.encode())
+        chapter += 1
+        if total >= size_bytes:
+            break
+    parts.append("</body></html>\n")
+    return "".join(parts)
+
+
+def make_listing(n_rows, seed=0):
+    """list.json 모양의 공시 목록 (report_nm, rcept_dt, rcept_no, corp_code) 레코드."""
+    rng = random.Random(seed)
+    names = [
+        "사업보고서 ({y}.12)", "[기재정정]사업보고서 ({y}.12)", "반기보고서 ({y}.06)",
+        "분기보고서 ({y}.03)", "분기보고서 ({y}.09)", "분기보고서", "주요사항보고서(자기주식취득결정)",
+        "임원ㆍ주요주주특정증권등소유상황보고서",
+    ]
+    rows = []
+    for i in range(n_rows):
+        y = rng.randint(2015, 2025)
+        m, d = rng.randint(1, 12), rng.randint(1, 28)
+        rows.append({
+            "corp_code": f"{rng.randint(0, 99999999):08d}",
+            "report_nm": rng.choice(names).format(y=y),
+            "rcept_dt": f"{y + 1 if m < 4 else y}{m:02d}{d:02d}",
+            "rcept_no": f"{y}{m:02d}{d:02d}{i:06d}",
+        })
+    return rows
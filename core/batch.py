@@ -0,0 +1,233 @@
+import argparse
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core import config
+from core.bundle import BundleWriter
+from core.catalog import get_filing_catalog
+from core.chunks import DEFAULT_TOKEN_BUDGET, ChunkWriter
+from core.classify import REPORT_TYPES, select_reports
+from core.corp_index import get_corp_index
+from core.dart_api import make_session
+from core.dedupe import ParagraphDeduper
+from core.doc_cache import get_document_cache
+from core.pipeline import iter_pipeline
+from core.reports import ReportLoader
+from core.search_index import get_search_index
+
+# --- 화면 없이 돌리는 일괄 다운로드/추출 (야간 코퍼스 구축용) ---
+# app.py와 같은 함수(회사 색인 → 카탈로그 목록 → 분류 → 원문 → 추출)를 쓰고,
+# 다운로드는 스레드로, HTML 해석/추출(CPU)은 프로세스 풀로 돌려 모든 코어를 쓴다.
+# 여러 회사를 하나의 파이프라인으로 흘려보내므로 회사가 바뀌어도 풀이 쉬지 않는다.
+# 사용법:
+#   python -m core.batch 삼성전자 000660 --start-year 2020 --end-year 2024 --types 사업보고서 --out ./corpus
+#   python -m core.batch --file corps.txt --format tree --procs 16 --workers 8 --tables --chunks
+# 결과: --format zip  → <out>/<회사>_<고유번호>_<기간>_<종류>.zip (app.py와 같은 머리글)
+#       --format tree → <out>/<회사>_<고유번호>/<회사>_<보고서명>.txt (+ 표, 청크)
+# 같은 회사를 여러 번 적어도(회사명과 종목코드 등) 한 번만 받고, 이름이 같은 다른 회사는 고유번호로 구분된다.
+
+FORMATS = ("zip", "tree")
+
+
+def _safe(name):
+    return re.sub(r'[\\/*?:"<>|]', "", name)
+
+
+def _type_str(types):
+    if len(types) == 1:
+        return types[0]
+    if len(types) <= 2:
+        return "+".join(types)
+    return "다종보고서"
+
+
+# 회사 하나의 결과물 (ZIP 또는 폴더)
+class _CorpOutput:
+    def __init__(self, out_dir, fmt, stem, folder, tables, chunks, budget, dedupe):
+        self.fmt = fmt
+        self.tables = tables
+        if fmt == "zip":
+            self.path = os.path.join(out_dir, f"{stem}.zip")
+            self.bundle = BundleWriter(self.path)
+            chunk_path = os.path.join(out_dir, f"{stem}_chunks.jsonl")
+        else:
+            self.path = os.path.join(out_dir, folder)
+            os.makedirs(self.path, exist_ok=True)
+            self.bundle = None
+            chunk_path = os.path.join(self.path, "chunks.jsonl")
+        self.chunks = ChunkWriter(chunk_path, budget=budget, dedupe=dedupe) if chunks else None
+        self.deduper = ParagraphDeduper(dedupe) if dedupe else None
+
+    def write(self, fname, header, report, meta):
+        text = report.text
+        if self.deduper is not None:
+            text = self.deduper.process(text, fname[:-4], group=meta.get("smart_type"), header=header)
+        if self.bundle is not None:
+            self.bundle.write_text(fname, header, text)
+            if self.tables:
+                self.bundle.write_tables(fname[:-4], report.tables, metadata={"rcept_no": meta["rcept_no"], "report_nm": meta["report_nm"]})
+        else:
+            with open(os.path.join(self.path, fname), "w", encoding="utf-8") as f:
+                f.write(header)
+                f.write(text)
+            if self.tables:
+                from core.tables import TABLE_FORMATS, table_bytes
+                table_dir = os.path.join(self.path, f"{fname[:-4]}_tables")
+                os.makedirs(table_dir, exist_ok=True)
+                for table in report.tables:
+                    with open(os.path.join(table_dir, f"table_{table.index + 1:03d}{TABLE_FORMATS['parquet']}"), "wb") as f:
+                        f.write(table_bytes(table, "parquet", {"rcept_no": meta["rcept_no"], "report_nm": meta["report_nm"]}))
+        if self.chunks is not None:
+            self.chunks.write_report(report, meta)
+
+    def close(self):
+        if self.bundle is not None:
+            self.bundle.close()
+        if self.chunks is not None:
+            self.chunks.close()
+
+
+def resolve_corps(queries, api_key):
+    """([corp], [못 찾은 질의]) — 같은 회사(corp_code)는 처음 나온 순서대로 한 번만."""
+    index = get_corp_index(api_key)
+    found, missing, seen = [], [], set()
+    for q in queries:
+        corp = index.resolve(q.strip())
+        if corp is None:
+            missing.append(q)
+        elif corp["corp_code"] not in seen:
+            seen.add(corp["corp_code"])
+            found.append(corp)
+    return found, missing
+
+
+def plan(session, api_key, corps, start_year, end_year, types, latest_per_year=True):
+    """회사별 대상 보고서 [(corp, row)] — app.py와 같은 카탈로그/분류 규칙. 한 회사의 보고서는 연달아 놓인다."""
+    catalog = get_filing_catalog()
+    items = []
+    for corp in {corp["corp_code"]: corp for corp in corps}.values():
+        df = catalog.report_list(session, api_key, corp["corp_code"], f"{start_year}0101", f"{end_year}1231")
+        if df is None or df.empty:
+            continue
+        df = select_reports(df, types, latest_per_year=latest_per_year)
+        items.extend((corp, row) for _, row in df.iterrows())
+    return items
+
+
+def run(queries, api_key, start_year, end_year, types=("사업보고서",), out_dir="batch_out", fmt="zip",
+        extractor="ai", workers=8, procs=None, tables=False, chunks=False, budget=DEFAULT_TOKEN_BUDGET,
+        dedupe=None, latest_per_year=True, log=print):
+    procs = procs or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    session = make_session(pool_size=max(16, workers))
+    t0 = time.perf_counter()
+
+    corps, missing = resolve_corps(queries, api_key)
+    for q in missing:
+        log(f"⚠️ 회사를 찾을 수 없습니다: {q}")
+    items = plan(session, api_key, corps, start_year, end_year, list(types), latest_per_year)
+    log(f"회사 {len(corps)}곳, 보고서 {len(items)}건 — 다운로드 {workers}개 / 추출 프로세스 {procs}개")
+
+    index = get_search_index() if config.SEARCH_INDEX else None
+    year_str = f"{start_year}" if start_year == end_year else f"{start_year}-{end_year}"
+    summary = {"reports": 0, "failed": 0, "outputs": []}
+    ctx = multiprocessing.get_context("spawn")  # 다운로드 스레드가 도는 중이므로 fork 대신 spawn
+    with ProcessPoolExecutor(max_workers=procs, mp_context=ctx) as pool:
+        loader = ReportLoader(session, api_key, extractor=extractor, cache=get_document_cache(),
+                              structured=True, executor=pool)
+
+        def fetch(item):
+            return loader.fetch(item[1]['rcept_no'])
+
+        def parse(item, payload):
+            return loader.parse(item[1]['rcept_no'], payload)
+
+        output, current = None, None
+        try:
+            results = iter_pipeline(items, fetch, parse, fetch_workers=workers, parse_workers=procs)
+            for i, ((corp, row), report, err) in enumerate(results, 1):
+                corp_name = corp['corp_name']
+                if current != corp['corp_code']:
+                    if output is not None:
+                        output.close()
+                        summary["outputs"].append(output.path)
+                    stem = _safe(f"{corp_name}_{corp['corp_code']}_{year_str}_{_type_str(list(types))}_모음")
+                    folder = _safe(f"{corp_name}_{corp['corp_code']}")
+                    output = _CorpOutput(out_dir, fmt, stem, folder, tables, chunks, budget, dedupe)
+                    current = corp['corp_code']
+
+                rpt_name = row['report_nm']
+                fname = _safe(f"{corp_name}_{rpt_name}.txt")
+                if err is not None:
+                    summary["failed"] += 1
+                    log(f"[{i}/{len(items)}] ⚠️ 실패: {fname} — {err}")
+                    continue
+
+                header_info = f"### {corp_name} {rpt_name} ###\n"
+                header_info += f"접수일: {row['rcept_dt']}\n"
+                header_info += f"분류: {row['smart_type']}\n\n"
+                meta = {"corp_name": corp_name, "corp_code": corp['corp_code'], "rcept_no": row['rcept_no'],
+                        "rcept_dt": row['rcept_dt'], "report_nm": rpt_name, "smart_type": row['smart_type']}
+                output.write(fname, header_info, report, meta)
+                if index is not None:
+                    try:
+                        index.add(row['rcept_no'], report.text, report.sections, meta, loader.version)
+                    except sqlite3.Error as e:  # 색인 실패는 결과물에 영향을 주지 않는다 (backfill로 다시 채울 수 있음)
+                        log(f"[{i}/{len(items)}] ⚠️ 색인 실패: {fname} — {e}")
+                summary["reports"] += 1
+                log(f"[{i}/{len(items)}] {fname}")
+        finally:
+            if output is not None:
+                output.close()
+                summary["outputs"].append(output.path)
+
+    elapsed = time.perf_counter() - t0
+    summary["elapsed_s"] = round(elapsed, 1)
+    log(f"완료: {summary['reports']}건, 실패 {summary['failed']}건, {elapsed:.1f}s "
+        f"({summary['reports'] / elapsed if elapsed else 0:.2f}건/s) → {out_dir}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DART 보고서 일괄 다운로드/추출 (Streamlit 없이)")
+    parser.add_argument("corps", nargs="*", help="회사명 또는 6자리 종목코드")
+    parser.add_argument("--file", help="회사 목록 파일 (한 줄에 하나, #으로 시작하면 주석)")
+    parser.add_argument("--api-key", default=os.environ.get("DART_API_KEY"), help="기본값: 환경변수 DART_API_KEY")
+    parser.add_argument("--start-year", type=int, default=time.localtime().tm_year - 1)
+    parser.add_argument("--end-year", type=int, default=time.localtime().tm_year)
+    parser.add_argument("--types", nargs="+", default=["사업보고서"], choices=REPORT_TYPES)
+    parser.add_argument("--all-filings", action="store_true", help="연도별 최신 1건이 아니라 해당 종류 전체 (정정 포함)")
+    parser.add_argument("--out", default="batch_out", help="결과 폴더")
+    parser.add_argument("--format", choices=FORMATS, default="zip")
+    parser.add_argument("--extractor", choices=["ai", "full"], default="ai")
+    parser.add_argument("--workers", type=int, default=8, help="동시 다운로드 수")
+    parser.add_argument("--procs", type=int, default=None, help="추출 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--tables", action="store_true", help="표를 Parquet로 함께 저장 (pyarrow 필요)")
+    parser.add_argument("--chunks", action="store_true", help="AI 적재용 청크 JSONL 함께 만들기")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET)
+    parser.add_argument("--dedupe", choices=["bundle", "delta"], help="보고서 간 중복 문단 처리")
+    args = parser.parse_args(argv)
+
+    queries = list(args.corps)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            queries += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not queries:
+        parser.error("회사명/종목코드를 하나 이상 주거나 --file을 지정하세요.")
+    if not args.api_key:
+        parser.error("API 키가 필요합니다 (--api-key 또는 DART_API_KEY).")
+
+    summary = run(queries, args.api_key, args.start_year, args.end_year, types=args.types, out_dir=args.out,
+                  fmt=args.format, extractor=args.extractor, workers=args.workers, procs=args.procs,
+                  tables=args.tables, chunks=args.chunks, budget=args.token_budget, dedupe=args.dedupe,
+                  latest_per_year=not args.all_filings)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import os
+import zipfile
+
+from core.metrics import stage
+from core.tables import TABLE_FORMATS, table_bytes
+
+# --- ZIP 번들을 메모리 대신 디스크 임시 파일에 바로 쓰기 ---
+# 보고서가 끝날 때마다 항목을 써 넣으므로 완성된 본문을 모두 들고 있을 필요가 없고,
+# 다운로드 시에는 파일을 한 번 읽어 넘기기만 한다 (BytesIO + getvalue() 이중 복사 없음).
+WRITE_CHUNK = 1 << 20
+
+
+class BundleWriter:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+
+    # 여러 조각(머리글 + 본문)을 이어 붙이지 않고 순서대로 압축해 쓴다
+    def write_text(self, name, *parts):
+        with stage("zip") as s, self._zip.open(name, "w", force_zip64=True) as entry:
+            for part in parts:
+                for i in range(0, len(part), WRITE_CHUNK):
+                    data = part[i:i + WRITE_CHUNK].encode("utf-8")
+                    entry.write(data)
+                    s.bytes += len(data)
+        self.count += 1
+
+    def write_bytes(self, name, data, compress=True):
+        self._zip.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+        self.count += 1
+
+    # 표마다 열 단위 파일 하나 (<stem>_tables/table_001.parquet). Parquet/Arrow는 자체 압축이라 그대로 저장.
+    def write_tables(self, stem, tables, fmt="parquet", metadata=None):
+        for table in tables:
+            data = table_bytes(table, fmt, metadata)
+            self.write_bytes(f"{stem}_tables/table_{table.index + 1:03d}{TABLE_FORMATS[fmt]}", data, compress=False)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def open(self):
+        return open(self.path, "rb")
@@ -0,0 +1,242 @@
+import datetime
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from core import config
+from core.dart_api import fetch_report_list
+from core.metrics import stage
+
+# --- 로컬 공시 목록 카탈로그 (증분 동기화) ---
+# 회사(corp_code, 공시유형)마다 동기화가 끝난 구간 [covered_from, covered_to]와
+# 지금까지 본 가장 최근 rcept_dt / rcept_no를 기록한다.
+# 다음 검색 때는 구간 밖(앞쪽 과거 / 마지막 공시일 이후)만 list.json으로 요청하고,
+# 나머지는 SQLite에서 바로 읽는다. 공시는 rcept_no로 한 번만 저장된다.
+# 오늘 날짜는 공시가 계속 들어올 수 있으므로 covered_to는 항상 어제까지로 잡는다.
+
+LIST_COLUMNS = ["corp_code", "corp_name", "stock_code", "corp_cls", "report_nm", "rcept_no", "flr_nm", "rcept_dt", "rm"]
+WATCHLIST_YEARS = 5  # 관심종목 첫 동기화 시 가져올 기간
+_AMEND_TAG_RE = re.compile(r"^\s*(?:\[[^\]]*\]\s*)+")  # [기재정정], [첨부정정] 등 보고서명 앞 꼬리표
+
+
+def _day(yyyymmdd, delta=0):
+    d = datetime.datetime.strptime(yyyymmdd, "%Y%m%d").date() + datetime.timedelta(days=delta)
+    return d.strftime("%Y%m%d")
+
+
+def _today():
+    return datetime.date.today().strftime("%Y%m%d")
+
+
+def drop_superseded(df):
+    """같은 보고서(회사 + 꼬리표를 뺀 보고서명, 예: 사업보고서 (2023.12))의 최종본만 — list.json의 last_reprt_at='Y'와 같다.
+    카탈로그는 정정 전 원본도 모두 저장해 두고(나중에 정정이 들어오면 최종본이 바뀌므로) 읽을 때 거른다."""
+    if df is None or len(df) == 0:
+        return df
+    base = df["report_nm"].astype(str).str.replace(_AMEND_TAG_RE, "", regex=True).str.strip()
+    latest = df.assign(_base=base).sort_values(["rcept_dt", "rcept_no"], ascending=False)
+    latest = latest[~latest.duplicated(["corp_code", "_base"], keep="first")]
+    return latest.drop(columns="_base").reset_index(drop=True)
+
+
+class FilingCatalog:
+    def __init__(self, path=None):
+        self.path = path or config.data_path("catalog.sqlite3")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS filings ("
+            " rcept_no TEXT PRIMARY KEY, kind TEXT NOT NULL, corp_code TEXT NOT NULL, corp_name TEXT,"
+            " stock_code TEXT, corp_cls TEXT, report_nm TEXT, flr_nm TEXT, rcept_dt TEXT NOT NULL, rm TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS filings_corp ON filings(corp_code, kind, rcept_dt)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " corp_code TEXT NOT NULL, kind TEXT NOT NULL, covered_from TEXT NOT NULL, covered_to TEXT NOT NULL,"
+            " last_rcept_dt TEXT, last_rcept_no TEXT, synced_at REAL NOT NULL, PRIMARY KEY (corp_code, kind))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS watchlist ("
+            " corp_code TEXT PRIMARY KEY, corp_name TEXT, added_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    # --- 동기화 상태 ---
+    def state(self, corp_code, kind='A'):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT covered_from, covered_to, last_rcept_dt, last_rcept_no, synced_at"
+                " FROM sync_state WHERE corp_code = ? AND kind = ?", (corp_code, kind)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["covered_from", "covered_to", "last_rcept_dt", "last_rcept_no", "synced_at"], row))
+
+    # 이번 검색에 필요한 list.json 요청 구간들 (이미 덮인 구간은 빼고)
+    def missing_ranges(self, corp_code, start_date, end_date, kind='A'):
+        end_date = min(end_date, _today())
+        st = self.state(corp_code, kind)
+        if st is None:
+            return [(start_date, end_date)] if start_date <= end_date else []
+        ranges = []
+        if start_date < st["covered_from"]:
+            ranges.append((start_date, _day(st["covered_from"], -1)))
+        # covered_to 다음 날부터 요청 (오늘 받은 공시가 마지막이면 그 날을 다시 포함해 늦게 들어온 공시를 잡는다)
+        newer_from = max(_day(st["covered_to"], 1), st["last_rcept_dt"] or st["covered_from"])
+        if end_date >= newer_from and end_date > st["covered_to"]:
+            ranges.append((newer_from, end_date))
+        return ranges
+
+    def _store(self, corp_code, kind, df, covered_from, covered_to):
+        rows = []
+        if df is not None and len(df):
+            data = df.reindex(columns=LIST_COLUMNS).fillna("")
+            rows = [(r["rcept_no"], kind, r["corp_code"] or corp_code, r["corp_name"], r["stock_code"], r["corp_cls"],
+                     r["report_nm"], r["flr_nm"], r["rcept_dt"], r["rm"]) for r in data.to_dict("records")]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO filings (rcept_no, kind, corp_code, corp_name, stock_code, corp_cls,"
+                " report_nm, flr_nm, rcept_dt, rm) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            added = self._db.total_changes - before
+            last = self._db.execute(
+                "SELECT rcept_dt, rcept_no FROM filings WHERE corp_code = ? AND kind = ?"
+                " ORDER BY rcept_dt DESC, rcept_no DESC LIMIT 1", (corp_code, kind)
+            ).fetchone() or (None, None)
+            self._db.execute(
+                "INSERT INTO sync_state (corp_code, kind, covered_from, covered_to, last_rcept_dt, last_rcept_no, synced_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(corp_code, kind) DO UPDATE SET"
+                " covered_from = MIN(covered_from, excluded.covered_from),"
+                " covered_to = MAX(covered_to, excluded.covered_to),"
+                " last_rcept_dt = excluded.last_rcept_dt, last_rcept_no = excluded.last_rcept_no,"
+                " synced_at = excluded.synced_at",
+                (corp_code, kind, covered_from, covered_to, last[0], last[1], time.time())
+            )
+            self._db.commit()
+        return added
+
+    # --- 증분 동기화: 빠진 구간만 받아 새 공시 수를 돌려준다 ---
+    def sync(self, session, api_key, corp_code, start_date, end_date, kind='A'):
+        added = 0
+        yesterday = _day(_today(), -1)
+        for bgn, end in self.missing_ranges(corp_code, start_date, end_date, kind):
+            df = fetch_report_list(session, api_key, corp_code, bgn, end, kind=kind, strict=True)
+            added += self._store(corp_code, kind, df, bgn, min(end, yesterday))
+        return added
+
+    def query(self, corp_code, start_date, end_date, kind='A'):
+        with self._lock:
+            cur = self._db.execute(
+                f"SELECT {', '.join(LIST_COLUMNS)} FROM filings"
+                " WHERE corp_code = ? AND kind = ? AND rcept_dt BETWEEN ? AND ?"
+                " ORDER BY rcept_dt DESC, rcept_no DESC", (corp_code, kind, start_date, end_date)
+            )
+            rows = cur.fetchall()
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows, columns=LIST_COLUMNS)
+
+    # 저장된 공시 전체 (메타데이터 dict, 최신순) — 검색 색인 채우기 등
+    def iter_filings(self, kind=None):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(LIST_COLUMNS)} FROM filings WHERE ? IS NULL OR kind = ?"
+                " ORDER BY rcept_dt DESC, rcept_no DESC", (kind, kind)
+            ).fetchall()
+        for row in rows:
+            yield dict(zip(LIST_COLUMNS, row))
+
+    # fetch_report_list 대신 쓰는 입구: 빠진 구간만 받고 결과는 카탈로그에서 읽는다
+    # final=True면 정정된 원본을 빼고 최종본만 (OpenDartReader의 dart.list(final=True) / last_reprt_at='Y')
+    def report_list(self, session, api_key, corp_code, start_date, end_date, kind='A', final=False):
+        with stage("catalog", key=corp_code):
+            self.sync(session, api_key, corp_code, start_date, end_date, kind)
+            df = self.query(corp_code, start_date, end_date, kind)
+            return drop_superseded(df) if final else df
+
+    # --- 관심종목 ---
+    def watch(self, corp_code, corp_name=None):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO watchlist (corp_code, corp_name, added_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(corp_code) DO UPDATE SET corp_name = COALESCE(excluded.corp_name, corp_name)",
+                (corp_code, corp_name, time.time())
+            )
+            self._db.commit()
+
+    def unwatch(self, corp_code):
+        with self._lock:
+            self._db.execute("DELETE FROM watchlist WHERE corp_code = ?", (corp_code,))
+            self._db.commit()
+
+    def watchlist(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT w.corp_code, w.corp_name, s.last_rcept_dt, s.synced_at FROM watchlist w"
+                " LEFT JOIN sync_state s ON s.corp_code = w.corp_code AND s.kind = 'A'"
+                " ORDER BY w.added_at"
+            ).fetchall()
+        return [dict(zip(["corp_code", "corp_name", "last_rcept_dt", "synced_at"], r)) for r in rows]
+
+    # 관심종목 전체를 오늘까지 따라잡기 (처음 보는 회사는 WATCHLIST_YEARS년치)
+    def sync_watchlist(self, session, api_key, kind='A', max_workers=4, years=WATCHLIST_YEARS):
+        today = _today()
+        default_from = f"{int(today[:4]) - years + 1}0101"
+
+        def one(item):
+            st = self.state(item["corp_code"], kind)
+            start = st["covered_from"] if st else default_from
+            try:
+                return item["corp_code"], self.sync(session, api_key, item["corp_code"], start, today, kind), None
+            except Exception as e:
+                return item["corp_code"], 0, e
+
+        items = self.watchlist()
+        if not items:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+            return {code: (added, err) for code, added, err in pool.map(one, items)}
+
+
+# --- 프로세스 전체에서 공유하는 기본 카탈로그 ---
+@functools.lru_cache(maxsize=None)
+def get_filing_catalog():
+    return FilingCatalog()
+
+
+# cron 등에서 관심종목 동기화:
+#   python -m core.catalog add 005930 [API_KEY]
+#   python -m core.catalog sync [API_KEY]
+#   python -m core.catalog list
+if __name__ == "__main__":
+    import sys
+    from core.corp_index import get_corp_index
+    from core.dart_api import make_session
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "list"
+    key = os.environ.get("DART_API_KEY")
+    catalog = get_filing_catalog()
+    if cmd in ("add", "remove"):
+        key = sys.argv[3] if len(sys.argv) > 3 else key
+        corp = get_corp_index(key).resolve(sys.argv[2])
+        if corp is None:
+            sys.exit(f"회사를 찾을 수 없습니다: {sys.argv[2]}")
+        if cmd == "add":
+            catalog.watch(corp["corp_code"], corp["corp_name"])
+        else:
+            catalog.unwatch(corp["corp_code"])
+    elif cmd == "sync":
+        key = sys.argv[2] if len(sys.argv) > 2 else key
+        for code, (added, err) in catalog.sync_watchlist(make_session(pool_size=4), key).items():
+            print(f"{code}: " + (f"실패 {err}" if err else f"새 공시 {added}건"))
+    for item in catalog.watchlist():
+        print(f"{item['corp_code']} {item['corp_name'] or ''} 마지막 공시일 {item['last_rcept_dt'] or '-'}")
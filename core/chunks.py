@@ -0,0 +1,165 @@
+import json
+
+from core.dedupe import paragraph_digest
+
+# --- AI 적재용 청크 JSONL 내보내기 ---
+# 추출 단계에서 얻은 장 색인/표 위치를 경계로 삼아, 토큰 예산 안에서 본문을 자른다.
+#   - 청크는 장(section)을 넘지 않고, 표는 본문 문단과 섞지 않고 따로 청크가 된다
+#   - 예산을 넘는 본문은 문단(빈 줄) → 줄 → 글자 순으로, 표는 행 단위로 나눈다
+#   - start/end는 추출 텍스트 기준 문자 위치 (text == 원문[start:end])
+#   - dedupe="bundle"이면 앞 보고서와 같은 청크는 text를 비우고 duplicate_of로 처음 나온 청크를 가리킨다
+#     dedupe="delta"면 같은 종류(smart_type)의 직전 보고서와만 비교한다 (core.dedupe와 같은 범위)
+# 토큰 수는 tiktoken(cl100k_base)이 있으면 그것으로, 없으면 근사치(한글 1자≈1토큰, 영숫자 4자≈1토큰)로 센다.
+
+DEFAULT_TOKEN_BUDGET = 1000
+_encoder = None
+
+
+def approx_tokens(text):
+    ascii_count = len(text.encode("ascii", "ignore"))
+    return (len(text) - ascii_count) + (ascii_count + 3) // 4
+
+
+def get_token_counter():
+    """(토크나이저 이름, 세는 함수)."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            enc = tiktoken.get_encoding("cl100k_base")
+            _encoder = ("cl100k_base", lambda s: len(enc.encode(s, disallowed_special=())))
+        except Exception:
+            _encoder = ("approx", approx_tokens)
+    return _encoder
+
+
+def _trim(text, start, end):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+# 구간을 sep 기준 조각으로 나눠 예산 안에서 이어 붙인다. 한 조각이 예산보다 크면 다음 sep으로 더 쪼갠다.
+def _split(text, start, end, budget, count, seps):
+    n = count(text[start:end])
+    if n <= budget:
+        return [(start, end)]
+    if not seps:
+        step = max(1, (end - start) * budget // n)
+        return [(i, min(i + step, end)) for i in range(start, end, step)]
+    sep = seps[0]
+    pieces, pos = [], start
+    while pos < end:
+        i = text.find(sep, pos, end)
+        cut = end if i == -1 else i + len(sep)
+        pieces.append((pos, cut))
+        pos = cut
+    if len(pieces) == 1:
+        return _split(text, start, end, budget, count, seps[1:])
+
+    out, cur, cur_n = [], None, 0
+    for s, e in pieces:
+        pn = count(text[s:e])
+        if pn > budget:
+            if cur is not None:
+                out.append(cur)
+                cur = None
+            out.extend(_split(text, s, e, budget, count, seps[1:]))
+            continue
+        if cur is not None and cur_n + pn > budget:
+            out.append(cur)
+            cur = None
+        if cur is None:
+            cur, cur_n = (s, e), 0
+        cur = (cur[0], e)
+        cur_n += pn
+    if cur is not None:
+        out.append(cur)
+    return out
+
+
+# (start, end, kind, section) 단위: 장 구간 안에서 표 / 본문을 번갈아
+def _units(text, sections, tables):
+    bounds = [(0, sections[0]["start"] if sections else len(text), None)]
+    bounds += [(s["start"], s["end"], s["title"]) for s in sections]
+    spans = sorted((t.start, t.end) for t in tables if t.start is not None)
+    for sec_start, sec_end, title in bounds:
+        pos = sec_start
+        for t_start, t_end in spans:
+            if t_end <= sec_start or t_start >= sec_end:
+                continue
+            if t_start > pos:
+                yield pos, t_start, "text", title
+            yield max(t_start, sec_start), min(t_end, sec_end), "table", title
+            pos = min(t_end, sec_end)
+        if pos < sec_end:
+            yield pos, sec_end, "text", title
+
+
+def chunk_report(text, sections, tables, budget=DEFAULT_TOKEN_BUDGET):
+    """[{"section", "kind", "start", "end", "tokens", "text"}, ...] (본문 순서)."""
+    name, count = get_token_counter()
+    chunks = []
+    for start, end, kind, title in _units(text, sections, tables):
+        seps = ("\n",) if kind == "table" else ("\n\n", "\n")
+        for s, e in _split(text, start, end, budget, count, seps):
+            s, e = _trim(text, s, e)
+            if s >= e:
+                continue
+            piece = text[s:e]
+            chunks.append({"section": title, "kind": kind, "start": s, "end": e,
+                           "tokens": count(piece), "text": piece})
+    return chunks
+
+
+# --- JSONL 파일 쓰기 (보고서가 끝날 때마다 이어 쓴다) ---
+class ChunkWriter:
+    def __init__(self, path, budget=DEFAULT_TOKEN_BUDGET, dedupe=None):
+        self.path = path
+        self.budget = budget
+        self.scope = "bundle" if dedupe is True else (dedupe or None)
+        self.seen = {}      # 청크 해시 → 처음 나온 "rcept_no#chunk_index"  (scope="bundle")
+        self.previous = {}  # smart_type → {청크 해시: "rcept_no#chunk_index"}  (scope="delta")
+        self.duplicates = 0
+        self.tokenizer = get_token_counter()[0]
+        self.records = 0
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write_report(self, report, meta):
+        """report: core.reports.Report, meta: corp_name/rcept_no/smart_type 등 레코드마다 붙일 값."""
+        if self.scope == "delta":
+            lookup = self.previous.get(meta.get("smart_type"), {})
+            own = {}
+        else:
+            lookup = own = self.seen
+        for i, chunk in enumerate(chunk_report(report.text, report.sections, report.tables, self.budget)):
+            record = dict(meta)
+            record.update(chunk_index=i, tokenizer=self.tokenizer, **chunk)
+            if self.scope is not None:
+                # 앞 보고서와 같은 청크는 본문 없이 원문이 남은 청크를 가리킨다 (위치 정보는 그대로)
+                d = paragraph_digest(chunk["text"])
+                ref = lookup.get(d) if d is not None else None
+                if ref is not None:
+                    record.update(text="", tokens=0, duplicate_of=ref)
+                    self.duplicates += 1
+                if d is not None and d not in own:  # delta: 다음 보고서도 같은 원문 청크를 가리키도록
+                    own[d] = ref or f"{meta.get('rcept_no')}#{i}"
+            self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.records += 1
+        if self.scope == "delta":
+            self.previous[meta.get("smart_type")] = own
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        return open(self.path, "rb")
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# --- 정기보고서 분류 (두 다운로드 페이지 공용) ---
+REPORT_TYPES = ["1분기보고서", "반기보고서", "3분기보고서", "사업보고서"]
+OTHER_TYPE = "기타"
+QUARTER_OTHER = "분기보고서(기타)"
+
+# "분기보고서 (2024.03)" 처럼 보고서명에 붙는 보고 기간의 월
+PERIOD_MONTH_RE = r"\d{4}\.(\d{1,2})"
+
+
+def classify_reports(report_nm, rcept_dt):
+    """보고서명/접수일 컬럼 전체를 한 번에 분류해 smart_type 배열을 돌려준다.
+
+    분기보고서는 이름의 '1분기'/'3분기' → 보고 기간 월(1~3월/7~9월) → 접수 월(4~6월/9~12월) 순서로 판정한다.
+    """
+    nm = pd.Series(report_nm, dtype=object).astype(str).reset_index(drop=True)
+    dt = pd.Series(rcept_dt, dtype=object).astype(str).reset_index(drop=True)
+
+    annual = nm.str.contains("사업보고서", regex=False).to_numpy()
+    half = nm.str.contains("반기보고서", regex=False).to_numpy()
+    quarter = nm.str.contains("분기보고서", regex=False).to_numpy()
+
+    period = pd.to_numeric(nm.str.extract(PERIOD_MONTH_RE, expand=False), errors="coerce").to_numpy()
+    month = pd.to_numeric(dt.str[4:6], errors="coerce").to_numpy()
+
+    q1 = (nm.str.contains("1분기", regex=False).to_numpy()
+          | ((period >= 1) & (period <= 3))
+          | (np.isnan(period) & (month >= 4) & (month <= 6)))
+    q3 = (nm.str.contains("3분기", regex=False).to_numpy()
+          | ((period >= 7) & (period <= 9))
+          | (np.isnan(period) & (month >= 9) & (month <= 12)))
+
+    return np.select(
+        [annual, half, quarter & q1, quarter & q3, quarter],
+        ["사업보고서", "반기보고서", "1분기보고서", "3분기보고서", QUARTER_OTHER],
+        default=OTHER_TYPE,
+    ).astype(object)
+
+
+def select_reports(df, selected_types, latest_per_year=True):
+    """선택한 종류만 접수일 내림차순으로 골라 smart_type 컬럼을 붙인다.
+
+    latest_per_year=True면 (종류, 접수연도)마다 가장 최근 1건만 남긴다.
+    중간 DataFrame 없이 인덱스 배열만 다루고, 마지막에 한 번만 take 한다.
+    """
+    if df is None or len(df) == 0:
+        return df
+
+    types = classify_reports(df['report_nm'].to_numpy(), df['rcept_dt'].to_numpy())
+    rows = np.flatnonzero(np.isin(types, list(selected_types)))
+
+    dt = df['rcept_dt'].to_numpy().astype(str)
+    keys = (df['rcept_no'].to_numpy().astype(str)[rows], dt[rows]) if 'rcept_no' in df.columns else (dt[rows],)
+    rows = rows[np.lexsort(keys)[::-1]]
+
+    if latest_per_year and len(rows):
+        group = pd.Index(types[rows] + dt[rows].astype("U4").astype(object))
+        rows = rows[~group.duplicated(keep="first")]
+
+    out = df.take(rows)
+    out.index = pd.RangeIndex(len(out))
+    out['smart_type'] = types[rows]
+    return out
@@ -0,0 +1,30 @@
+import os
+
+# --- 로컬 저장소 위치 (캐시/색인 등) ---
+# 환경변수로 바꿀 수 있으며, 기본값은 프로젝트 폴더 아래 .dart_data
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get("DART_DATA_DIR", os.path.join(BASE_DIR, ".dart_data"))
+
+# OpenDART API 주소 (부하 테스트 시 로컬 대역 서버로 바꿀 수 있다: benchmarks/dart_server.py)
+DART_BASE_URL = os.environ.get("DART_BASE_URL", "https://opendart.fss.or.kr/api").rstrip("/")
+
+# OpenDART 요청 제어 (core/rate_limit.py): 초당 요청 수(0이면 무제한), 최대 동시 요청 수, 키당 일일 한도
+DART_RATE_LIMIT = float(os.environ.get("DART_RATE_LIMIT", "10"))
+DART_MAX_CONCURRENCY = int(os.environ.get("DART_MAX_CONCURRENCY", "16"))
+DART_DAILY_QUOTA = int(os.environ.get("DART_DAILY_QUOTA", "20000"))
+
+# 번들 작업이 추출한 보고서를 로컬 전문 검색 색인(core/search_index.py)에 넣을지
+SEARCH_INDEX = os.environ.get("DART_SEARCH_INDEX", "1") != "0"
+
+# 단계별 소요 시간 지표 내보내기 (core/metrics.py): "prom", "jsonl", "prom,jsonl", 빈 값이면 끔
+METRICS_EXPORT = os.environ.get("DART_METRICS_EXPORT", "prom")
+METRICS_INTERVAL = float(os.environ.get("DART_METRICS_INTERVAL", "15"))
+
+# 원문/텍스트 캐시 최대 용량 (MB)
+DOC_CACHE_MAX_MB = int(os.environ.get("DART_DOC_CACHE_MAX_MB", "2048"))
+
+
+def data_path(*parts):
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,329 @@
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import zipfile
+import zlib
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from core import config
+from core.dart_api import base_url, make_session
+from core.metrics import stage
+
+# --- DART 고유번호(corp_code) 색인 ---
+# corpCode.xml 전체(약 10만 개 법인)를 한 번 내려받아 numpy 배열로 디스크에 저장하고,
+# 불러올 때는 mmap으로 열기만 한다 (파싱/딕셔너리 재구성 없음 → 수 ms).
+#   - 회사명: UTF-8 blob + offsets (사전 인코딩)
+#   - 종목코드/고유번호/회사명: 미리 만든 open-addressing 해시 테이블로 O(1) 조회
+#   - 회사명 정렬 순서: 접두어 검색 (이진 탐색)
+#   - 자모 bigram 역색인: 오타 허용 검색 후보 생성
+INDEX_DIR = os.path.join(config.DATA_DIR, "corp_index")
+REFRESH_HOURS = 24
+
+_HANGUL_BASE = 0xAC00
+
+
+def _to_jamo(text):
+    out = []
+    for ch in text:
+        code = ord(ch) - _HANGUL_BASE
+        if 0 <= code < 11172:
+            out.append(chr(0x1100 + code // 588))
+            out.append(chr(0x1161 + (code % 588) // 28))
+            if code % 28:
+                out.append(chr(0x11A7 + code % 28))
+        else:
+            out.append(ch.lower())
+    return "".join(out)
+
+
+def _grams(text):
+    jamo = _to_jamo(text.replace(" ", ""))
+    if len(jamo) < 2:
+        return {zlib.crc32(jamo.encode("utf-8"))} if jamo else set()
+    return {zlib.crc32(jamo[i:i + 2].encode("utf-8")) for i in range(len(jamo) - 1)}
+
+
+def _edit_distance(a, b):
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        curr = [i]
+        for j, cb in enumerate(b, 1):
+            curr.append(min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = curr
+    return prev[-1]
+
+
+def _hash_table(keys):
+    size = 1
+    while size < len(keys) * 2:
+        size <<= 1
+    table = np.full(size, -1, dtype=np.int32)
+    mask = size - 1
+    seen = set()
+    for i, key in enumerate(keys):
+        if not key or key in seen:  # 같은 이름이면 먼저 나온(상장사 우선) 항목만
+            continue
+        seen.add(key)
+        h = zlib.crc32(key) & mask
+        while table[h] >= 0:
+            h = (h + 1) & mask
+        table[h] = i
+    return table
+
+
+# --- corpCode.xml 다운로드 → 레코드 목록 ---
+def download_corp_codes(api_key, session=None):
+    session = session or make_session(pool_size=1)
+    with stage("corp_codes") as s:
+        res = session.get(f"{base_url(session)}/corpCode.xml", params={'crtfc_key': api_key}, timeout=60)
+        s.bytes = len(res.content)
+        res.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(res.content)) as z:
+        xml_bytes = z.read(z.infolist()[0].filename)
+    records = []
+    for _, el in ET.iterparse(io.BytesIO(xml_bytes)):
+        if el.tag != "list":
+            continue
+        records.append((
+            (el.findtext("corp_code") or "").strip(),
+            (el.findtext("corp_name") or "").strip(),
+            (el.findtext("stock_code") or "").strip(),
+        ))
+        el.clear()
+    return records
+
+
+# --- 레코드 목록 → 색인 폴더 ---
+def build_corp_index(records, index_dir=INDEX_DIR):
+    # 상장사를 앞에 두어 동명 법인이 있을 때 상장사가 먼저 잡히게 한다
+    records = sorted(records, key=lambda r: (not r[2], r[1]))
+    n = len(records)
+    corp_code = np.array([r[0] for r in records], dtype="S8")
+    stock_code = np.array([r[2] for r in records], dtype="S6")
+    names = [r[1].encode("utf-8") for r in records]
+    name_off = np.zeros(n + 1, dtype=np.int64)
+    name_off[1:] = np.cumsum([len(b) for b in names])
+    name_blob = np.frombuffer(b"".join(names), dtype=np.uint8)
+    name_sorted = np.array(sorted(range(n), key=lambda i: names[i]), dtype=np.int32)
+
+    gram_key, gram_idx = [], []
+    for i, r in enumerate(records):
+        for g in _grams(r[1]):
+            gram_key.append(g)
+            gram_idx.append(i)
+    gram_key = np.array(gram_key, dtype=np.uint32)
+    gram_idx = np.array(gram_idx, dtype=np.int32)
+    order = np.argsort(gram_key, kind="stable")
+    gram_keys, gram_start = np.unique(gram_key[order], return_index=True)
+    gram_off = np.append(gram_start, len(order)).astype(np.int64)
+
+    arrays = {
+        "corp_code": corp_code,
+        "stock_code": stock_code,
+        "name_blob": name_blob,
+        "name_off": name_off,
+        "name_sorted": name_sorted,
+        "h_corp": _hash_table([c.encode() for c, _, _ in records]),
+        "h_stock": _hash_table([s.encode() for _, _, s in records]),
+        "h_name": _hash_table(names),
+        "gram_keys": gram_keys,
+        "gram_off": gram_off,
+        "gram_post": gram_idx[order],
+    }
+    build_id = time.strftime("%Y%m%d%H%M%S")
+    tmp_dir = os.path.join(index_dir, f".tmp-{build_id}-{os.getpid()}")
+    os.makedirs(tmp_dir, exist_ok=True)
+    for key, arr in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{key}.npy"), arr)
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"built_at": time.time(), "count": n, "listed": int((stock_code != b"").sum())}, f)
+    final_dir = os.path.join(index_dir, build_id)
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+
+    # CURRENT 포인터를 원자적으로 교체한 뒤 예전 빌드를 정리
+    pointer_tmp = os.path.join(index_dir, f"CURRENT.{os.getpid()}")
+    with open(pointer_tmp, "w") as f:
+        f.write(build_id)
+    os.replace(pointer_tmp, os.path.join(index_dir, "CURRENT"))
+    for entry in os.listdir(index_dir):
+        if entry not in (build_id, "CURRENT") and not entry.startswith("."):
+            shutil.rmtree(os.path.join(index_dir, entry), ignore_errors=True)
+    return final_dir
+
+
+class CorpIndex:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        for key in ("corp_code", "stock_code", "name_blob", "name_off", "name_sorted",
+                    "h_corp", "h_stock", "h_name", "gram_keys", "gram_off", "gram_post"):
+            setattr(self, key, np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.corp_code)
+
+    # --- 레코드 접근 ---
+    def _name_bytes(self, i):
+        return self.name_blob[self.name_off[i]:self.name_off[i + 1]].tobytes()
+
+    def name(self, i):
+        return self._name_bytes(i).decode("utf-8")
+
+    def record(self, i):
+        return {
+            "corp_code": self.corp_code[i].decode(),
+            "corp_name": self.name(i),
+            "stock_code": self.stock_code[i].decode() or None,
+        }
+
+    def _probe(self, table, key, getter):
+        if not key:
+            return -1
+        mask = len(table) - 1
+        h = zlib.crc32(key) & mask
+        while True:
+            i = int(table[h])
+            if i < 0 or getter(i) == key:
+                return i
+            h = (h + 1) & mask
+
+    # --- O(1) 조회 ---
+    def by_stock_code(self, code):
+        i = self._probe(self.h_stock, code.encode(), lambda i: self.stock_code[i])
+        return self.record(i) if i >= 0 else None
+
+    def by_corp_code(self, code):
+        i = self._probe(self.h_corp, code.encode(), lambda i: self.corp_code[i])
+        return self.record(i) if i >= 0 else None
+
+    def by_name(self, name):
+        i = self._probe(self.h_name, name.encode("utf-8"), self._name_bytes)
+        return self.record(i) if i >= 0 else None
+
+    # 6자리 숫자면 종목코드, 8자리 숫자면 고유번호, 아니면 정확한 회사명
+    def resolve(self, query):
+        query = query.strip()
+        if query.isdigit() and len(query) == 6:
+            return self.by_stock_code(query)
+        if query.isdigit() and len(query) == 8:
+            return self.by_corp_code(query)
+        return self.by_name(query)
+
+    # --- 접두어 검색 (정렬 배열 이진 탐색) ---
+    def search_prefix(self, prefix, limit=10, listed_only=False):
+        key = prefix.strip().encode("utf-8")
+        lo, hi = 0, len(self.name_sorted)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_bytes(self.name_sorted[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out = []
+        for pos in range(lo, len(self.name_sorted)):
+            i = int(self.name_sorted[pos])
+            if not self._name_bytes(i).startswith(key):
+                break
+            if listed_only and not self.stock_code[i]:
+                continue
+            out.append(self.record(i))
+            if len(out) >= limit:
+                break
+        return out
+
+    # --- 오타 허용 검색 (자모 bigram 후보 → 자모 편집거리 순위) ---
+    def search_fuzzy(self, query, limit=10, listed_only=False, max_candidates=200):
+        grams = np.array(sorted(_grams(query)), dtype=np.uint32)
+        if not len(grams):
+            return []
+        pos = np.searchsorted(self.gram_keys, grams)
+        hits = []
+        for g, p in zip(grams, pos):
+            if p < len(self.gram_keys) and self.gram_keys[p] == g:
+                hits.append(self.gram_post[self.gram_off[p]:self.gram_off[p + 1]])
+        if not hits:
+            return []
+        counts = np.bincount(np.concatenate(hits))
+        candidates = np.flatnonzero(counts)
+        if listed_only:
+            candidates = candidates[self.stock_code[candidates] != b""]
+        candidates = candidates[np.argsort(-counts[candidates], kind="stable")[:max_candidates]]
+        q = _to_jamo(query.replace(" ", ""))
+        ranked = sorted(
+            candidates,
+            key=lambda i: (_edit_distance(q, _to_jamo(self.name(i).replace(" ", ""))), not self.stock_code[i])
+        )
+        return [self.record(i) for i in ranked[:limit]]
+
+    # 상장사 {회사명: 종목코드}
+    def listed_names(self):
+        listed = np.flatnonzero(self.stock_code != b"")
+        return {self.name(i): self.stock_code[i].decode() for i in listed}
+
+
+# --- 프로세스 공용 인스턴스 + 주기적 갱신 ---
+_lock = threading.Lock()
+_current = None
+_refresher = None
+
+
+def _current_dir(index_dir=INDEX_DIR):
+    try:
+        with open(os.path.join(index_dir, "CURRENT")) as f:
+            return os.path.join(index_dir, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def refresh_corp_index(api_key):
+    global _current
+    path = build_corp_index(download_corp_codes(api_key))
+    with _lock:
+        _current = CorpIndex(path)
+    return _current
+
+
+def _refresh_loop(api_key, interval_hours):
+    while True:
+        index = _current
+        age = time.time() - index.meta["built_at"] if index else float("inf")
+        if age >= interval_hours * 3600:
+            try:
+                refresh_corp_index(api_key)
+                age = 0
+            except Exception:
+                age = interval_hours * 3600 - 600  # 실패 시 10분 뒤 재시도
+        time.sleep(max(60, interval_hours * 3600 - age))
+
+
+# 디스크에 색인이 있으면 mmap으로 바로 열고, 없으면 (처음 한 번만) 만든다.
+# api_key를 주면 백그라운드 스레드가 REFRESH_HOURS마다 새로 받아 교체한다.
+def get_corp_index(api_key=None, interval_hours=REFRESH_HOURS):
+    global _current, _refresher
+    with _lock:
+        if _current is None:
+            path = _current_dir()
+            if path and os.path.isdir(path):
+                _current = CorpIndex(path)
+    if _current is None and api_key:
+        refresh_corp_index(api_key)
+    with _lock:
+        if api_key and _refresher is None:
+            _refresher = threading.Thread(target=_refresh_loop, args=(api_key, interval_hours),
+                                          name="corp-index-refresh", daemon=True)
+            _refresher.start()
+    return _current
+
+
+# cron 등에서 직접 갱신: python -m core.corp_index <API_KEY>
+if __name__ == "__main__":
+    import sys
+    idx = refresh_corp_index(sys.argv[1] if len(sys.argv) > 1 else os.environ["DART_API_KEY"])
+    print(f"{len(idx):,}개 법인 색인 완료 → {idx.path}")
@@ -0,0 +1,127 @@
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from core import config
+from core.metrics import stage
+from core.rate_limit import get_dart_limiter
+
+# --- OpenDART 접속 설정 ---
+# 기본 주소는 환경변수(config)에서, 세션마다 make_session(base_url=...)로 바꿀 수 있다 (부하 하네스/테스트의 대역 서버).
+DART_BASE_URL = config.DART_BASE_URL
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'https://dart.fss.or.kr/',
+    'Accept': 'application/json, text/javascript, */*; q=0.01',
+    'Connection': 'keep-alive'
+}
+
+
+# --- DART 주소로 가는 요청은 공용 제어기(한도/재시도/사용량 기록)를 거친다 ---
+class DartSession(requests.Session):
+    base_url = DART_BASE_URL
+
+    def request(self, method, url, *args, **kwargs):
+        api_key = (kwargs.get('params') or {}).get('crtfc_key')
+        if api_key is None or not str(url).startswith(self.base_url):
+            return super().request(method, url, *args, **kwargs)
+        return get_dart_limiter().call(lambda: super(DartSession, self).request(method, url, *args, **kwargs), api_key)
+
+
+# --- 커넥션 풀을 재사용하는 세션 (keep-alive) ---
+def make_session(pool_size=16, base_url=None):
+    session = DartSession()
+    if base_url:
+        session.base_url = base_url.rstrip("/")
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({'User-Agent': 'Mozilla/5.0', 'Connection': 'keep-alive'})
+    return session
+
+
+def base_url(session):
+    """세션이 요청할 OpenDART 주소 (make_session으로 만들지 않은 세션이면 기본 주소)."""
+    return getattr(session, "base_url", DART_BASE_URL)
+
+
+# --- 공시 목록(list.json) 한 페이지 ---
+def fetch_list_page(session, params, page_no, timeout=10):
+    with stage("list", key=params.get('corp_code')) as s:
+        resp = session.get(f"{base_url(session)}/list.json", params={**params, 'page_no': page_no}, headers=BROWSER_HEADERS, timeout=timeout)
+        s.bytes = len(resp.content)
+        return resp.json()
+
+
+# --- 공시 목록 전체 (total_page까지 모두 수집) ---
+# 첫 페이지에서 total_page를 확인한 뒤 나머지 페이지는 동시에 요청한다.
+# strict=True면 '조회된 데이타 없음(013)' 외의 오류 상태(한도 초과 등)를 빈 결과 대신 예외로 올린다.
+def fetch_report_list(session, api_key, corp_code, start_date, end_date, kind='A', max_workers=4, strict=False):
+    params = {
+        'crtfc_key': api_key,
+        'corp_code': corp_code,
+        'bgn_de': start_date,
+        'end_de': end_date,
+        'pblntf_ty': kind,
+        'page_count': 100
+    }
+    first = fetch_list_page(session, params, 1)
+    if first.get('status') != '000':
+        if strict and first.get('status') != '013':
+            raise ValueError(f"목록 {first.get('status')}: {first.get('message')}")
+        return pd.DataFrame()
+
+    rows = list(first['list'])
+    total_page = int(first.get('total_page') or 1)
+    if total_page > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, total_page - 1)) as pool:
+            for data in pool.map(lambda p: fetch_list_page(session, params, p), range(2, total_page + 1)):
+                if data.get('status') != '000':
+                    raise ValueError(f"목록 {data.get('status')}: {data.get('message')}")
+                rows.extend(data['list'])
+    return pd.DataFrame(rows)
+
+
+# --- 여러 회사 공시 목록을 한 번에 (관심종목 일괄 조회용) ---
+def fetch_report_lists(session, api_key, corp_codes, start_date, end_date, kind='A', max_workers=4):
+    corp_codes = list(dict.fromkeys(corp_codes))
+    if not corp_codes:
+        return pd.DataFrame()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(pool.map(
+            lambda c: fetch_report_list(session, api_key, c, start_date, end_date, kind=kind, max_workers=2),
+            corp_codes
+        ))
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+# --- 원문(document.xml) 다운로드: ZIP 바이트 그대로 반환 ---
+def fetch_document(session, api_key, rcept_no, timeout=15):
+    url = f"{base_url(session)}/document.xml"
+    with stage("download", key=rcept_no) as s:
+        res = session.get(url, params={'crtfc_key': api_key, 'rcept_no': rcept_no}, timeout=timeout)
+        s.bytes = len(res.content)
+        res.raise_for_status()
+        # 키 오류/한도 초과 등은 200 응답에 에러 XML로 온다 (ZIP이 아니면 실패 처리)
+        if not res.content.startswith(b"PK"):
+            raise ValueError(f"원문 ZIP이 아닙니다: {res.text[:200]}")
+        return res.content
+
+
+# --- ZIP 안에서 가장 큰 파일(본문)을 꺼내 문자열로 ---
+def read_document_html(raw):
+    with stage("unzip") as s, zipfile.ZipFile(io.BytesIO(raw)) as z:
+        t_file = max(z.infolist(), key=lambda f: f.file_size).filename
+        raw_data = z.read(t_file)
+        s.bytes = len(raw_data)
+    try:
+        return raw_data.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw_data.decode('euc-kr', 'ignore')
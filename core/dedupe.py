@@ -0,0 +1,86 @@
+import hashlib
+import re
+
+# --- 여러 보고서에 걸친 문단 중복 제거 (번들용) ---
+# 연도별 사업보고서/분기보고서는 회사 개요, 사업 설명, 회계정책 주석 등이 거의 그대로 반복된다.
+# 문단(빈 줄로 구분)을 정규화해 해시하고, 앞서 번들에 들어간 문단이 다시 나오면 참조 한 줄로 바꾼다.
+#   - scope="bundle": 번들 안 모든 앞 보고서와 비교 (처음 나온 곳만 원문 유지)
+#   - scope="delta": 같은 종류(smart_type)의 직전 보고서와만 비교 → 이전 보고서 대비 변경분만 남는다
+# 연속된 중복 문단은 한 줄로 묶는다. 짧은 문단(장 제목 등)은 그대로 둔다.
+# 참조의 "문단 N"은 실제로 써진 파일(머리글 + 중복 제거된 본문)에서 빈 줄로 나눈 N번째 문단이다.
+# 청크 JSONL은 위치(start/end)를 지켜야 하므로 문단 대신 청크 단위로 거른다 (core.chunks.ChunkWriter, 같은 scope).
+# 보고서는 넣는 순서대로 처리된다 (앱에서는 접수일 최신순이므로 가장 최근 보고서가 원문을 가진다).
+
+MIN_CHARS = 40
+_WS_RE = re.compile(r"\s+")
+_PARA_RE = re.compile(r"\n\s*\n")
+
+
+def paragraph_digest(paragraph):
+    """공백을 정규화한 문단 해시 (짧은 문단은 None)."""
+    norm = _WS_RE.sub(" ", paragraph).strip()
+    if len(norm) < MIN_CHARS:
+        return None
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=12).digest()
+
+
+class ParagraphDeduper:
+    def __init__(self, scope="bundle"):
+        self.scope = scope
+        self.seen = {}      # digest → (보고서 이름, 문단 번호)  (scope="bundle")
+        self.previous = {}  # smart_type → {digest: (보고서 이름, 문단 번호)}  (scope="delta")
+        self.chars_in = 0
+        self.chars_out = 0
+        self.removed = 0
+
+    def process(self, text, label, group=None, header=""):
+        """중복 문단을 참조로 바꾼 텍스트를 돌려준다. label은 참조에 적힐 보고서 이름,
+        header는 파일에서 본문 앞에 붙는 머리글 (문단 번호를 파일 기준으로 매기기 위해)."""
+        paragraphs = _PARA_RE.split(text)
+        offset = len(_PARA_RE.split(header + "\0")) - 1  # 머리글이 차지하는 문단 수 (본문 첫 문단은 offset + 1번)
+        if self.scope == "delta":
+            lookup = self.previous.get(group, {})
+            own = {}
+        else:
+            lookup = own = self.seen
+
+        out, run = [], []
+        for para in paragraphs:
+            d = paragraph_digest(para)
+            ref = lookup.get(d) if d is not None else None
+            if ref is not None:
+                run.append(ref)
+                self.removed += 1
+                if d not in own:  # delta: 다음 보고서도 이 문단을 같은 원문 위치로 참조하도록
+                    own[d] = ref
+                continue
+            if run:
+                out.append(self._reference(run))
+                run = []
+            out.append(para)
+            if d is not None and d not in own:
+                own[d] = (label, offset + len(out))
+        if run:
+            out.append(self._reference(run))
+
+        if self.scope == "delta":
+            self.previous[group] = own
+        result = "\n\n".join(out)
+        self.chars_in += len(text)
+        self.chars_out += len(result)
+        return result
+
+    @staticmethod
+    def _reference(run):
+        sources = []
+        for label, no in run:
+            if sources and sources[-1][0] == label and sources[-1][2] == no - 1:
+                sources[-1][2] = no
+            else:
+                sources.append([label, no, no])
+        parts = [f"{label} 문단 {a}" + (f"~{b}" if b != a else "") for label, a, b in sources]
+        return f"[중복 문단 {len(run)}개 생략 → {', '.join(parts)} 참조]"
+
+    def stats(self):
+        saved = 1 - self.chars_out / self.chars_in if self.chars_in else 0.0
+        return {"removed": self.removed, "chars_in": self.chars_in, "chars_out": self.chars_out, "saved": saved}
@@ -0,0 +1,129 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from core import config
+
+# --- 공시 원문/추출 텍스트 디스크 캐시 ---
+# rcept_no가 한번 부여된 공시는 바뀌지 않으므로 영구 보관해도 안전하다.
+# 파일은 키의 sha256으로 저장(content-addressed)하고, 크기와 최근 사용 시각은
+# SQLite 인덱스에 기록해 용량 초과 시 가장 오래 안 쓴 항목부터 지운다(LRU).
+# 여러 페이지/프로세스가 같은 폴더를 공유해도 SQLite 잠금으로 안전하다.
+
+
+def _raw_key(rcept_no):
+    return f"raw:{rcept_no}"
+
+
+def _text_key(rcept_no, version):
+    return f"text:{version}:{rcept_no}"
+
+
+def _structure_key(rcept_no, version):
+    return f"struct:{version}:{rcept_no}"
+
+
+class DocumentCache:
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.path.join(config.DATA_DIR, "doc_cache")
+        self.max_bytes = max_bytes if max_bytes is not None else config.DOC_CACHE_MAX_MB * 1024 * 1024
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used)")
+        self._db.commit()
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    # --- 공통 읽기/쓰기 ---
+    def _get(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return data
+
+    def _put(self, key, data):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, digest, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, digest, len(data), time.time()),
+            )
+            self._db.commit()
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, digest, size in self._db.execute("SELECT key, digest, size FROM entries ORDER BY last_used"):
+                if total <= self.max_bytes:
+                    break
+                victims.append((key, digest))
+                total -= size
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+            self._db.commit()
+        for _, digest in victims:
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+
+    # --- 원문 ZIP ---
+    def get_raw(self, rcept_no):
+        return self._get(_raw_key(rcept_no))
+
+    def put_raw(self, rcept_no, raw):
+        self._put(_raw_key(rcept_no), raw)
+
+    # --- 추출 텍스트 (추출기 버전별) ---
+    def get_text(self, rcept_no, version):
+        data = self._get(_text_key(rcept_no, version))
+        return None if data is None else zlib.decompress(data).decode("utf-8")
+
+    def put_text(self, rcept_no, version, text):
+        self._put(_text_key(rcept_no, version), zlib.compress(text.encode("utf-8"), 6))
+
+    # --- 장 색인 + 표 데이터 ({"sections": [...], "tables": [Table.to_dict(), ...]}, JSON) ---
+    def get_structure(self, rcept_no, version):
+        data = self._get(_structure_key(rcept_no, version))
+        return None if data is None else json.loads(zlib.decompress(data).decode("utf-8"))
+
+    def put_structure(self, rcept_no, version, structure):
+        self._put(_structure_key(rcept_no, version), zlib.compress(json.dumps(structure, ensure_ascii=False).encode("utf-8"), 6))
+
+    def stats(self):
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+
+# --- 프로세스 전체에서 공유하는 기본 캐시 ---
+@functools.lru_cache(maxsize=None)
+def get_document_cache():
+    return DocumentCache()
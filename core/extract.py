@@ -0,0 +1,157 @@
+import hashlib
+import os
+import re
+from bs4 import BeautifulSoup
+from core.metrics import stage
+from core.extract_stream import extract_ai_text_stream, extract_full_text_stream, section_index_from_text
+
+# 추출 로직(블랙리스트 등)을 바꾸면 올려주세요. 캐시된 텍스트가 자동으로 무효화됩니다.
+EXTRACTOR_VERSION = 2  # v2: 표 격자 변환 (중첩 표 1회, colspan/rowspan 반영)
+
+# [블랙리스트 필터링 - AI 분석용 토큰 절약]
+BLACKLIST = ["V. 회계감사인", "VI. 이사회", "X. 대주주", "XII. 상세표"]
+ALL_MARKERS = [
+    "I. 회사의 개요", "II. 사업의 내용", "III. 재무에 관한 사항",
+    "IV. 이사의 진단", "V. 회계감사인", "VI. 이사회", "VII. 주주에 관한 사항",
+    "VIII. 임원 및 직원", "IX. 계열회사", "X. 대주주", "XI. 그 밖에 투자자 보호",
+    "XII. 상세표", "【", "첨부서류"
+]
+
+
+# 추출 엔진: "stream"(단일 패스, 기본값) / "lxml"(단일 패스, libxml2 토크나이저) / "bs4"(기존 트리 방식)
+# stream/lxml은 표를 격자로 변환한다(core.tables). bs4는 예전 방식(중첩 표 중복, span 무시) 그대로이며,
+# stream에 table_mode="legacy"를 주면 bs4와 결과가 항상 같다. lxml은 깨진 HTML에서는 다를 수 있다.
+DEFAULT_ENGINE = os.environ.get("DART_EXTRACT_ENGINE", "stream")
+
+
+# --- AI용 텍스트 + 장 위치 색인 ---
+# sections: [{"title": "I. 회사의 개요", "start": 0, "end": 1234}, ...] (text 기준 문자 위치)
+# 블랙리스트 장은 표 변환 전에 건너뛰므로 색인에도 나오지 않는다.
+def extract_ai_sections(html_content, engine=None):
+    engine = engine or DEFAULT_ENGINE
+    if engine != "bs4":
+        return extract_ai_text_stream(html_content, BLACKLIST, ALL_MARKERS, driver=engine)
+    text = extract_ai_friendly_text(html_content, engine="bs4")
+    return text, section_index_from_text(text, ALL_MARKERS)
+
+
+# --- 텍스트 + 장 색인 + 표 데이터 (표 파일 저장 / 청크 내보내기용) ---
+# tables: 본문에 나온 순서대로 core.tables.Table (블랙리스트 장의 표는 제외, start/end는 text 기준 위치)
+# 표 구조는 단일 패스 엔진에서만 나오므로 bs4 엔진이면 stream으로 대신 처리한다.
+def extract_ai_document(html_content, engine=None):
+    engine = engine or DEFAULT_ENGINE
+    tables = []
+    text, sections = extract_ai_text_stream(html_content, BLACKLIST, ALL_MARKERS,
+                                            driver="stream" if engine == "bs4" else engine, table_sink=tables.append)
+    return text, sections, tables
+
+
+def extract_full_document(html_content, engine=None):
+    engine = engine or DEFAULT_ENGINE
+    tables = []
+    text = extract_full_text_stream(html_content, driver="stream" if engine == "bs4" else engine,
+                                    table_sink=tables.append)
+    return text, [], tables
+
+
+# --- AI용 텍스트 변환 (표 → 마크다운, 목차/네비 제거, 블랙리스트 장 제외) ---
+def extract_ai_friendly_text(html_content, engine=None):
+    engine = engine or DEFAULT_ENGINE
+    if engine != "bs4":
+        return extract_ai_sections(html_content, engine=engine)[0]
+    with stage("parse") as st:
+        st.bytes = len(html_content)
+        soup = BeautifulSoup(html_content, "html.parser")
+        for s in soup(["script", "style", "head", "svg", "img"]):
+            s.decompose()
+            
+        for nav in soup.find_all(string=re.compile(r"본문\s*위치로\s*이동|목차|TOP")):
+            nav.extract()
+
+        for table in soup.find_all("table"):
+            rows = []
+            headers = [th.get_text(strip=True) for th in table.find_all("th")]
+            if headers:
+                rows.append("| " + " | ".join(headers) + " |")
+                rows.append("| " + " | ".join(["---"] * len(headers)) + " |")
+            for tr in table.find_all("tr"):
+                cells = [td.get_text(strip=True) for td in tr.find_all("td")]
+                if cells:
+                    rows.append("| " + " | ".join(cells) + " |")
+            if rows:
+                table_md = "\n" + "\n".join(rows) + "\n"
+                table.replace_with(table_md)
+                
+        raw_text = soup.get_text(separator="\n")
+    lines = raw_text.split('\n')
+
+    with stage("filter"):
+        extracted_lines = []
+        skip_mode = False
+        for line in lines:
+            clean_line = line.strip()
+            if any(clean_line.startswith(m) for m in ALL_MARKERS):
+                skip_mode = any(clean_line.startswith(b) for b in BLACKLIST)
+                    
+            if not skip_mode: 
+                extracted_lines.append(line)
+            
+    filtered_text = "\n".join(extracted_lines)
+    filtered_text = re.sub(r' +', ' ', filtered_text)
+    filtered_text = re.sub(r'\n\s*\n+', '\n\n', filtered_text)
+    filtered_text = re.sub(r'[-=+#]{5,}', '', filtered_text)
+    return filtered_text.strip()
+
+
+# --- 전체 텍스트 변환 (표만 마크다운으로, 장 필터링 없음) ---
+def extract_full_text(html_content, engine=None):
+    engine = engine or DEFAULT_ENGINE
+    if engine != "bs4":
+        return extract_full_text_stream(html_content, driver=engine)
+    soup = BeautifulSoup(html_content, "html.parser")
+    for s in soup(["script", "style", "head", "svg", "img"]):
+        s.decompose()
+    
+    # 표를 마크다운 스타일로 변환
+    for table in soup.find_all("table"):
+        rows = []
+        headers = [th.get_text(strip=True) for th in table.find_all("th")]
+        if headers:
+            rows.append("| " + " | ".join(headers) + " |")
+            rows.append("| " + " | ".join(["---"] * len(headers)) + " |")
+        for tr in table.find_all("tr"):
+            cells = [td.get_text(strip=True) for td in tr.find_all("td")]
+            if cells:
+                rows.append("| " + " | ".join(cells) + " |")
+        table_md = "\n" + "\n".join(rows) + "\n"
+        table.replace_with(table_md)
+
+    text = soup.get_text(separator="\n")
+    return re.sub(r'\n\s*\n+', '\n\n', text).strip()
+
+
+EXTRACTORS = {
+    "ai": extract_ai_friendly_text,
+    "full": extract_full_text,
+}
+
+# (텍스트, 장 색인, 표 목록)을 돌려주는 버전
+STRUCTURED_EXTRACTORS = {
+    "ai": extract_ai_document,
+    "full": extract_full_document,
+}
+
+
+# 실제로 결과를 만드는 엔진 (구조 포함 추출은 bs4 대신 stream으로 처리한다 — extract_ai_document 참고)
+def effective_engine(structured=False, engine=None):
+    engine = engine or DEFAULT_ENGINE
+    return "stream" if structured and engine == "bs4" else engine
+
+
+# --- 캐시 키에 들어가는 추출기 버전 (버전 + 블랙리스트 내용 + 실제 엔진) ---
+# 엔진마다 텍스트(와 장/표 위치)가 다르므로, 같은 설정이라도 구조 포함 여부에 따라 엔진이 다르면 키도 다르다.
+def extractor_version(name, structured=False, engine=None):
+    digest = hashlib.sha1("|".join(BLACKLIST + ALL_MARKERS).encode("utf-8")).hexdigest()[:8]
+    engine = effective_engine(structured, engine)
+    suffix = "" if engine == "stream" else f"-{engine}"
+    return f"{name}-v{EXTRACTOR_VERSION}-{digest}{suffix}"
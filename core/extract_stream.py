@@ -0,0 +1,570 @@
+import re
+from html.parser import HTMLParser
+
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+from core.tables import TableBuilder
+
+# --- 단일 패스(스트리밍) 텍스트 추출 엔진 ---
+# BeautifulSoup 트리를 만들지 않고 파서 이벤트(start/end/data)만 따라가며
+# core.extract의 기존 결과와 바이트 단위로 같은 텍스트를 만든다.
+#   - 문자열 경계/공백 처리/빈 태그/닫는 태그 규칙은 bs4 html.parser 트리빌더와 동일
+#   - 표는 가장 바깥 <table>이 열려 있는 동안만 셀 텍스트를 모은다 (표 단위 메모리)
+#   - 표 변환 방식(table_mode): "grid"(기본, core.tables: 셀 한 번 방문, 중첩 표 분리, colspan/rowspan 배치)
+#     / "legacy"(예전 bs4 find_all 방식 그대로: 중첩 표 행 중복, span 무시 — bs4 결과와 비교용)
+#   - 블랙리스트 장 안에서 시작한 표는 마크다운 조립/줄 처리를 건너뛴다 (어차피 버려질 내용)
+#   - 줄 단위 블랙리스트 필터와 정규식 정리는 안전한 줄 경계에서 블록별로 수행
+# 드라이버는 두 가지: "stream"(표준 html.parser 토크나이저, 결과 동일 보장),
+# "lxml"(libxml2 토크나이저, 가장 빠름. 정상적인 DART 문서에서 결과 동일).
+
+REMOVE_TAGS = {"script", "style", "head", "svg", "img"}
+PRESERVE_WS_TAGS = {"pre", "textarea"}
+STRING_CONTAINER_TAGS = {"rt", "rp", "style", "script", "template"}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link",
+    "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex", "nextid", "spacer",
+}
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+NAV_RE = re.compile(r"본문\s*위치로\s*이동|목차|TOP")
+SECTION_MARK = "\ue000"
+TABLE_MARK = "\ue001"  # 격자 표 첫 줄 앞 표식 (최종 텍스트에서 표 위치를 읽는 데 사용)
+MARK_RE = re.compile("[\ue000\ue001]")
+CHUNK_SIZE = 1 << 16
+BLOCK_LINES = 512
+
+_TEXT, _CDATA, _IGNORED = 0, 1, 2
+
+
+class _Element:
+    __slots__ = ("name", "removed", "preserve", "container", "role", "ref")
+
+    def __init__(self, name):
+        self.name = name
+        self.removed = name in REMOVE_TAGS
+        self.preserve = name in PRESERVE_WS_TAGS
+        self.container = name in STRING_CONTAINER_TAGS
+        self.role = None
+        self.ref = None
+
+
+# --- 트리 없이 bs4와 같은 문자열/표 결과를 만드는 이벤트 처리기 ---
+class TextEventHandler:
+    def __init__(self, sink, nav_filter=True, keep_empty_tables=False, skip_probe=None, marker_probe=None,
+                 table_mode="grid", section_probe=None, table_sink=None):
+        self.sink = sink
+        self.skip_probe = skip_probe
+        self.marker_probe = marker_probe
+        self.grid = table_mode == "grid"
+        self.section_probe = section_probe
+        self.table_sink = table_sink
+        self.table_count = 0
+        self.emitted_tables = []
+        self.builders = []
+        self.nav_filter = nav_filter
+        self.keep_empty_tables = keep_empty_tables
+        self.stack = []
+        self.open_count = {}
+        self.buf = []
+        self.removed = 0
+        self.preserve = 0
+        self.container = 0
+        self.tables = 0
+        self._reset_table()
+
+    def _reset_table(self):
+        self.skim = False
+        self.skim_safe = True
+        self.t_strings = []
+        self.headers = []
+        self.rows = []
+        self.open_ths = []
+        self.open_trs = []
+        self.open_tds = []
+
+    # --- 문자열 (bs4 endData) ---
+    def flush(self, kind=_TEXT):
+        if not self.buf:
+            return
+        s = "".join(self.buf)
+        self.buf = []
+        if not self.preserve and not s.strip(ASCII_SPACES):
+            s = "\n" if "\n" in s else " "
+        if kind == _IGNORED or self.removed:
+            return
+        if kind == _TEXT and self.container:
+            return
+        if self.nav_filter and NAV_RE.search(s):
+            return
+        if self.tables and self.grid:
+            self.builders[-1].text(s)
+        elif self.tables:
+            self.t_strings.append(s)
+            stripped = s.strip()
+            if self.skim and self.skim_safe and "\n" in stripped and (self.open_ths or self.open_tds):
+                # 셀 안 줄바꿈 뒤에 장 제목이 올 수 있으면 건너뛰기를 포기하고 정상 변환
+                self.skim_safe = not any(self.marker_probe(seg) for seg in stripped.split("\n")[1:])
+            if stripped:
+                for parts in self.open_ths:
+                    parts.append(stripped)
+                for parts in self.open_tds:
+                    parts.append(stripped)
+        else:
+            self.sink(s)
+
+    def data(self, text):
+        self.buf.append(text)
+
+    def special(self, text, kind):
+        self.flush()
+        self.buf.append(text)
+        self.flush(kind)
+
+    # --- 태그 ---
+    def start(self, name, attrs=None):
+        self.flush()
+        el = _Element(name)
+        self.stack.append(el)
+        self.open_count[name] = self.open_count.get(name, 0) + 1
+        self.removed += el.removed
+        self.preserve += el.preserve
+        self.container += el.container
+        if self.removed:
+            return
+        if self.grid:
+            self._start_grid(el, attrs)
+            return
+        if name == "table":
+            if not self.tables:
+                self._reset_table()
+                # 블랙리스트 장 안에서 시작한 표: 마크다운 변환 없이 구조만 따라간다
+                self.skim = bool(self.skip_probe and self.skip_probe())
+            self.tables += 1
+            el.role = "table"
+        elif self.tables and name == "th":
+            el.ref = []
+            self.headers.append(el.ref)
+            self.open_ths.append(el.ref)
+            el.role = "th"
+        elif self.tables and name == "tr":
+            el.ref = []
+            self.rows.append(el.ref)
+            self.open_trs.append(el.ref)
+            el.role = "tr"
+        elif self.tables and name == "td":
+            el.ref = []
+            for row in self.open_trs:
+                row.append(el.ref)
+            self.open_tds.append(el.ref)
+            el.role = "td"
+
+    def _start_grid(self, el, attrs):
+        name = el.name
+        if name == "table":
+            if not self.tables:
+                self.skim = bool(self.skip_probe and self.skip_probe())
+                section = self.section_probe() if self.section_probe else None
+            else:
+                section = self.builders[0].section
+            el.ref = TableBuilder(section, depth=self.tables)
+            self.builders.append(el.ref)
+            self.tables += 1
+            el.role = "table"
+        elif not self.tables:
+            return
+        elif name == "tr":
+            el.ref = (self.builders[-1], self.builders[-1].start_row())
+            el.role = "g_tr"
+        elif name in ("td", "th"):
+            el.ref = (self.builders[-1], self.builders[-1].start_cell(name == "th", attrs))
+            el.role = "g_td"
+        elif name == "thead":
+            el.ref = self.builders[-1]
+            el.ref.thead += 1
+            el.role = "g_thead"
+
+    def end(self, name):
+        self.flush()
+        if not self.open_count.get(name):
+            return
+        while self.stack:
+            el = self.stack.pop()
+            self._close(el)
+            if el.name == name:
+                break
+
+    def _close(self, el):
+        self.open_count[el.name] -= 1
+        self.removed -= el.removed
+        self.preserve -= el.preserve
+        self.container -= el.container
+        if el.role == "table" and self.grid:
+            self.tables -= 1
+            self.builders.pop()
+            if self.builders:
+                self.builders[-1].children.append(el.ref)
+            else:
+                self._emit_grid(el.ref)
+        elif el.role == "g_tr":
+            el.ref[0].end_row(el.ref[1])
+        elif el.role == "g_td":
+            el.ref[0].end_cell(el.ref[1])
+        elif el.role == "g_thead":
+            el.ref.thead -= 1
+        elif el.role == "table":
+            self.tables -= 1
+            if not self.tables:
+                self._emit_table()
+        elif el.role == "th":
+            self.open_ths.pop()
+        elif el.role == "tr":
+            self.open_trs.pop()
+        elif el.role == "td":
+            self.open_tds.pop()
+
+    def _emit_table(self):
+        if self.skim and self.skim_safe and (self.headers or any(self.rows)):
+            # 표 줄은 모두 블랙리스트 구간에서 버려지므로 줄 구조만 같은 자리표시자를 보낸다
+            self.sink("\n|\n")
+            self._reset_table()
+            return
+        rows = []
+        if self.headers:
+            headers = ["".join(p) for p in self.headers]
+            rows.append("| " + " | ".join(headers) + " |")
+            rows.append("| " + " | ".join(["---"] * len(headers)) + " |")
+        for row in self.rows:
+            cells = ["".join(p) for p in row]
+            if cells:
+                rows.append("| " + " | ".join(cells) + " |")
+        if rows or self.keep_empty_tables:
+            self.sink("\n" + "\n".join(rows) + "\n")
+        else:
+            for s in self.t_strings:
+                self.sink(s)
+        self._reset_table()
+
+    # 바깥 표 → 그 안의 중첩 표 순서(깊이 우선)로 각각 한 번씩 마크다운으로
+    def _emit_grid(self, root):
+        builders, todo = [], [root]
+        while todo:
+            b = todo.pop()
+            builders.append(b)
+            todo.extend(reversed(b.children))
+        with_rows = [b for b in builders if b.has_rows()]
+        if self.skim and with_rows:
+            # 블랙리스트 장 안의 표: 줄은 모두 버려지므로 격자 배치 없이 자리표시자만
+            self.sink("\n|\n")
+            self.skim = False
+            return
+        self.skim = False
+        blocks = []
+        for b in with_rows:
+            table = b.finish()
+            table.index = self.table_count
+            self.table_count += 1
+            self.emitted_tables.append(table)
+            if self.table_sink is not None:
+                self.table_sink(table)
+            blocks.append(TABLE_MARK + table.markdown())
+        if blocks:
+            self.sink("\n" + "\n\n".join(blocks) + "\n")
+        elif self.keep_empty_tables:
+            self.sink("\n\n")
+        else:
+            for b in builders:
+                for s in b.loose:
+                    self.sink(s)
+
+    def close(self):
+        self.flush()
+        while self.stack:
+            self._close(self.stack.pop())
+
+
+# --- 드라이버 1: 표준 html.parser (bs4 BeautifulSoupHTMLParser와 같은 규칙) ---
+class _StdlibDriver(HTMLParser):
+    def __init__(self, handler):
+        super().__init__(convert_charrefs=False)
+        self.h = handler
+        self.already_closed_empty_element = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self.h.start(tag, attrs)
+        if tag in VOID_TAGS and handle_empty_element:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.already_closed_empty_element.append(tag)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self.already_closed_empty_element:
+            self.already_closed_empty_element.remove(tag)
+        else:
+            self.h.end(tag)
+
+    def handle_data(self, data):
+        self.h.data(data)
+
+    def handle_charref(self, name):
+        base, digits = 10, name
+        if name.startswith(("x", "X")):
+            base, digits = 16, name[1:]
+        pattern = r"^([0-9a-f]+)(.*)" if base == 16 else r"^([0-9]+)(.*)"
+        dereferenced, extra_data = "", ""
+        try:
+            real_name = int(digits, base)
+        except ValueError:
+            match = re.search(pattern, digits)
+            real_name = int(match.group(1), base) if match else None
+            extra_data = match.group(2) if match else digits
+        if real_name is not None:
+            dereferenced, _ = UnicodeDammit.numeric_character_reference(real_name)
+        if dereferenced is not None:
+            self.h.data(dereferenced)
+        if extra_data is not None:
+            self.h.data(extra_data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.h.data(character if character is not None else "&%s" % name)
+
+    def handle_comment(self, data):
+        self.h.special(data, _IGNORED)
+
+    def handle_decl(self, decl):
+        self.h.special(decl, _IGNORED)
+
+    def unknown_decl(self, data):
+        if data.upper().startswith("CDATA["):
+            self.h.special(data[len("CDATA["):], _CDATA)
+        else:
+            self.h.special(data, _IGNORED)
+
+    def handle_pi(self, data):
+        self.h.special(data, _IGNORED)
+
+
+def _feed_stdlib(html_content, handler):
+    parser = _StdlibDriver(handler)
+    for i in range(0, len(html_content), CHUNK_SIZE):
+        parser.feed(html_content[i:i + CHUNK_SIZE])
+    parser.close()
+    handler.close()
+
+
+# --- 드라이버 2: lxml (libxml2 SAX target) ---
+class _LxmlTarget:
+    def __init__(self, handler):
+        self.h = handler
+
+    def start(self, tag, attrib):
+        self.h.start(tag, attrib)
+
+    def end(self, tag):
+        self.h.end(tag)
+
+    def data(self, data):
+        self.h.data(data)
+
+    def comment(self, text):
+        self.h.special(text, _IGNORED)
+
+    def pi(self, target, data=None):
+        self.h.special(target, _IGNORED)
+
+    def close(self):
+        self.h.close()
+
+
+def _feed_lxml(html_content, handler):
+    from lxml import etree
+    parser = etree.HTMLParser(target=_LxmlTarget(handler), remove_blank_text=False, remove_comments=False)
+    for i in range(0, len(html_content), CHUNK_SIZE):
+        parser.feed(html_content[i:i + CHUNK_SIZE])
+    parser.close()
+
+
+DRIVERS = {"stream": _feed_stdlib, "lxml": _feed_lxml}
+
+
+# --- 줄 단위 처리 + 블록별 정규식 정리 ---
+# 블록 경계는 "앞 줄에 공백/[-=+#] 이외의 글자가 있고, 다음 줄이 공백이 아닌 글자로 시작"하는
+# 줄 사이로만 잡는다. 그런 경계는 어떤 정리 정규식도 가로지를 수 없으므로
+# 블록별 결과를 이어 붙이면 전체 문자열에 한 번에 적용한 결과와 같다.
+def _solid_line(line):
+    return any(not ch.isspace() and ch not in "-=+#" for ch in line)
+
+
+class _TextAssembler:
+    def __init__(self, clean, blacklist=None, markers=None):
+        self.clean = clean
+        self.blacklist = blacklist
+        self.markers = markers
+        self.marks_ok = True
+        self.skip_mode = False
+        self.title = None
+        self.table_spans = []
+        self.first_piece = True
+        self.partial = []
+        self.block = []
+        self.out = []
+
+    # get_text(separator="\n")에 해당: 문자열 사이에 \n
+    def feed(self, s):
+        if self.first_piece:
+            self.first_piece = False
+        else:
+            s = "\n" + s
+        parts = s.split("\n")
+        if len(parts) == 1:
+            self.partial.append(s)
+            return
+        self._line("".join(self.partial) + parts[0])
+        for line in parts[1:-1]:
+            self._line(line)
+        self.partial = [parts[-1]]
+
+    # 지금 줄(partial)이 끝난 뒤의 skip 상태. 다음 문자열은 항상 \n 뒤에 붙으므로
+    # partial은 더 늘어나지 않고, 표가 시작되는 시점에 미리 판단할 수 있다.
+    def skipping(self):
+        if self.markers is None:
+            return False
+        clean_line = "".join(self.partial).strip()
+        if any(clean_line.startswith(m) for m in self.markers):
+            return any(clean_line.startswith(b) for b in self.blacklist)
+        return self.skip_mode
+
+    # 지금 위치가 속한 장 제목 (표가 시작되는 시점에 표의 소속 장으로 기록)
+    def section(self):
+        if self.markers is None:
+            return None
+        clean_line = "".join(self.partial).strip()
+        if any(clean_line.startswith(m) for m in self.markers):
+            return clean_line
+        return self.title
+
+    # 셀 안 줄바꿈 뒤 조각(seg)으로 시작하는 줄이 장 제목일 수 있는지
+    def may_start_marker(self, seg):
+        head = seg.lstrip()
+        return not head or any(head.startswith(m) or m.startswith(head) for m in self.markers)
+
+    def _line(self, line):
+        if SECTION_MARK in line or (TABLE_MARK in line and not (line.startswith(TABLE_MARK + "|")
+                                                                 and line.count(TABLE_MARK) == 1)):
+            self.marks_ok = False
+        if self.markers is not None:
+            clean_line = line.strip()
+            is_marker = any(clean_line.startswith(m) for m in self.markers)
+            if is_marker:
+                self.skip_mode = any(clean_line.startswith(b) for b in self.blacklist)
+                self.title = clean_line
+            if self.skip_mode:
+                return
+            if is_marker:
+                # 장 제목 앞에 표식을 넣어 두고 마지막에 위치를 읽는다 (정리 정규식에 영향 없음)
+                lead = len(line) - len(line.lstrip())
+                line = line[:lead] + SECTION_MARK + line[lead:]
+        if (len(self.block) >= BLOCK_LINES and line[:1] and not line[0].isspace()
+                and _solid_line(self.block[-1])):
+            self._flush_block()
+        self.block.append(line)
+
+    def _flush_block(self):
+        if self.block:
+            self.out.append(self.clean("\n".join(self.block)))
+            self.block = []
+
+    # (텍스트, 장 색인). 격자 표의 위치는 table_spans에 [(start, end), ...]로 남는다.
+    def close(self):
+        self._line("".join(self.partial))
+        self._flush_block()
+        text = "\n".join(self.out).strip()
+        if not self.marks_ok:  # 본문에 표식 문자가 원래 있던 경우: 표식 없이 다시 계산
+            text = MARK_RE.sub("", text)
+            self.table_spans = None
+            return text, ([] if self.markers is None else section_index_from_text(text, self.markers))
+        pieces = MARK_RE.split(text)
+        kinds = MARK_RE.findall(text)
+        sections, table_starts, pos = [], [], len(pieces[0])
+        for kind, piece in zip(kinds, pieces[1:]):
+            if kind == SECTION_MARK:
+                sections.append({"title": piece.split("\n", 1)[0].strip(), "start": pos, "end": None})
+            else:
+                table_starts.append(pos)
+            pos += len(piece)
+        for cur, nxt in zip(sections, sections[1:]):
+            cur["end"] = nxt["start"]
+        if sections:
+            sections[-1]["end"] = pos
+        text = "".join(pieces)
+        self.table_spans = [(start, _table_end(text, start)) for start in table_starts]
+        return text, sections
+
+
+# 표는 "|"로 시작하는 줄이 이어지는 구간
+def _table_end(text, start):
+    pos = start
+    while True:
+        nl = text.find("\n", pos)
+        if nl == -1:
+            return len(text)
+        if not text.startswith("|", nl + 1):
+            return nl
+        pos = nl + 1
+
+
+# --- 완성된 텍스트에서 장 위치 색인 만들기 (bs4 엔진/예외 상황용) ---
+def section_index_from_text(text, markers):
+    sections, pos = [], 0
+    for line in text.split("\n"):
+        clean_line = line.strip()
+        if any(clean_line.startswith(m) for m in markers):
+            start = pos + len(line) - len(line.lstrip())
+            sections.append({"title": clean_line, "start": start, "end": None})
+        pos += len(line) + 1
+    for cur, nxt in zip(sections, sections[1:]):
+        cur["end"] = nxt["start"]
+    if sections:
+        sections[-1]["end"] = len(text)
+    return sections
+
+
+def _clean_ai(text):
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n\n', text)
+    return re.sub(r'[-=+#]{5,}', '', text)
+
+
+def _clean_full(text):
+    return re.sub(r'\n\s*\n+', '\n\n', text)
+
+
+# (텍스트, 장 위치 색인) — 색인 항목: {"title", "start", "end"} (최종 텍스트 기준 문자 위치)
+# table_sink를 주면 본문에 나간 표(core.tables.Table)를 순서대로 넘겨 준다 (블랙리스트 장의 표는 제외)
+def extract_ai_text_stream(html_content, blacklist, markers, driver="stream", table_mode="grid", table_sink=None):
+    asm = _TextAssembler(_clean_ai, blacklist, markers)
+    handler = TextEventHandler(asm.feed, nav_filter=True, skip_probe=asm.skipping, marker_probe=asm.may_start_marker,
+                               table_mode=table_mode, section_probe=asm.section, table_sink=table_sink)
+    DRIVERS[driver](html_content, handler)
+    return _finish(asm, handler)
+
+
+def extract_full_text_stream(html_content, driver="stream", table_mode="grid", table_sink=None):
+    asm = _TextAssembler(_clean_full)
+    handler = TextEventHandler(asm.feed, nav_filter=False, keep_empty_tables=True,
+                               table_mode=table_mode, table_sink=table_sink)
+    DRIVERS[driver](html_content, handler)
+    return _finish(asm, handler)[0]
+
+
+# 본문에 나간 표마다 최종 텍스트 기준 위치(start/end)를 적어 준다
+def _finish(asm, handler):
+    text, sections = asm.close()
+    spans = asm.table_spans
+    ok = spans is not None and len(spans) == len(handler.emitted_tables)
+    for i, table in enumerate(handler.emitted_tables):
+        table.start, table.end = spans[i] if ok else (None, None)
+    return text, sections
@@ -0,0 +1,396 @@
+import collections
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- 여러 종목 기술적 지표 한 번에 계산 (종목 × 봉) ---
+# 종목마다 자기 봉 순서대로 오른쪽 정렬한 2차원 배열(앞쪽 빈 칸은 NaN)을 만들고,
+# 이동평균/볼린저/MACD/RSI/거래량 평균/60일 고저를 열 하나씩이 아니라 전체 배열에 한 번씩 계산한다.
+#   - 종목 하나의 결과는 pandas로 계산하던 calculate_indicators와 같다 (rolling: 윈도 안 값이 모두 있어야,
+#     ewm: adjust=True 재귀식 그대로, RSI: 첫 diff를 0으로 보는 것까지 동일)
+#   - dtype=np.float32면 메모리/대역폭이 절반 (값은 float32 정밀도만큼 달라진다)
+#   - 종목 묶음(block) 단위로 계산해 슬라이딩 윈도 임시 배열이 캐시/메모리를 넘치지 않게 한다
+
+INDICATOR_COLUMNS = [
+    "MA5", "MA20", "MA60", "MA120", "std", "Upper", "Lower", "BandWidth",
+    "EMA12", "EMA26", "MACD", "Signal", "Hist", "RSI", "Vol_MA5", "Vol_MA20", "High60", "Low60",
+]
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+BLOCK_BYTES = 64 << 20  # 묶음당 슬라이딩 윈도 임시 배열 상한
+
+
+class Panel:
+    """tickers × days 배열 묶음. 각 행은 그 종목의 최근 봉들을 오른쪽에 맞춰 담는다."""
+
+    def __init__(self, tickers, arrays, dates):
+        self.tickers = list(tickers)
+        self.arrays = arrays  # {"Close": 2D, ...}
+        self.dates = dates    # 종목별 날짜 인덱스 (오른쪽 정렬, 길이 = 실제 봉 수)
+
+    @property
+    def shape(self):
+        return self.arrays["Close"].shape
+
+
+def build_panel(frames, length=None, dtype=np.float64):
+    """frames: {ticker: OHLCV DataFrame} → Panel. length를 주면 종목마다 최근 length개 봉만."""
+    tickers = list(frames)
+    length = length or max((len(df) for df in frames.values()), default=0)
+    arrays = {col: np.full((len(tickers), length), np.nan, dtype=dtype) for col in PRICE_COLUMNS}
+    dates = []
+    for i, ticker in enumerate(tickers):
+        df = frames[ticker].iloc[-length:] if length else frames[ticker].iloc[:0]
+        n = len(df)
+        for col in PRICE_COLUMNS:
+            if col in df and n:
+                arrays[col][i, length - n:] = df[col].to_numpy(dtype=np.float64)
+        dates.append(df.index)
+    return Panel(tickers, arrays, dates)
+
+
+def _pad(values, w, total):
+    out = np.full(values.shape[:-1] + (total,), np.nan, dtype=values.dtype)
+    out[..., w - 1:] = values
+    return out
+
+
+def _rolling(x, w, how):
+    days = x.shape[1]
+    if days < w:
+        return np.full_like(x, np.nan)
+    win = sliding_window_view(x, w, axis=1)
+    if how == "mean":
+        values = win.sum(axis=-1) / w
+    elif how == "max":
+        values = win.max(axis=-1)
+    elif how == "min":
+        values = win.min(axis=-1)
+    elif how == "std":  # 표본표준편차 (ddof=1)
+        mean = win.sum(axis=-1, keepdims=True) / w
+        values = np.sqrt(((win - mean) ** 2).sum(axis=-1) / (w - 1))
+    else:
+        raise ValueError(how)
+    return _pad(values, w, days)
+
+
+def _ewm(x, span):
+    """pandas ewm(span, adjust=True).mean()과 같은 재귀식을 종목 전체에 대해 한 번에."""
+    alpha = 2.0 / (span + 1.0)
+    decay = x.dtype.type(1.0 - alpha)
+    one = x.dtype.type(1.0)
+    out = np.empty_like(x)
+    if x.shape[1] == 0:  # 봉이 하나도 없는 패널
+        return out
+    weighted = x[:, 0].copy()
+    old_wt = np.ones(x.shape[0], dtype=x.dtype)
+    out[:, 0] = weighted
+    for t in range(1, x.shape[1]):
+        cur = x[:, t]
+        obs = cur == cur
+        started = weighted == weighted
+        upd = started & obs
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        new = np.where(upd & (weighted != cur), (old_wt * weighted + cur) / (old_wt + one), weighted)
+        weighted = np.where(upd, new, np.where(~started & obs, cur, weighted))
+        old_wt = np.where(upd, old_wt + one, old_wt)
+        out[:, t] = weighted
+    return out
+
+
+def _first_valid(x):
+    valid = ~np.isnan(x)
+    first = valid.argmax(axis=1)
+    first[~valid.any(axis=1)] = x.shape[1]
+    return first
+
+
+def _block(close, high, low, volume):
+    days = close.shape[1]
+    out = {}
+    out["MA5"] = _rolling(close, 5, "mean")
+    out["MA20"] = _rolling(close, 20, "mean")
+    out["MA60"] = _rolling(close, 60, "mean")
+    out["MA120"] = _rolling(close, 120, "mean")
+
+    out["std"] = _rolling(close, 20, "std")
+    out["Upper"] = out["MA20"] + out["std"] * 2
+    out["Lower"] = out["MA20"] - out["std"] * 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["BandWidth"] = (out["Upper"] - out["Lower"]) / out["MA20"] * 100
+
+    out["EMA12"] = _ewm(close, 12)
+    out["EMA26"] = _ewm(close, 26)
+    out["MACD"] = out["EMA12"] - out["EMA26"]
+    out["Signal"] = _ewm(out["MACD"], 9)
+    out["Hist"] = out["MACD"] - out["Signal"]
+
+    # RSI: 첫 봉의 diff(NaN)는 상승/하락 0으로 본다 (pandas where(..., 0)와 같음) → 종목의 첫 봉부터 14개 윈도
+    delta = np.full_like(close, np.nan)
+    delta[:, 1:] = close[:, 1:] - close[:, :-1]
+    gain = np.where(delta > 0, delta, 0).astype(close.dtype)
+    loss = np.where(delta < 0, -delta, 0).astype(close.dtype)
+    pos = np.arange(days)[None, :] - _first_valid(close)[:, None]
+    gain, loss = np.where(pos >= 0, gain, np.nan), np.where(pos >= 0, loss, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = _rolling(gain, 14, "mean") / _rolling(loss, 14, "mean")
+        out["RSI"] = 100 - (100 / (1 + rs))
+
+    out["Vol_MA5"] = _rolling(volume, 5, "mean")
+    out["Vol_MA20"] = _rolling(volume, 20, "mean")
+    out["High60"] = _rolling(high, 60, "max")
+    out["Low60"] = _rolling(low, 60, "min")
+    return out
+
+
+def compute_panel(panel, dtype=None, block_bytes=BLOCK_BYTES):
+    """Panel → {지표 이름: tickers × days 배열}. dtype을 주면 그 정밀도로 계산 (np.float32 등)."""
+    a = panel.arrays
+    dtype = np.dtype(dtype or a["Close"].dtype)
+    n, days = panel.shape
+    out = {name: np.empty((n, days), dtype=dtype) for name in INDICATOR_COLUMNS}
+    if n == 0 or days == 0:
+        return out
+    per_row = max(1, days * 120 * dtype.itemsize)  # 가장 긴 윈도(120) 기준
+    step = max(1, block_bytes // per_row)
+    for lo in range(0, n, step):
+        hi = min(n, lo + step)
+        part = _block(*(a[c][lo:hi].astype(dtype, copy=False) for c in ("Close", "High", "Low", "Volume")))
+        for name in INDICATOR_COLUMNS:
+            out[name][lo:hi] = part[name]
+    return out
+
+
+def indicator_frame(panel, values, i):
+    """종목 i의 원래 DataFrame 모양 (가격 열 + 지표 열, 날짜 인덱스)."""
+    n = len(panel.dates[i])
+    days = panel.shape[1]
+    data = {col: panel.arrays[col][i, days - n:] for col in PRICE_COLUMNS}
+    data.update({name: values[name][i, days - n:] for name in INDICATOR_COLUMNS})
+    return pd.DataFrame(data, index=panel.dates[i])
+
+
+def latest_values(panel, values, lag=0):
+    """종목별 마지막(lag=1이면 그 전) 봉의 가격/지표 → DataFrame(index=ticker)."""
+    col = panel.shape[1] - 1 - lag
+    data = {name: panel.arrays[name][:, col] for name in PRICE_COLUMNS}
+    data.update({name: values[name][:, col] for name in INDICATOR_COLUMNS})
+    return pd.DataFrame(data, index=panel.tickers)
+
+
+def calculate_indicators(df, dtype=np.float64):
+    """종목 하나 (pages/2 차트 분석용): 원래 열은 그대로 두고 지표 열을 붙인 새 DataFrame."""
+    panel = build_panel({"_": df}, dtype=dtype)
+    values = compute_panel(panel)
+    extra = pd.DataFrame({name: values[name][0] for name in INDICATOR_COLUMNS}, index=df.index)
+    return pd.concat([df.drop(columns=[c for c in INDICATOR_COLUMNS if c in df]), extra], axis=1)
+
+
+# --- 봉 하나씩 들어올 때 지표를 상수 시간에 갱신 ---
+# 이동합(MA/거래량/RSI 상승·하락), EMA 재귀 상태(pandas adjust=True 식), 60일 고저용 단조 덱을 들고 있다.
+# append(bar)는 새 봉, revise(bar)는 마지막 봉 수정(장중 시세 갱신) — 직전 상태로 되돌린 뒤 다시 더한다.
+# 윈도 길이(최대 120)는 고정이므로 이력 길이와 상관없이 한 번 갱신 비용이 일정하다.
+# 이동합은 더하고 빼기를 반복하며 오차가 쌓이므로 RESYNC번마다 버퍼에서 다시 합한다.
+MA_WINDOWS = (5, 20, 60, 120)
+RSI_WINDOW = 14
+EXTREME_WINDOW = 60
+RESYNC = 1000
+
+
+class _Ema:
+    __slots__ = ("decay", "weighted", "old_wt")
+
+    def __init__(self, span):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.weighted = np.nan
+        self.old_wt = 1.0
+
+    def update(self, cur):
+        if self.weighted != self.weighted:  # 아직 값이 없음
+            if cur == cur:
+                self.weighted = cur
+            return self.weighted
+        self.old_wt *= self.decay
+        if cur == cur:
+            if self.weighted != cur:
+                self.weighted = (self.old_wt * self.weighted + cur) / (self.old_wt + 1.0)
+            self.old_wt += 1.0
+        return self.weighted
+
+    def copy(self):
+        other = _Ema.__new__(_Ema)
+        other.decay, other.weighted, other.old_wt = self.decay, self.weighted, self.old_wt
+        return other
+
+
+class _Window:
+    """최근 size개 값과 그 합 (size개가 다 차야 평균을 낸다)."""
+    __slots__ = ("size", "values", "total", "count")
+
+    def __init__(self, size):
+        self.size = size
+        self.values = collections.deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+
+    def push(self, x):
+        if len(self.values) == self.size:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self.count += 1
+        if self.count % RESYNC == 0:
+            self.total = float(np.sum(np.fromiter(self.values, float)))
+
+    def mean(self):
+        return self.total / self.size if len(self.values) == self.size else np.nan
+
+    def copy(self):
+        other = _Window.__new__(_Window)
+        other.size, other.values, other.total, other.count = self.size, self.values.copy(), self.total, self.count
+        return other
+
+
+class _Extreme:
+    """최근 size개 중 최댓값(또는 최솟값) — 단조 덱, 갱신당 분할상환 O(1)."""
+    __slots__ = ("size", "sign", "items", "n")
+
+    def __init__(self, size, largest=True):
+        self.size = size
+        self.sign = 1.0 if largest else -1.0
+        self.items = collections.deque()  # (봉 번호, sign*값), 값이 단조 감소
+        self.n = 0
+
+    def push(self, x):
+        v = self.sign * x
+        while self.items and self.items[-1][1] <= v:
+            self.items.pop()
+        self.items.append((self.n, v))
+        while self.items[0][0] <= self.n - self.size:
+            self.items.popleft()
+        self.n += 1
+
+    def value(self):
+        return self.sign * self.items[0][1] if self.n >= self.size and self.items else np.nan
+
+    def copy(self):
+        other = _Extreme.__new__(_Extreme)
+        other.size, other.sign, other.items, other.n = self.size, self.sign, self.items.copy(), self.n
+        return other
+
+
+class IndicatorState:
+    def __init__(self):
+        self.closes = {w: _Window(w) for w in MA_WINDOWS}
+        self.volumes = {w: _Window(w) for w in (5, 20)}
+        self.gains = _Window(RSI_WINDOW)
+        self.losses = _Window(RSI_WINDOW)
+        self.ema12, self.ema26, self.signal = _Ema(12), _Ema(26), _Ema(9)
+        self.high60 = _Extreme(EXTREME_WINDOW, largest=True)
+        self.low60 = _Extreme(EXTREME_WINDOW, largest=False)
+        self.last_close = np.nan
+        self.last_date = None
+        self.last = None
+        self._prev = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_frame(cls, df):
+        state = cls()
+        for date, bar in zip(df.index, df[PRICE_COLUMNS].to_numpy(dtype=np.float64)):
+            state._push(date, dict(zip(PRICE_COLUMNS, bar)))
+        return state
+
+    def _snapshot(self):
+        snap = IndicatorState.__new__(IndicatorState)
+        snap.closes = {w: win.copy() for w, win in self.closes.items()}
+        snap.volumes = {w: win.copy() for w, win in self.volumes.items()}
+        snap.gains, snap.losses = self.gains.copy(), self.losses.copy()
+        snap.ema12, snap.ema26, snap.signal = self.ema12.copy(), self.ema26.copy(), self.signal.copy()
+        snap.high60, snap.low60 = self.high60.copy(), self.low60.copy()
+        snap.last_close, snap.last_date, snap.last = self.last_close, self.last_date, self.last
+        return snap
+
+    def _restore(self, snap):
+        for name in ("closes", "volumes", "gains", "losses", "ema12", "ema26", "signal",
+                     "high60", "low60", "last_close", "last_date", "last"):
+            setattr(self, name, getattr(snap, name))
+
+    def _push(self, date, bar):
+        self._prev = self._snapshot()
+        close, volume = bar["Close"], bar["Volume"]
+        for win in self.closes.values():
+            win.push(close)
+        for win in self.volumes.values():
+            win.push(volume)
+        delta = close - self.last_close  # 첫 봉은 NaN → 상승/하락 0 (pandas와 같음)
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+        self.high60.push(bar["High"])
+        self.low60.push(bar["Low"])
+
+        row = dict(bar)
+        for w, win in self.closes.items():
+            row[f"MA{w}"] = win.mean()
+        if len(self.closes[20].values) == 20:
+            window = np.fromiter(self.closes[20].values, float)
+            row["std"] = float(np.sqrt(((window - window.sum() / 20) ** 2).sum() / 19))
+        else:
+            row["std"] = np.nan
+        row["Upper"] = row["MA20"] + row["std"] * 2
+        row["Lower"] = row["MA20"] - row["std"] * 2
+        row["BandWidth"] = (row["Upper"] - row["Lower"]) / row["MA20"] * 100 if row["MA20"] else np.nan
+        row["EMA12"] = self.ema12.update(close)
+        row["EMA26"] = self.ema26.update(close)
+        row["MACD"] = row["EMA12"] - row["EMA26"]
+        row["Signal"] = self.signal.update(row["MACD"])
+        row["Hist"] = row["MACD"] - row["Signal"]
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if loss == 0:
+            row["RSI"] = 100.0 if gain > 0 else np.nan
+        else:
+            row["RSI"] = 100 - (100 / (1 + gain / loss))
+        row["Vol_MA5"] = self.volumes[5].mean()
+        row["Vol_MA20"] = self.volumes[20].mean()
+        row["High60"] = self.high60.value()
+        row["Low60"] = self.low60.value()
+
+        self.last_close = close
+        self.last_date = date
+        self.last = row
+        return row
+
+    def append(self, date, bar):
+        """새 봉 → 그 봉의 가격+지표 dict."""
+        with self._lock:
+            return self._push(date, bar)
+
+    def revise(self, bar):
+        """마지막 봉 값을 바꾼다 (같은 날 시세 갱신)."""
+        with self._lock:
+            date = self.last_date
+            self._restore(self._prev)
+            return self._push(date, bar)
+
+    def update(self, df):
+        """최근 봉 DataFrame을 반영: 마지막 날짜와 같으면 수정, 이후 날짜면 추가. 바뀐 행들을 DataFrame으로."""
+        rows, dates = [], []
+        with self._lock:
+            for date, bar in zip(df.index, df[PRICE_COLUMNS].to_numpy(dtype=np.float64)):
+                bar = dict(zip(PRICE_COLUMNS, bar))
+                if self.last_date is not None and date < self.last_date:
+                    continue
+                if date == self.last_date:
+                    if all(self.last[k] == bar[k] for k in PRICE_COLUMNS):
+                        continue
+                    rows.append(self.revise(bar))
+                else:
+                    rows.append(self.append(date, bar))
+                dates.append(date)
+        return pd.DataFrame(rows, index=dates, columns=PRICE_COLUMNS + INDICATOR_COLUMNS)
+
+    def catch_up(self, df):
+        """전체 이력 df에서 마지막 반영 봉(같은 날 포함) 이후를 모두 update (며칠 건너뛰어도 빠지는 봉이 없다)."""
+        with self._lock:
+            return self.update(df if self.last_date is None else df[df.index >= self.last_date])
@@ -0,0 +1,82 @@
+import streamlit as st
+
+from core.jobs import ACTIVE, get_job_manager
+
+# --- 백그라운드 번들 작업 표시 (app.py / 보고서 다운로드 페이지 공용) ---
+# 이 세션에서 시작한 작업 ID는 session_state와 주소(?job=...)에 남겨, 다른 화면에 갔다 오거나
+# 새로고침해도 같은 작업을 다시 보여 준다 (작업을 만든 API 키일 때만 — core.jobs 참고).
+# 진행 중인 작업만 2초마다 다시 그리고, 끝나면 화면 전체를 한 번 다시 실행해 다운로드 버튼을 띄운다.
+
+
+def remember_job(job_id):
+    ids = st.session_state.setdefault("job_ids", [])
+    if job_id in ids:
+        ids.remove(job_id)
+    ids.insert(0, job_id)
+    st.query_params["job"] = job_id
+
+
+def _job_ids():
+    ids = st.session_state.setdefault("job_ids", [])
+    from_url = st.query_params.get("job")
+    if from_url and from_url not in ids:
+        ids.insert(0, from_url)
+    return ids
+
+
+@st.fragment(run_every=2)
+def _running_job(job_id, api_key):
+    job = get_job_manager().progress(job_id, api_key)
+    if job is None or job["status"] not in ACTIVE:
+        st.rerun()
+    label = "대기 중" if job["status"] == "queued" else f"{job['done'] + job['failed']}/{job['total']} 처리 중"
+    st.progress(job["fraction"], text=f"⏳ {label} — 다른 화면으로 이동해도 계속 진행됩니다")
+    if st.button("중지", key=f"cancel-{job_id}"):
+        get_job_manager().cancel(job_id, api_key)
+
+
+def _finished_job(job, api_key):
+    manager = get_job_manager()
+    job_id = job["job_id"]
+    if job["status"] == "done":
+        if job["note"]:
+            st.caption(job["note"])
+        with open(job["bundle_path"], "rb") as zip_data:
+            st.download_button(f"💾 {job['zip_name']} 저장 ({job['done']}건)", data=zip_data, file_name=job["zip_name"],
+                               mime="application/zip", type="primary", use_container_width=True, key=f"zip-{job_id}")
+        if job["chunks_path"]:
+            with open(job["chunks_path"], "rb") as jsonl_data:
+                st.download_button("🧩 청크 JSONL 저장", data=jsonl_data, file_name=job["zip_name"].replace(".zip", "_chunks.jsonl"),
+                                   mime="application/jsonl", use_container_width=True, key=f"jsonl-{job_id}")
+        if job["failed"]:
+            with st.expander(f"⚠️ 실패 {job['failed']}건"):
+                for name, err in manager.failures(job_id):
+                    st.write(f"{name} — {err}")
+            if st.button("실패한 보고서만 다시 시도", key=f"retry-{job_id}"):
+                manager.resume(job_id, api_key, retry_failed=True)
+                st.rerun()
+        return
+    message = {"interrupted": "서버가 다시 시작되어 작업이 멈췄습니다.", "cancelled": "중지된 작업입니다.",
+               "failed": f"작업 실패: {job['error']}"}.get(job["status"], job["status"])
+    st.warning(f"{message} (완료 {job['done']}/{job['total']}건은 저장되어 있습니다)")
+    if st.button("▶️ 이어서 하기", key=f"resume-{job_id}"):
+        manager.resume(job_id, api_key)
+        st.rerun()
+
+
+def show_jobs(api_key, limit=5):
+    ids = _job_ids()[:limit]
+    if not ids:
+        return
+    st.subheader("📦 번들 작업")
+    manager = get_job_manager()
+    for job_id in ids:
+        job = manager.progress(job_id, api_key)
+        if job is None:
+            continue
+        with st.container(border=True):
+            st.markdown(f"**{job['title']}** · `{job_id}`")
+            if job["status"] in ACTIVE:
+                _running_job(job_id, api_key)
+            else:
+                _finished_job(job, api_key)
@@ -0,0 +1,348 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+
+from core import config
+from core.bundle import BundleWriter
+from core.chunks import DEFAULT_TOKEN_BUDGET, ChunkWriter
+from core.dart_api import make_session
+from core.dedupe import ParagraphDeduper
+from core.doc_cache import get_document_cache
+from core.pipeline import iter_pipeline
+from core.reports import Report, ReportLoader
+from core.search_index import get_search_index
+from core.tables import Table
+
+# --- 번들 생성 백그라운드 작업 ---
+# Streamlit 스크립트가 다시 실행돼도(위젯 조작, 새로고침, 페이지 이동) 작업은 프로세스 안 작업 풀에서 계속 돈다.
+#   - 작업마다 job_id, 상태/진행률은 SQLite에 (페이지는 progress()를 주기적으로 읽기만 한다)
+#   - 보고서 1건이 끝날 때마다 jobs/<job_id>/items/<번호>.json.z 로 체크포인트 → 중단된 작업은 남은 것만 이어서
+#   - 같은 사용자(API 키)가 같은 내용(spec)을 다시 요청하면 새로 만들지 않고 기존 작업(진행 중이면 그 작업, 끝났으면 결과)을 돌려준다
+#     동시 다운로드 수처럼 결과에 영향이 없는 실행 옵션은 spec에 넣지 않는다 (바꿔도 같은 작업)
+#   - 작업 조회/중지/재개는 작업을 만든 API 키로만 된다 (키 자체가 아니라 해시를 owner로 저장)
+#   - 추출한 보고서는 장 단위로 로컬 검색 색인(core.search_index)에도 넣는다 (DART_SEARCH_INDEX=0이면 끔)
+#   - 모든 보고서가 끝나면 체크포인트로 ZIP(과 청크 JSONL)을 조립한다 (중복 문단 처리도 이때 순서대로)
+# API 키는 저장하지 않는다. 서버가 재시작돼 끊긴 작업은 "interrupted"가 되고, 키를 다시 넘겨 resume()으로 잇는다.
+
+JOB_DIR = os.path.join(config.DATA_DIR, "jobs")
+JOB_WORKERS = 2       # 동시에 도는 작업 수 (작업 하나가 다시 여러 건을 동시에 받는다)
+JOB_KEEP_HOURS = 48   # 끝난 작업 보관 기간
+ACTIVE = ("queued", "running")
+STALE_SECONDS = 600   # 진행 기록이 이만큼 없으면 (다른 프로세스가 죽은 것으로 보고) 끊긴 작업으로 본다
+FETCH_WORKERS = 4     # 작업 하나의 동시 다운로드 수 기본값
+JOB_FIELDS = ["job_id", "spec_key", "owner", "title", "zip_name", "status", "total", "done", "failed", "error", "note",
+              "bundle_path", "chunks_path", "created_at", "updated_at"]
+
+
+def spec_key(spec):
+    return hashlib.sha1(json.dumps(spec, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def owner_of(api_key):
+    return hashlib.sha256(str(api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def make_spec(items, title="", zip_name="bundle.zip", extractor="ai", save_tables=False, save_chunks=False,
+              token_budget=DEFAULT_TOKEN_BUDGET, dedupe=None):
+    """items: [{"rcept_no", "file_name", "header", "meta"}] — 번들에 들어갈 순서대로."""
+    return {
+        "title": title, "zip_name": zip_name, "extractor": extractor, "save_tables": bool(save_tables), "save_chunks": bool(save_chunks),
+        "token_budget": int(token_budget), "dedupe": dedupe,
+        "items": [{"rcept_no": it["rcept_no"], "file_name": it["file_name"], "header": it.get("header", ""),
+                   "meta": it.get("meta", {})} for it in items],
+    }
+
+
+class JobStore:
+    def __init__(self, path=None):
+        self.path = path or config.data_path("jobs.sqlite3")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, spec_key TEXT NOT NULL, title TEXT, zip_name TEXT, status TEXT NOT NULL,"
+            " total INTEGER NOT NULL, done INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT, note TEXT, bundle_path TEXT, chunks_path TEXT, spec TEXT NOT NULL,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        try:  # owner 열이 없던 예전 DB (그 작업들은 주인이 없으므로 아무도 조회할 수 없고 보관 기간이 지나면 지워진다)
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_spec ON jobs(spec_key, created_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            " job_id TEXT NOT NULL, idx INTEGER NOT NULL, rcept_no TEXT NOT NULL, status TEXT NOT NULL,"
+            " error TEXT, PRIMARY KEY (job_id, idx))"
+        )
+        self._db.commit()
+
+    def create(self, spec, owner):
+        job_id = f"{time.strftime('%Y%m%d')}-{uuid.uuid4().hex[:8]}"
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (job_id, spec_key, owner, title, zip_name, status, total, spec, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, spec_key(spec), owner, spec.get("title"), spec.get("zip_name"), len(spec["items"]),
+                 json.dumps(spec, ensure_ascii=False), now, now)
+            )
+            self._db.executemany(
+                "INSERT INTO job_items (job_id, idx, rcept_no, status) VALUES (?, ?, ?, 'pending')",
+                [(job_id, i, it["rcept_no"]) for i, it in enumerate(spec["items"])]
+            )
+            self._db.commit()
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(zip(JOB_FIELDS, row)) if row else None
+
+    def spec(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT spec FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest_for(self, key, owner):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id FROM jobs WHERE spec_key = ? AND owner = ? ORDER BY created_at DESC LIMIT 1", (key, owner)
+            ).fetchone()
+        return row[0] if row else None
+
+    def item_states(self, job_id):
+        with self._lock:
+            rows = self._db.execute("SELECT idx, status, error FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,)).fetchall()
+        return rows
+
+    def set_item(self, job_id, idx, status, error=None):
+        with self._lock:
+            self._db.execute("UPDATE job_items SET status = ?, error = ? WHERE job_id = ? AND idx = ?",
+                             (status, error, job_id, idx))
+            self._db.execute(
+                "UPDATE jobs SET updated_at = ?,"
+                " done = (SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status = 'done'),"
+                " failed = (SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status = 'failed')"
+                " WHERE job_id = ?", (time.time(), job_id, job_id, job_id)
+            )
+            self._db.commit()
+
+    def set_status(self, job_id, status, **fields):
+        fields = {k: v for k, v in fields.items() if k in ("error", "note", "bundle_path", "chunks_path")}
+        sets = ", ".join(["status = ?", "updated_at = ?"] + [f"{k} = ?" for k in fields])
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {sets} WHERE job_id = ?", (status, time.time(), *fields.values(), job_id))
+            self._db.commit()
+
+    def reset_failed(self, job_id):
+        with self._lock:
+            self._db.execute("UPDATE job_items SET status = 'pending', error = NULL WHERE job_id = ? AND status = 'failed'", (job_id,))
+            self._db.execute("UPDATE jobs SET failed = 0 WHERE job_id = ?", (job_id,))
+            self._db.commit()
+
+    # 이전 프로세스에서 돌다 끊긴 작업 (다른 프로세스가 돌리는 중인 작업은 건드리지 않도록 오래된 것만)
+    def mark_interrupted(self, stale_seconds=STALE_SECONDS):
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = 'interrupted' WHERE status IN ('queued', 'running') AND updated_at < ?",
+                             (time.time() - stale_seconds,))
+            self._db.commit()
+
+    def expired(self, max_age_hours=JOB_KEEP_HOURS):
+        cutoff = time.time() - max_age_hours * 3600
+        with self._lock:
+            return [r[0] for r in self._db.execute(
+                "SELECT job_id FROM jobs WHERE updated_at < ? AND status NOT IN ('queued', 'running')", (cutoff,)
+            ).fetchall()]
+
+    def delete(self, job_id):
+        with self._lock:
+            self._db.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._db.commit()
+
+
+# --- 작업 풀 (프로세스당 하나) ---
+class JobManager:
+    def __init__(self, store=None, root=JOB_DIR, workers=JOB_WORKERS, session=None):
+        self.store = store or JobStore()
+        self.root = root
+        self.session = session or make_session(pool_size=16)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bundle-job")
+        self.active = {}
+        self.cancelled = set()
+        self.fetch_workers = {}  # job_id → 마지막 실행의 동시 다운로드 수 (재개할 때 그대로)
+        self._lock = threading.Lock()
+        self.store.mark_interrupted()
+        for job_id in self.store.expired():
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            self.store.delete(job_id)
+
+    def job_dir(self, job_id, *parts):
+        return os.path.join(self.root, job_id, *parts)
+
+    def _get(self, job_id, api_key):
+        """작업을 만든 API 키일 때만 작업 정보 (아니면 None — 주소의 ?job= 만으로는 남의 작업을 볼 수 없다)."""
+        job = self.store.get(job_id)
+        if job is None or job["owner"] != owner_of(api_key):
+            return None
+        return job
+
+    # 같은 spec이면 기존 작업을 돌려주고, 끊긴/중지된 작업이면 체크포인트부터 다시 돌린다
+    def submit(self, spec, api_key, fetch_workers=FETCH_WORKERS):
+        owner = owner_of(api_key)
+        job_id = self.store.latest_for(spec_key(spec), owner)
+        job = self.store.get(job_id) if job_id else None
+        if job is not None and job["status"] == "done" and job["bundle_path"] and os.path.exists(job["bundle_path"]):
+            return job_id
+        if job is None:
+            job_id = self.store.create(spec, owner)
+        self.resume(job_id, api_key, fetch_workers=fetch_workers)
+        return job_id
+
+    def resume(self, job_id, api_key, retry_failed=False, fetch_workers=None):
+        if self._get(job_id, api_key) is None:
+            return
+        with self._lock:
+            fut = self.active.get(job_id)
+            if fut is not None and not fut.done() and job_id not in self.cancelled:
+                return
+        if fut is not None:
+            concurrent.futures.wait([fut])  # 중지 중인 이전 실행이 받던 것까지 정리할 때까지 (잠금 밖에서)
+        with self._lock:
+            if self.active.get(job_id) is not fut:  # 기다리는 동안 다른 호출이 먼저 다시 시작함
+                return
+            if retry_failed:
+                self.store.reset_failed(job_id)
+            if fetch_workers is not None:
+                self.fetch_workers[job_id] = int(fetch_workers)
+            self.cancelled.discard(job_id)
+            self.store.set_status(job_id, "queued", error=None)
+            self.active[job_id] = self.pool.submit(self._run, job_id, api_key,
+                                                   self.fetch_workers.get(job_id, FETCH_WORKERS))
+
+    def cancel(self, job_id, api_key):
+        if self._get(job_id, api_key) is None:
+            return
+        with self._lock:
+            self.cancelled.add(job_id)
+            fut = self.active.get(job_id)
+        if fut is None or fut.cancel() or fut.done():
+            self.store.set_status(job_id, "cancelled")
+
+    def progress(self, job_id, api_key):
+        job = self._get(job_id, api_key)
+        if job is None:
+            return None
+        if job["status"] in ACTIVE and job_id not in self.active and time.time() - job["updated_at"] > STALE_SECONDS:
+            job["status"] = "interrupted"
+        job["fraction"] = (job["done"] + job["failed"]) / job["total"] if job["total"] else 1.0
+        return job
+
+    def failures(self, job_id):
+        spec = self.store.spec(job_id)
+        return [(spec["items"][idx]["file_name"], err) for idx, status, err in self.store.item_states(job_id) if status == "failed"]
+
+    # --- 작업 실행 ---
+    def _checkpoint(self, job_id, idx):
+        return self.job_dir(job_id, "items", f"{idx:05d}.json.z")
+
+    def _run(self, job_id, api_key, fetch_workers=FETCH_WORKERS):
+        spec = self.store.spec(job_id)
+        try:
+            self.store.set_status(job_id, "running")
+            loader = ReportLoader(self.session, api_key, extractor=spec["extractor"],
+                                  cache=get_document_cache(), structured=True)
+            index = get_search_index() if config.SEARCH_INDEX else None
+            os.makedirs(self.job_dir(job_id, "items"), exist_ok=True)
+            todo = [idx for idx, status, _ in self.store.item_states(job_id)
+                    if status != "done" or not os.path.exists(self._checkpoint(job_id, idx))]
+
+            def fetch(idx):
+                return loader.fetch(spec["items"][idx]["rcept_no"])
+
+            def parse(idx, payload):
+                return loader.parse(spec["items"][idx]["rcept_no"], payload)
+
+            results = iter_pipeline(todo, fetch, parse, fetch_workers=fetch_workers, parse_workers=2)
+            for idx, result, err in results:
+                if job_id in self.cancelled:
+                    results.close()  # 남은 다운로드를 취소하고 풀이 정리될 때까지 기다린다
+                    self.store.set_status(job_id, "cancelled")
+                    return
+                if err is not None:
+                    self.store.set_item(job_id, idx, "failed", f"{type(err).__name__}: {err}")
+                    continue
+                self._save_checkpoint(job_id, idx, result)
+                self.store.set_item(job_id, idx, "done")
+                if index is not None:
+                    item = spec["items"][idx]
+                    try:
+                        index.add(item["rcept_no"], result.text, result.sections, item["meta"], loader.version)
+                    except sqlite3.Error:
+                        pass  # 색인 실패는 번들 생성에 영향을 주지 않는다 (backfill로 다시 채울 수 있음)
+            self._assemble(job_id, spec)
+        except Exception as e:
+            self.store.set_status(job_id, "failed", error=f"{type(e).__name__}: {e}")
+            raise
+
+    def _save_checkpoint(self, job_id, idx, result):
+        if isinstance(result, Report):
+            data = {"text": result.text, "sections": result.sections, "tables": [t.to_dict() for t in result.tables]}
+        else:
+            data = {"text": result, "sections": [], "tables": []}
+        path = self._checkpoint(job_id, idx)
+        with open(path + ".tmp", "wb") as f:
+            f.write(zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), 1))
+        os.replace(path + ".tmp", path)
+
+    def _load_checkpoint(self, job_id, idx):
+        with open(self._checkpoint(job_id, idx), "rb") as f:
+            data = json.loads(zlib.decompress(f.read()))
+        return Report(data["text"], data["sections"], [Table.from_dict(t) for t in data["tables"]])
+
+    def _assemble(self, job_id, spec):
+        bundle_path = self.job_dir(job_id, "bundle.zip")
+        chunks_path = self.job_dir(job_id, "chunks.jsonl") if spec["save_chunks"] else None
+        deduper = ParagraphDeduper(spec["dedupe"]) if spec["dedupe"] else None
+        done = [idx for idx, status, _ in self.store.item_states(job_id) if status == "done"]
+        chunk_writer = ChunkWriter(chunks_path, budget=spec["token_budget"], dedupe=spec["dedupe"]) if chunks_path else None
+        try:
+            with BundleWriter(bundle_path + ".tmp") as bundle:
+                for idx in done:
+                    item = spec["items"][idx]
+                    report = self._load_checkpoint(job_id, idx)
+                    text = report.text
+                    if deduper is not None:
+                        text = deduper.process(text, item["file_name"][:-4], group=item["meta"].get("smart_type"),
+                                               header=item["header"])
+                    bundle.write_text(item["file_name"], item["header"], text)
+                    if spec["save_tables"]:
+                        bundle.write_tables(item["file_name"][:-4], report.tables,
+                                            metadata={"rcept_no": item["rcept_no"], "report_nm": item["meta"].get("report_nm", "")})
+                    if chunk_writer is not None:
+                        chunk_writer.write_report(report, {"rcept_no": item["rcept_no"], **item["meta"]})
+        finally:
+            if chunk_writer is not None:
+                chunk_writer.close()
+        os.replace(bundle_path + ".tmp", bundle_path)
+        note = None
+        if deduper is not None:
+            dd = deduper.stats()
+            note = f"♻️ 중복 문단 {dd['removed']}개 생략 (본문 {dd['saved']:.0%} 절감)"
+        self.store.set_status(job_id, "done", bundle_path=bundle_path, chunks_path=chunks_path, note=note)
+
+
+@functools.lru_cache(maxsize=None)
+def get_job_manager():
+    return JobManager()
@@ -0,0 +1,252 @@
+import atexit
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from core import config
+
+# --- 단계별 소요 시간/바이트/결과 지표 ---
+# 보고서 한 건(rcept_no)이나 요청 한 번(종목코드 등)이 거치는 단계마다 걸린 시간, 주고받은 바이트, 결과(ok/error/...)를 남긴다.
+#   with stage("download") as s: ...; s.bytes = len(content)   # 예외가 나면 outcome="error"로 기록하고 그대로 올린다
+#   with keyed(rcept_no): ...      # 이 안에서 기록되는 단계에 보고서/요청 키를 붙인다 (스레드/컨텍스트별)
+#   cache_event("doc_text", hit)   # 캐시 적중률
+#   track_cache("이름", st.cache_data(ttl=600))  # Streamlit 캐시 함수의 적중률 (본문이 실제로 돈 횟수 = 미스)
+# 집계(단계별 횟수/오류/합계/최대/히스토그램, 캐시 적중)는 프로세스 안에 두고, 최근 이벤트는 화면 디버그 패널용으로 보관한다.
+# 내보내기(config.METRICS_EXPORT): "prom" → data/metrics.prom (Prometheus 텍스트, node_exporter textfile 수집기 등으로 수집),
+# "jsonl" → data/metrics.jsonl (이벤트 한 줄씩, 크기가 넘으면 .1로 돌린다). 주 프로세스에서만 METRICS_INTERVAL초마다 쓴다.
+# 추출 프로세스 풀(core.batch)의 기록은 capture()로 모아 결과와 함께 돌려받아 merge()로 합친다.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RECENT_EVENTS = 2000
+JSONL_MAX_BYTES = 50 << 20
+
+_key = contextvars.ContextVar("metrics_key", default=None)
+_cache_call = contextvars.ContextVar("metrics_cache_call", default=None)  # track_cache: 지금 호출의 미스 표시
+_capture = threading.local()
+
+
+class _Stage:
+    __slots__ = ("bytes", "outcome")
+
+    def __init__(self):
+        self.bytes = 0
+        self.outcome = "ok"
+
+
+class Metrics:
+    def __init__(self, export=None, interval=None):
+        self._lock = threading.Lock()
+        self.stages = {}   # 단계 → {"count", "errors", "seconds", "max", "bytes", "buckets", "outcomes"}
+        self.caches = {}   # 이름 → [적중, 미스]
+        self.recent = collections.deque(maxlen=RECENT_EVENTS)
+        self._pending = []
+        self.export = set(filter(None, (export if export is not None else config.METRICS_EXPORT).split(",")))
+        self.interval = interval if interval is not None else config.METRICS_INTERVAL
+        self.prom_path = config.data_path("metrics.prom")
+        self.jsonl_path = config.data_path("metrics.jsonl")
+        self._exporter = None
+
+    # --- 기록 ---
+    def record(self, name, seconds, nbytes=0, outcome="ok", key=None):
+        key = key if key is not None else _key.get()
+        event = {"ts": round(time.time(), 3), "stage": name, "seconds": round(seconds, 6), "bytes": nbytes,
+                 "outcome": outcome, "key": key}
+        with self._lock:
+            st = self.stages.get(name)
+            if st is None:
+                st = self.stages[name] = {"count": 0, "errors": 0, "seconds": 0.0, "max": 0.0, "bytes": 0,
+                                          "buckets": [0] * len(BUCKETS), "outcomes": collections.Counter()}
+            st["count"] += 1
+            st["errors"] += outcome == "error"
+            st["seconds"] += seconds
+            st["max"] = max(st["max"], seconds)
+            st["bytes"] += nbytes
+            st["outcomes"][outcome] += 1
+            for i, le in enumerate(BUCKETS):
+                if seconds <= le:
+                    st["buckets"][i] += 1
+                    break
+            self.recent.append(event)
+            if "jsonl" in self.export:
+                self._pending.append(event)
+        events = getattr(_capture, "events", None)
+        if events is not None:
+            events.append(event)
+        self._ensure_exporter()
+
+    @contextlib.contextmanager
+    def stage(self, name, key=None):
+        s = _Stage()
+        t0 = time.perf_counter()
+        try:
+            yield s
+        except BaseException:
+            s.outcome = "error"
+            raise
+        finally:
+            self.record(name, time.perf_counter() - t0, s.bytes, s.outcome, key)
+
+    def cache_event(self, name, hit):
+        with self._lock:
+            counts = self.caches.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+        self._ensure_exporter()
+
+    # --- 다른 프로세스의 기록 모으기 ---
+    @contextlib.contextmanager
+    def capture(self):
+        events = []
+        _capture.events = events
+        try:
+            yield events
+        finally:
+            _capture.events = None
+
+    def merge(self, events):
+        for e in events:
+            self.record(e["stage"], e["seconds"], e["bytes"], e["outcome"], e["key"])
+
+    # --- 조회 ---
+    def snapshot(self):
+        """{"stages": [...], "caches": [...], "recent": [...]} — 화면 표시용 (평균/최대는 ms)."""
+        with self._lock:
+            stages = [{"stage": name, "count": st["count"], "errors": st["errors"],
+                       "avg_ms": st["seconds"] / st["count"] * 1000, "max_ms": st["max"] * 1000,
+                       "total_s": st["seconds"], "bytes": st["bytes"], "outcomes": dict(st["outcomes"])}
+                      for name, st in self.stages.items()]
+            caches = [{"cache": name, "hits": h, "misses": m, "hit_rate": h / (h + m) if h + m else None}
+                      for name, (h, m) in self.caches.items()]
+            recent = list(self.recent)
+        stages.sort(key=lambda s: -s["total_s"])
+        return {"stages": stages, "caches": caches, "recent": recent}
+
+    def prometheus(self):
+        lines = ["# HELP dart_stage_seconds 단계별 소요 시간", "# TYPE dart_stage_seconds histogram"]
+        with self._lock:
+            stages = {name: dict(st, buckets=list(st["buckets"]), outcomes=dict(st["outcomes"]))
+                      for name, st in self.stages.items()}
+            caches = {name: list(c) for name, c in self.caches.items()}
+        for name, st in sorted(stages.items()):
+            cumulative = 0
+            for le, n in zip(BUCKETS, st["buckets"]):
+                cumulative += n
+                lines.append(f'dart_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'dart_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {st["count"]}')
+            lines.append(f'dart_stage_seconds_sum{{stage="{name}"}} {st["seconds"]:.6f}')
+            lines.append(f'dart_stage_seconds_count{{stage="{name}"}} {st["count"]}')
+        lines += ["# HELP dart_stage_total 단계별 결과 횟수", "# TYPE dart_stage_total counter"]
+        for name, st in sorted(stages.items()):
+            for outcome, n in sorted(st["outcomes"].items()):
+                lines.append(f'dart_stage_total{{stage="{name}",outcome="{outcome}"}} {n}')
+        lines += ["# HELP dart_stage_bytes_total 단계별 바이트", "# TYPE dart_stage_bytes_total counter"]
+        for name, st in sorted(stages.items()):
+            lines.append(f'dart_stage_bytes_total{{stage="{name}"}} {st["bytes"]}')
+        lines += ["# HELP dart_cache_requests_total 캐시 조회 (적중/미스)", "# TYPE dart_cache_requests_total counter"]
+        for name, (hits, misses) in sorted(caches.items()):
+            lines.append(f'dart_cache_requests_total{{cache="{name}",result="hit"}} {hits}')
+            lines.append(f'dart_cache_requests_total{{cache="{name}",result="miss"}} {misses}')
+        return "\n".join(lines) + "\n"
+
+    # --- 파일로 내보내기 ---
+    def flush(self):
+        if "prom" in self.export:
+            tmp = f"{self.prom_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(tmp, self.prom_path)
+        if "jsonl" in self.export:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if pending:
+                try:
+                    if os.path.getsize(self.jsonl_path) > JSONL_MAX_BYTES:
+                        os.replace(self.jsonl_path, self.jsonl_path + ".1")
+                except OSError:
+                    pass
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in pending)
+
+    def _ensure_exporter(self):
+        # 추출 프로세스 풀의 자식은 내보내지 않는다 (주 프로세스 파일을 덮어쓰지 않도록)
+        if self._exporter is not None or not self.export or multiprocessing.parent_process() is not None:
+            return
+        with self._lock:
+            if self._exporter is not None:
+                return
+            self._exporter = threading.Thread(target=self._export_loop, name="metrics-export", daemon=True)
+            self._exporter.start()
+        atexit.register(self.flush)
+
+    def _export_loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+
+@functools.lru_cache(maxsize=None)
+def get_metrics():
+    return Metrics()
+
+
+def stage(name, key=None):
+    return get_metrics().stage(name, key)
+
+
+def cache_event(name, hit):
+    get_metrics().cache_event(name, hit)
+
+
+@contextlib.contextmanager
+def keyed(key):
+    token = _key.set(key)
+    try:
+        yield
+    finally:
+        _key.reset(token)
+
+
+def track_cache(name, cache_decorator):
+    """Streamlit 캐시 데코레이터를 감싸 호출 수와 미스(본문 실행) 수를 센다.
+    @track_cache("get_stock_data", st.cache_data(ttl=600)) 처럼 쓰고, .clear()는 그대로 통과한다.
+    미스 표시는 호출마다 새 contextvars 값으로 넘기므로, 추적하는 함수가 서로(또는 자기 자신을) 불러도 섞이지 않는다."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            call_state = _cache_call.get()
+            if call_state is not None:
+                call_state["missed"] = True
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            call_state = {"missed": False}
+            token = _cache_call.set(call_state)
+            try:
+                with stage(f"cache:{name}"):
+                    result = cached(*args, **kwargs)
+            finally:
+                _cache_call.reset(token)
+            cache_event(name, not call_state["missed"])
+            return result
+
+        call.clear = cached.clear
+        return call
+    return decorate
+
+
+# 사용법:
+#   python -m core.metrics        # 이 프로세스의 지표가 아니라 내보낸 파일(metrics.prom)을 출력
+if __name__ == "__main__":
+    path = config.data_path("metrics.prom")
+    print(open(path, encoding="utf-8").read() if os.path.exists(path) else f"{path} 없음 (DART_METRICS_EXPORT 확인)")
@@ -0,0 +1,50 @@
+import pandas as pd
+import streamlit as st
+
+from core.metrics import get_metrics
+
+# --- 단계별 성능 지표 디버그 패널 (app.py / 페이지 공용) ---
+# 사이드바의 토글이나 주소의 ?debug=1 로 켠다. 이 서버 프로세스가 시작된 뒤의 누적 지표이며,
+# 같은 내용이 config.METRICS_EXPORT에 따라 metrics.prom / metrics.jsonl 로도 내보내진다.
+
+RECENT_ROWS = 200
+
+
+def debug_toggle():
+    st.toggle("🛠 성능 지표 보기", key="debug_metrics", value=st.query_params.get("debug") == "1")
+
+
+def show_metrics(key=None):
+    """key를 주면(rcept_no, 종목코드 등) 최근 이벤트를 그 키로 먼저 좁혀 보여 준다."""
+    if not st.session_state.get("debug_metrics") and st.query_params.get("debug") != "1":
+        return
+    metrics = get_metrics()
+    snap = metrics.snapshot()
+    with st.expander("🛠 단계별 성능 지표 (디버그)", expanded=True):
+        if not snap["stages"]:
+            st.caption("아직 기록된 단계가 없습니다.")
+            return
+        stages = pd.DataFrame(snap["stages"])
+        stages["MB"] = stages["bytes"] / 1e6
+        st.markdown("**단계별 소요 시간** (총 시간 순)")
+        st.dataframe(stages[["stage", "count", "errors", "avg_ms", "max_ms", "total_s", "MB"]].round(2),
+                     use_container_width=True, hide_index=True)
+
+        if snap["caches"]:
+            caches = pd.DataFrame(snap["caches"])
+            caches["hit_rate"] = (caches["hit_rate"] * 100).round(1)
+            st.markdown("**캐시 적중률 (%)**")
+            st.dataframe(caches, use_container_width=True, hide_index=True)
+
+        recent = pd.DataFrame(snap["recent"][::-1])
+        query = st.text_input("키로 거르기 (접수번호/종목코드)", value=key or "", key="debug_metrics_key")
+        if query:
+            recent = recent[recent["key"].astype(str).str.contains(query.strip(), regex=False)]
+        recent["ts"] = pd.to_datetime(recent["ts"], unit="s", utc=True).dt.tz_convert("Asia/Seoul").dt.strftime("%H:%M:%S")
+        recent["ms"] = (recent["seconds"] * 1000).round(1)
+        st.markdown(f"**최근 이벤트** (최대 {RECENT_ROWS}건)")
+        st.dataframe(recent[["ts", "key", "stage", "ms", "bytes", "outcome"]].head(RECENT_ROWS),
+                     use_container_width=True, hide_index=True)
+        if metrics.export:
+            st.caption(f"내보내기: {', '.join(sorted(metrics.export))} → {metrics.prom_path} / {metrics.jsonl_path} "
+                       f"({metrics.interval:.0f}초마다)")
@@ -0,0 +1,57 @@
+import collections
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def _relay(src, dst):
+    if src.cancelled():  # 소비자가 중간에 멈춰 풀이 남은 작업을 취소한 경우
+        dst.cancel()
+        return
+    exc = src.exception()
+    if exc is not None:
+        dst.set_exception(exc)
+    else:
+        dst.set_result(src.result())
+
+
+# --- 다운로드(I/O) 풀과 파싱(CPU) 풀을 이어 붙인 파이프라인 ---
+# items 순서를 그대로 지키면서 (item, result, error)를 하나씩 돌려준다.
+# 동시에 떠 있는 작업 수는 prefetch로 제한해 메모리가 무한정 늘지 않게 한다.
+def iter_pipeline(items, fetch, parse, fetch_workers=4, parse_workers=2, prefetch=None):
+    prefetch = prefetch or (fetch_workers + parse_workers) * 2
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="dart-fetch")
+    parse_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="dart-parse")
+
+    def submit(item):
+        out = Future()
+
+        def on_fetched(f):
+            if f.cancelled():
+                out.cancel()
+                return
+            exc = f.exception()
+            if exc is not None:
+                out.set_exception(exc)
+                return
+            try:
+                parse_pool.submit(parse, item, f.result()).add_done_callback(lambda p: _relay(p, out))
+            except RuntimeError as e:  # 풀이 이미 종료됨 (소비자가 중단)
+                out.set_exception(e)
+
+        fetch_pool.submit(fetch, item).add_done_callback(on_fetched)
+        return out
+
+    source = iter(items)
+    pending = collections.deque((item, submit(item)) for item in itertools.islice(source, prefetch))
+    try:
+        while pending:
+            item, fut = pending.popleft()
+            for nxt in itertools.islice(source, 1):
+                pending.append((nxt, submit(nxt)))
+            try:
+                yield item, fut.result(), None
+            except Exception as e:
+                yield item, None, e
+    finally:
+        fetch_pool.shutdown(wait=True, cancel_futures=True)
+        parse_pool.shutdown(wait=True, cancel_futures=True)
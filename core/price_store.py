@@ -0,0 +1,421 @@
+import datetime
+import functools
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core import config
+from core.metrics import cache_event, stage
+
+# --- 종목별 일봉 저장소 (열 단위 파일, 메모리 매핑) ---
+# prices/<종목코드>/ 아래에 열마다 고정 폭 바이너리 파일 하나(date.<세대>.bin=YYYYMMDD int32, 나머지 float64)와 meta.json.
+#   - 읽기: np.memmap으로 필요한 구간만 매핑 → 네트워크도, 파일 전체 파싱도 없다
+#   - 갱신: 마지막 저장일 앞 몇 봉부터만 다시 받아, 마지막 봉(장중에 받은 미완성 봉)은 덮어쓰고 새 봉만 덧붙인다
+#   - 수정주가 반영: 겹치는 과거 봉의 종가가 달라졌으면(액면분할/배당 등으로 Yahoo 수정주가가 바뀜) 전체를 다시 받는다
+#   - 출처(Yahoo/Naver)는 종목별로 고정 — 수정주가와 원주가를 섞지 않는다
+#   - invalidate(code)는 그 종목만 지운다 (다른 사용자/종목의 캐시는 그대로)
+# meta.json의 rows가 유효한 행 수다. 덧붙이기 전에 rows를 줄여 두므로 중간에 죽어도 뒤쪽 몇 봉을 다시 받을 뿐이다.
+# 읽기는 잠금 없이 (다른 프로세스에서도) 한다. 그래서 쓰는 쪽은 읽는 중인 파일을 줄이거나 바꿔치지 않는다:
+#   - 전체 다시 쓰기는 새 세대(generation) 이름의 파일에 다 쓴 뒤 meta를 바꾸고, 이전 세대 파일은 그다음에 지운다
+#   - 덧붙이기는 파일을 줄이지 않고 마지막 봉 자리부터 덮어쓴다
+#   - 읽는 쪽은 meta → 열 복사 → meta 순으로 읽어, 그사이 meta가 바뀌었거나 파일이 사라졌으면 다시 읽는다
+
+COLUMNS = {"date": "<i4", "Open": "<f8", "High": "<f8", "Low": "<f8", "Close": "<f8", "Volume": "<f8"}
+SOURCES = ("Yahoo Finance", "Naver Finance")
+OVERLAP_BARS = 5     # 갱신할 때 다시 받아 대조하는 과거 봉 수
+ADJUST_TOL = 1e-4    # 겹치는 봉 종가가 이만큼(상대) 달라지면 수정주가가 바뀐 것으로 본다
+MAX_AGE = 600        # history(max_age=...) 기본값: 10분 지나면 빠진 봉만 받아 온다
+LAYOUT = 2           # 파일 배치 버전 (다르면 저장된 것이 없는 것으로 보고 다시 받는다)
+READ_RETRIES = 5
+
+
+def _to_int(dt):
+    return int(dt.strftime("%Y%m%d"))
+
+
+def _to_datetime(value):
+    return datetime.datetime.strptime(str(value), "%Y%m%d")
+
+
+# --- 시장 구분 (Yahoo 접미사) ---
+# KRX 상장 목록을 하루 한 번 받아 {종목코드: "KS"/"KQ"/""} 로 저장한다 ("" = 코넥스 등 Yahoo에 없음 → 바로 Naver).
+# 목록에 없는 종목만 .KS와 .KQ를 둘 다 (같은 묶음 요청 안에서) 시도한다.
+MARKET_SUFFIX = {"KOSPI": "KS", "KOSDAQ": "KQ", "KOSDAQ GLOBAL": "KQ"}
+LISTING_HOURS = 24
+
+_markets = {"loaded_at": 0.0, "map": {}}
+_markets_lock = threading.Lock()
+
+
+def market_suffixes():
+    with _markets_lock:
+        if time.time() - _markets["loaded_at"] < LISTING_HOURS * 3600:
+            return _markets["map"]
+        path = config.data_path("krx_markets.json")
+        try:
+            fresh = time.time() - os.path.getmtime(path) < LISTING_HOURS * 3600
+        except OSError:
+            fresh = False
+        mapping = None
+        if not fresh:
+            try:
+                import FinanceDataReader as fdr
+                krx = fdr.StockListing('KRX')
+                mapping = {code: MARKET_SUFFIX.get(market, "") for code, market in zip(krx['Code'], krx['Market'])}
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(mapping, f)
+                os.replace(tmp, path)
+            except Exception:
+                mapping = None
+        if mapping is None:  # 받기 실패 → 예전 파일이라도
+            try:
+                with open(path, encoding="utf-8") as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError):
+                mapping = {}
+        _markets.update(loaded_at=time.time(), map=mapping)
+        return mapping
+
+
+def _normalize(df):
+    df = df.dropna()
+    if df.empty:
+        return None
+    if df.index.tz is None:
+        df.index = df.index.tz_localize('UTC').tz_convert('Asia/Seoul')
+    else:
+        df.index = df.index.tz_convert('Asia/Seoul')
+    df.index = df.index.strftime('%Y-%m-%d')
+    return df
+
+
+def _yahoo_many(codes, start_dt):
+    """{code: DataFrame} — 여러 종목을 yf.download 한 번으로."""
+    import yfinance as yf
+
+    suffixes = market_suffixes()
+    tickers = {}
+    for code in codes:
+        suffix = suffixes.get(code)
+        if suffix == "":
+            continue
+        for s in ((suffix,) if suffix else ("KS", "KQ")):
+            tickers[f"{code}.{s}"] = code
+    if not tickers:
+        return {}
+    end_dt = datetime.datetime.now() + datetime.timedelta(days=1)
+    try:
+        raw = yf.download(list(tickers), start=start_dt, end=end_dt, progress=False, auto_adjust=True,
+                          group_by="ticker", threads=True)
+    except Exception:
+        return {}
+    out = {}
+    for ticker, code in tickers.items():
+        if code in out:
+            continue
+        if isinstance(raw.columns, pd.MultiIndex):
+            if ticker not in raw.columns.get_level_values(0):
+                continue
+            df = raw[ticker]
+        else:
+            df = raw
+        df = _normalize(df.copy())
+        if df is not None:
+            out[code] = df
+    return out
+
+
+def _naver(code, start_dt):
+    import FinanceDataReader as fdr
+    try:
+        return _normalize(fdr.DataReader(code, start_dt))
+    except Exception:
+        return None
+
+
+def download(code, start_dt, sources=SOURCES):
+    """(DataFrame, 출처) — 인덱스는 'YYYY-MM-DD' 문자열(서울 시간), 실패하면 (None, "").
+    download_many처럼 Yahoo를 먼저 받고, 없거나 실패했을 때만 Naver를 요청한다
+    (먼저 온 응답을 쓰면 같은 종목의 출처가 실행마다 바뀌어 수정주가와 원주가가 섞인다)."""
+    with stage("price_download", key=code) as s:
+        df, source = _first_valid(code, start_dt, sources)
+        s.outcome = source or "empty"
+        return df, source
+
+
+def _first_valid(code, start_dt, sources):
+    calls = []
+    if "Yahoo Finance" in sources:
+        calls.append((lambda: _yahoo_many([code], start_dt).get(code), "Yahoo Finance"))
+    if "Naver Finance" in sources:
+        calls.append((lambda: _naver(code, start_dt), "Naver Finance"))
+    for fetch, source in calls:
+        try:
+            df = fetch()
+        except Exception:  # 한 출처의 실패는 다음 출처로
+            df = None
+        if df is not None:
+            return df, source
+    return None, ""
+
+
+def download_many(codes, start_dt, sources=SOURCES, workers=8):
+    """{code: (DataFrame, 출처)} — Yahoo는 묶음 요청 한 번, Yahoo에 없는 종목만 Naver에서 동시에."""
+    results = {}
+    if "Yahoo Finance" in sources:
+        with stage("price_download_batch", key=f"{len(codes)}종목"):
+            yahoo = _yahoo_many(codes, start_dt)
+        results.update((code, (df, "Yahoo Finance")) for code, df in yahoo.items())
+    missing = [c for c in codes if c not in results]
+    if missing and "Naver Finance" in sources:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for code, df in zip(missing, pool.map(lambda c: _naver(c, start_dt), missing)):
+                if df is not None:
+                    results[code] = (df, "Naver Finance")
+    return results
+
+
+class PriceStore:
+    def __init__(self, root=None, downloader=download, batch_downloader=download_many):
+        self.root = root or os.path.join(config.DATA_DIR, "prices")
+        self.downloader = downloader
+        self.batch_downloader = batch_downloader
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _dir(self, code):
+        return os.path.join(self.root, code)
+
+    def _path(self, code, column, generation):
+        return os.path.join(self._dir(code), f"{column}.{generation}.bin")
+
+    def meta(self, code):
+        try:
+            with open(os.path.join(self._dir(code), "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if meta.get("layout") == LAYOUT else None
+
+    def _write_meta(self, code, meta):
+        path = os.path.join(self._dir(code), "meta.json")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _columns(self, code, meta):
+        if not meta["rows"]:
+            return {c: np.empty(0, dtype) for c, dtype in COLUMNS.items()}
+        return {c: np.memmap(self._path(code, c, meta["generation"]), dtype=dtype, mode="r", shape=(meta["rows"],))
+                for c, dtype in COLUMNS.items()}
+
+    def _read(self, code, select):
+        """(meta, select(열)) — 쓰는 중과 겹치면 다시 읽는다. select는 memmap에서 필요한 것을 복사해 돌려줘야 한다."""
+        for _ in range(READ_RETRIES):
+            meta = self.meta(code)
+            if meta is None or not meta["rows"]:
+                return meta, None
+            try:
+                value = select(self._columns(code, meta))
+            except (FileNotFoundError, ValueError):  # 다시 쓰기로 이전 세대가 지워졌거나 meta보다 짧은 파일
+                value = None
+            if value is not None and self.meta(code) == meta:
+                return meta, value
+            time.sleep(0.01)
+        return None, None
+
+    @staticmethod
+    def _arrays(df):
+        dates = np.asarray(df.index.str.replace("-", "", regex=False).astype(int), dtype=COLUMNS["date"])
+        arrays = {"date": dates}
+        for c, dtype in COLUMNS.items():
+            if c != "date":
+                arrays[c] = df[c].to_numpy(dtype=dtype)
+        return arrays
+
+    # 묶음 요청으로 미리 받아 둔 것이 start부터를 덮으면 그것을, 아니면 종목 하나만 받는다
+    def _fetch(self, code, start, sources, prefetched=None):
+        if prefetched is not None:
+            df, source, fetched_from = prefetched
+            if source in sources and fetched_from <= start:
+                return df[df.index >= _to_datetime(start).strftime('%Y-%m-%d')], source
+        return self.downloader(code, _to_datetime(start), sources)
+
+    # 전체 다시 쓰기 (처음 받을 때, 더 앞 구간이 필요할 때, 수정주가가 바뀌었을 때)
+    def _rewrite(self, code, start, sources, old_meta=None, prefetched=None):
+        df, source = self._fetch(code, start, sources, prefetched)
+        if df is None:
+            return old_meta
+        os.makedirs(self._dir(code), exist_ok=True)
+        meta = {"layout": LAYOUT, "rows": len(df), "source": source, "start": start, "fetched_at": time.time(),
+                "generation": time.time_ns()}
+        for c, arr in self._arrays(df).items():
+            with open(self._path(code, c, meta["generation"]), "wb") as f:
+                f.write(arr.tobytes())
+        self._write_meta(code, meta)
+        current = {os.path.basename(self._path(code, c, meta["generation"])) for c in COLUMNS}
+        for name in os.listdir(self._dir(code)):
+            if name.endswith(".bin") and name not in current:
+                try:
+                    os.remove(os.path.join(self._dir(code), name))
+                except FileNotFoundError:
+                    pass
+        return meta
+
+    # 파일은 줄이지 않는다: 읽는 쪽이 잡고 있는 mmap 범위가 파일 끝을 넘으면 안 되므로, 마지막 봉 자리부터 덮어쓴다
+    def _append(self, code, meta, keep, arrays):
+        meta = dict(meta, rows=keep)
+        self._write_meta(code, meta)
+        for c, dtype in COLUMNS.items():
+            with open(self._path(code, c, meta["generation"]), "r+b") as f:
+                f.seek(keep * np.dtype(dtype).itemsize)
+                f.write(arrays[c].tobytes())
+        meta["rows"] = keep + len(arrays["date"])
+        meta["fetched_at"] = time.time()
+        self._write_meta(code, meta)
+        return meta
+
+    def sync(self, code, start_dt=None, sources=SOURCES, prefetched=None):
+        """빠진 봉만 받아 저장소를 최신으로. 갱신된 meta (받기 실패 시 이전 meta 또는 None).
+        prefetched=(DataFrame, 출처, 받기 시작한 YYYYMMDD) 가 필요한 구간을 덮으면 네트워크를 쓰지 않는다."""
+        with self._lock:
+            meta = self.meta(code)
+            start = _to_int(start_dt) if start_dt is not None else (meta or {}).get("start")
+            if start is None:
+                raise ValueError("처음 받는 종목은 start_dt가 필요합니다.")
+            if meta is None or not meta["rows"] or start < meta["start"]:
+                return self._rewrite(code, min(start, meta["start"]) if meta and meta["rows"] else start, sources, meta,
+                                     prefetched)
+
+            rows = meta["rows"]
+            cols = self._columns(code, meta)
+            dates, closes = np.array(cols["date"]), np.array(cols["Close"])
+            first = int(dates[max(0, rows - OVERLAP_BARS)])
+            last = int(dates[-1])
+            df, source = self._fetch(code, first, (meta["source"],), prefetched)
+            if df is None or source != meta["source"]:
+                return meta
+            fresh = self._arrays(df)
+
+            # 겹치는 과거 봉(마지막 봉 제외) 종가 대조 → 다르면 수정주가 변경
+            pos = np.searchsorted(dates, fresh["date"])
+            hit = (pos < rows) & (fresh["date"] < last)
+            hit[hit] &= dates[pos[hit]] == fresh["date"][hit]
+            if hit.any():
+                old = closes[pos[hit]]
+                if (np.abs(fresh["Close"][hit] - old) > ADJUST_TOL * np.abs(old)).any():
+                    return self._rewrite(code, meta["start"], (meta["source"],), meta)
+
+            new = fresh["date"] >= last
+            if not new.any():
+                meta = dict(meta, fetched_at=time.time())
+                self._write_meta(code, meta)
+                return meta
+            keep = rows - 1 if fresh["date"][new][0] == last else rows
+            return self._append(code, meta, keep, {c: arr[new] for c, arr in fresh.items()})
+
+    def _needs_sync(self, meta, start_dt, max_age):
+        if max_age is None:
+            return False
+        if meta is None or not meta["rows"] or start_dt is not None and _to_int(start_dt) < meta["start"]:
+            return True
+        return time.time() - meta["fetched_at"] > max_age
+
+    def history(self, code, start_dt=None, max_age=MAX_AGE, sources=SOURCES):
+        """(DataFrame, 출처). max_age초보다 오래됐으면 먼저 sync, None이면 네트워크 없이 저장된 것만 읽는다."""
+        meta = self.meta(code)
+        needs_sync = self._needs_sync(meta, start_dt, max_age)
+        if max_age is not None:
+            cache_event("price_store", not needs_sync)
+        if needs_sync:
+            with stage("price_sync", key=code):
+                meta = self.sync(code, start_dt, sources)
+        if meta is None or not meta["rows"]:
+            return None, ""
+
+        def select(cols):
+            lo = int(np.searchsorted(cols["date"], _to_int(start_dt))) if start_dt is not None else 0
+            return {c: np.array(cols[c][lo:]) for c in COLUMNS}
+
+        meta, cols = self._read(code, select)
+        if cols is None:
+            return None, ""
+        index = pd.Index([f"{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}" for d in cols["date"].tolist()])
+        df = pd.DataFrame({c: cols[c] for c in COLUMNS if c != "date"}, index=index)
+        return df, meta["source"]
+
+    def history_many(self, codes, start_dt, max_age=MAX_AGE, sources=SOURCES):
+        """{code: (DataFrame, 출처)} — 갱신이 필요한 종목을 (출처, 처음/이어받기)별로 묶어 요청 한두 번으로 받는다."""
+        groups = {}
+        for code in dict.fromkeys(codes):
+            meta = self.meta(code)
+            if not self._needs_sync(meta, start_dt, max_age):
+                continue
+            if meta is None or not meta["rows"] or _to_int(start_dt) < meta["start"]:
+                groups.setdefault((sources, "full"), []).append((code, _to_int(start_dt)))
+            else:
+                meta, first = self._read(code, lambda cols: int(cols["date"][max(0, len(cols["date"]) - OVERLAP_BARS)]))
+                if first is None:
+                    groups.setdefault((sources, "full"), []).append((code, _to_int(start_dt)))
+                else:
+                    groups.setdefault(((meta["source"],), "tail"), []).append((code, first))
+        for (group_sources, _), members in groups.items():
+            fetched_from = min(start for _, start in members)
+            fetched = self.batch_downloader([code for code, _ in members], _to_datetime(fetched_from), group_sources)
+            for code, _ in members:
+                hit = fetched.get(code)
+                self.sync(code, start_dt, sources, prefetched=(*hit, fetched_from) if hit else None)
+        return {code: self.history(code, start_dt, max_age=None) for code in codes}
+
+    def generation(self, code):
+        """전체를 다시 쓴 시각(ns) — 이 값이 바뀌면 이 종목으로 만든 지표 상태는 버려야 한다."""
+        meta = self.meta(code)
+        return meta["generation"] if meta else 0
+
+    def fingerprint(self, code):
+        """저장된 내용이 바뀌었는지 비교용 (전체 다시 쓰기, 행 수, 마지막 봉 값) — 네트워크 없음."""
+        meta, last = self._read(code, lambda cols: tuple(float(cols[c][-1]) for c in COLUMNS))
+        if last is None:
+            return None
+        return (meta["generation"], meta["rows"]) + last
+
+    def invalidate(self, code):
+        with self._lock:
+            shutil.rmtree(self._dir(code), ignore_errors=True)
+
+    def codes(self):
+        return sorted(d for d in os.listdir(self.root) if os.path.isfile(os.path.join(self.root, d, "meta.json")))
+
+
+@functools.lru_cache(maxsize=None)
+def get_price_store():
+    return PriceStore()
+
+
+# 사용법:
+#   python -m core.price_store 005930 000660     # 받거나 빠진 봉만 갱신
+#   python -m core.price_store --invalidate 005930
+if __name__ == "__main__":
+    import sys
+
+    store = get_price_store()
+    args = sys.argv[1:]
+    if args and args[0] == "--invalidate":
+        for code in args[1:]:
+            store.invalidate(code)
+            print(f"{code} 삭제")
+    else:
+        start = datetime.datetime.now() - datetime.timedelta(days=600)
+        codes = args or store.codes()
+        t0 = time.perf_counter()
+        for code, (df, source) in store.history_many(codes, start, max_age=0).items():
+            print(f"{code}: {0 if df is None else len(df)}봉 ({source})")
+        print(f"{len(codes)}종목, {(time.perf_counter() - t0) * 1000:.0f} ms")
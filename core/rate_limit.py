@@ -0,0 +1,252 @@
+import atexit
+import datetime
+import functools
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+
+from core import config
+
+# --- OpenDART 호출 제어 (한도/재시도/사용량 기록) ---
+# core.dart_api.make_session()이 돌려주는 세션의 모든 DART 요청이 여기를 거친다.
+#   - 토큰 버킷: 프로세스 전체 초당 요청 수 제한 (DART_RATE_LIMIT, 0이면 무제한)
+#   - 적응형 동시 요청 수: 한도 초과(status 020 / HTTP 429)를 보면 절반으로 줄이고 잠시 모두 멈춘다.
+#     성공이 이어지면 하나씩 다시 늘린다 (AIMD)
+#   - 일시 오류(HTTP 5xx/429, 연결 오류, status 020/800/900)는 지터를 준 지수 백오프로 재시도
+#   - API 키별 일일 사용량을 SQLite에 남기고, 일일 한도(DART_DAILY_QUOTA)에 닿으면 요청 전에 막는다
+# 키 원문은 저장하지 않고 해시만 쓴다.
+
+RETRY_STATUS = {"020", "800", "900"}  # 한도 초과 / 점검 중 / 정의되지 않은 오류
+THROTTLE_STATUS = {"020"}
+RETRY_HTTP = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+QUOTA_FLUSH_SECONDS = 2.0
+_STATUS_RES = (re.compile(rb'"status"\s*:\s*"(\d{3})"'), re.compile(rb"<status>\s*(\d{3})\s*</status>"))
+
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+
+def key_id(api_key):
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _today():
+    return datetime.date.today().strftime("%Y%m%d")
+
+
+# 응답 본문 앞부분에서 DART status 코드 찾기 (원문 ZIP은 건너뛴다)
+def dart_status(content):
+    head = content[:512]
+    if head.startswith(b"PK"):
+        return None
+    for pattern in _STATUS_RES:
+        m = pattern.search(head)
+        if m:
+            return m.group(1).decode()
+    return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    if retry_after is not None:
+        return min(BACKOFF_CAP, retry_after)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))  # full jitter
+
+
+# 초당 rate개, 최대 burst개까지 모아 두는 토큰 버킷 (모자라면 기다린다)
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# 동시에 나가는 요청 수 상한을 한도 초과 신호에 맞춰 조절한다
+class AdaptiveConcurrency:
+    def __init__(self, max_limit):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self.successes = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self.cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, throttled=False, pause=0.0):
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                self.limit = max(1, self.limit // 2)
+                self.successes = 0
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            else:
+                self.successes += 1
+                if self.successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self.successes = 0
+            self.cond.notify_all()
+
+
+# --- API 키별 일일 사용량 (여러 프로세스가 같이 쓰는 SQLite, 요청마다 쓰지 않고 모아서 기록) ---
+class QuotaStore:
+    def __init__(self, path=None, daily_quota=None):
+        self.path = path or config.data_path("quota.sqlite3")
+        self.daily_quota = config.DART_DAILY_QUOTA if daily_quota is None else daily_quota
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            " key_id TEXT NOT NULL, day TEXT NOT NULL, requests INTEGER NOT NULL DEFAULT 0,"
+            " throttled INTEGER NOT NULL DEFAULT 0, errors INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (key_id, day))"
+        )
+        self._db.commit()
+        self._pending = {}  # (key_id, day) → [requests, throttled, errors]
+        self._base = {}     # (key_id, day) → DB에 기록된 요청 수 (마지막 flush 기준)
+        self._flushed = time.monotonic()
+        atexit.register(self.flush)  # 끝날 때 남은 집계도 기록
+
+    def record(self, api_key, throttled=False, error=False):
+        k = (key_id(api_key), _today())
+        with self._lock:
+            counts = self._pending.setdefault(k, [0, 0, 0])
+            counts[0] += 1
+            counts[1] += int(throttled)
+            counts[2] += int(error)
+            due = time.monotonic() - self._flushed >= QUOTA_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed = time.monotonic()
+            if pending:
+                self._db.executemany(
+                    "INSERT INTO usage (key_id, day, requests, throttled, errors) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(key_id, day) DO UPDATE SET requests = requests + excluded.requests,"
+                    " throttled = throttled + excluded.throttled, errors = errors + excluded.errors",
+                    [(kid, day, *c) for (kid, day), c in pending.items()]
+                )
+                self._db.commit()
+            self._base.clear()
+
+    def used(self, api_key):
+        k = (key_id(api_key), _today())
+        with self._lock:
+            if k not in self._base:
+                row = self._db.execute("SELECT requests FROM usage WHERE key_id = ? AND day = ?", k).fetchone()
+                self._base[k] = row[0] if row else 0
+            return self._base[k] + self._pending.get(k, [0])[0]
+
+    def usage(self, api_key, days=7):
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT day, requests, throttled, errors FROM usage WHERE key_id = ? ORDER BY day DESC LIMIT ?",
+                (key_id(api_key), days)
+            ).fetchall()
+        return [dict(zip(["day", "requests", "throttled", "errors"], r)) for r in rows]
+
+    def check(self, api_key):
+        if self.daily_quota and self.used(api_key) >= self.daily_quota:
+            raise QuotaExceeded(f"오늘 OpenDART 요청 한도({self.daily_quota:,}건)를 모두 사용했습니다.")
+
+
+# --- 프로세스 전체에서 공유하는 제어기 ---
+class DartLimiter:
+    def __init__(self, rate=None, burst=None, max_concurrency=None, quota=None, max_retries=MAX_RETRIES):
+        self.bucket = TokenBucket(config.DART_RATE_LIMIT if rate is None else rate, burst)
+        self.concurrency = AdaptiveConcurrency(config.DART_MAX_CONCURRENCY if max_concurrency is None else max_concurrency)
+        self.quota = quota if quota is not None else QuotaStore()
+        self.max_retries = max_retries
+        self.retries = 0
+
+    def call(self, send, api_key):
+        """send()를 한도 안에서 실행하고 일시 오류면 재시도한다. 마지막 응답(또는 예외)을 그대로 돌려준다."""
+        for attempt in range(self.max_retries + 1):
+            self.quota.check(api_key)
+            self.bucket.acquire()
+            self.concurrency.acquire()
+            resp, exc = None, None
+            try:
+                resp = send()
+            except OSError as e:  # requests의 연결/타임아웃 오류는 OSError 계열
+                exc = e
+            except BaseException:
+                self.concurrency.release()
+                raise
+            retry, throttled, retry_after = self._classify(resp, exc)
+            pause = backoff_delay(attempt, retry_after) if retry else 0.0
+            self.concurrency.release(throttled=throttled, pause=pause if throttled else 0.0)
+            self.quota.record(api_key, throttled=throttled, error=retry)
+            if not retry or attempt == self.max_retries:
+                break
+            self.retries += 1
+            time.sleep(pause)
+        if exc is not None:
+            raise exc
+        return resp
+
+    @staticmethod
+    def _classify(resp, exc):
+        """(재시도 여부, 한도 초과 여부, Retry-After 초)"""
+        if exc is not None:
+            return True, False, None
+        if resp.status_code in RETRY_HTTP:
+            retry_after = resp.headers.get("Retry-After")
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            return True, resp.status_code == 429, retry_after
+        status = dart_status(resp.content)
+        if status in RETRY_STATUS:
+            return True, status in THROTTLE_STATUS, None
+        return False, False, None
+
+    def snapshot(self, api_key=None):
+        c = self.concurrency
+        out = {"concurrency": c.limit, "max_concurrency": c.max_limit, "in_flight": c.in_flight,
+               "throttled": c.throttled, "retries": self.retries, "rate": self.bucket.rate}
+        if api_key is not None:
+            out.update(used_today=self.quota.used(api_key), daily_quota=self.quota.daily_quota)
+        return out
+
+
+@functools.lru_cache(maxsize=None)
+def get_dart_limiter():
+    return DartLimiter()
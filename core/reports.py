@@ -0,0 +1,91 @@
+from collections import namedtuple
+
+from core.dart_api import fetch_document, read_document_html
+from core.extract import EXTRACTORS, STRUCTURED_EXTRACTORS, extractor_version
+from core.metrics import cache_event, get_metrics, keyed, stage
+from core.tables import Table
+
+# 구조 포함 결과: 텍스트, 장 색인 [{"title","start","end"}], 표 [core.tables.Table]
+Report = namedtuple("Report", ["text", "sections", "tables"])
+
+
+# --- 보고서 1건 로더 (캐시 → 네트워크 → 파싱) ---
+# fetch/parse를 나눠 두어 iter_pipeline의 다운로드/파싱 풀에 그대로 넘길 수 있다.
+# 추출 텍스트가 캐시에 있으면 fetch 단계에서 바로 돌려주므로 네트워크도 파싱도 하지 않는다.
+# structured=True면 parse/load가 텍스트 대신 Report를 돌려준다 (표 파일 저장, 청크 내보내기).
+# executor(ProcessPoolExecutor 등)를 주면 HTML 해석/추출을 그 풀에서 돌린다 (CPU 코어 모두 사용, core.batch).
+# 단계 지표(core.metrics)에는 rcept_no를 키로 붙이고, 다른 프로세스에서 기록된 단계도 결과와 함께 받아 합친다.
+class ReportLoader:
+    def __init__(self, session, api_key, extractor="ai", cache=None, structured=False, executor=None):
+        self.session = session
+        self.api_key = api_key
+        self.structured = structured
+        self.extractor = extractor
+        self.extract = STRUCTURED_EXTRACTORS[extractor] if structured else EXTRACTORS[extractor]
+        self.version = extractor_version(extractor, structured)
+        self.cache = cache
+        self.executor = executor
+
+    def fetch(self, rcept_no):
+        with keyed(rcept_no):
+            return self._fetch(rcept_no)
+
+    def _fetch(self, rcept_no):
+        if self.cache is not None:
+            text = self.cache.get_text(rcept_no, self.version)
+            if text is not None and not self.structured:
+                cache_event("doc_text", True)
+                return text
+            if text is not None:
+                structure = self.cache.get_structure(rcept_no, self.version)
+                if structure is not None:
+                    cache_event("doc_text", True)
+                    return Report(text, structure["sections"], [Table.from_dict(t) for t in structure["tables"]])
+            cache_event("doc_text", False)
+            raw = self.cache.get_raw(rcept_no)
+            cache_event("doc_raw", raw is not None)
+            if raw is not None:
+                return raw
+        raw = fetch_document(self.session, self.api_key, rcept_no)
+        if self.cache is not None:
+            self.cache.put_raw(rcept_no, raw)
+        return raw
+
+    def parse(self, rcept_no, payload):
+        with keyed(rcept_no):
+            return self._parse(rcept_no, payload)
+
+    def _parse(self, rcept_no, payload):
+        if not isinstance(payload, bytes):
+            return payload
+        if self.executor is not None:
+            result, events = self.executor.submit(extract_payload, self.extractor, self.structured, payload).result()
+            get_metrics().merge(events)
+        else:
+            html = read_document_html(payload)
+            with stage("extract") as s:
+                s.bytes = len(html)
+                result = self.extract(html)
+        if self.structured:
+            result = Report(*result)
+        if self.cache is not None:
+            self.cache.put_text(rcept_no, self.version, result.text if self.structured else result)
+            if self.structured:
+                self.cache.put_structure(rcept_no, self.version, {
+                    "sections": result.sections, "tables": [t.to_dict() for t in result.tables],
+                })
+        return result
+
+    def load(self, rcept_no):
+        return self.parse(rcept_no, self.fetch(rcept_no))
+
+
+# 다른 프로세스에서 실행되는 추출 (피클 가능한 최상위 함수) → (결과, 그 프로세스에서 기록된 단계 지표)
+def extract_payload(extractor, structured, raw):
+    extract = STRUCTURED_EXTRACTORS[extractor] if structured else EXTRACTORS[extractor]
+    with get_metrics().capture() as events:
+        html = read_document_html(raw)
+        with stage("extract") as s:
+            s.bytes = len(html)
+            result = extract(html)
+    return result, events
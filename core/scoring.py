@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from core.indicators import INDICATOR_COLUMNS, PRICE_COLUMNS, build_panel, compute_panel
+
+# --- 기술적 점수 (모든 봉을 배열로 한 번에) + 신호 백테스트 ---
+# pages/2 analyze_market_deep의 점수 규칙을 봉 하나가 아니라 배열 전체(마지막 축 = 시간)에 적용한다.
+# 종목 하나(1차원)든 패널(종목 × 봉, core.indicators.compute_panel 결과)이든 같은 함수로 계산된다.
+# 규칙 (기본 50점, 0~100으로 자름):
+#   추세   종가>MA20 +10 / 아니면 -10, 정배열(5>20>60) +10, 역배열 -10, 골든크로스(5일선이 20일선 돌파) +5
+#   변동성 종가>상단 -5, 종가<하단 +5
+#   심리   RSI≥70 -10, RSI≤30 +10
+#   수급   거래량이 20일 평균의 200% 초과 → 양봉(전일 종가보다 위) +5 / 아니면 -5
+# NaN 비교는 False로 계산된다 (if 문으로 한 봉씩 계산하던 것과 같은 결과).
+
+LEVELS = {
+    2: ("강력 매수", "green"),
+    1: ("매수 우위", "blue"),
+    0: ("관망 (Hold)", "gray"),
+    -1: ("매도 우위", "orange"),
+    -2: ("강력 매도", "red"),
+}
+HORIZONS = (5, 20, 60)
+SQUEEZE_WIDTH = 10   # 밴드폭(%)이 이보다 좁으면 스퀴즈
+NEAR_PCT = 3         # 60일 고저에 이만큼(%) 이내면 저항/지지 근접
+
+
+def _prev(x):
+    out = np.full_like(x, np.nan)
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+def score_signals(v):
+    """v: {가격/지표 이름: 배열(..., days)} → {조건 이름: bool 배열, "vol_ratio", "trend_score", "score", "level"}."""
+    close, ma5, ma20, ma60 = v["Close"], v["MA5"], v["MA20"], v["MA60"]
+    prev_ma5, prev_ma20, prev_hist = _prev(ma5), _prev(ma20), _prev(v["Hist"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_ratio = v["Volume"] / v["Vol_MA20"] * 100
+        dist_high = (v["High60"] - close) / close * 100
+        dist_low = (close - v["Low60"]) / close * 100
+
+    s = {
+        "above_ma20": close > ma20,
+        "aligned_up": (ma5 > ma20) & (ma20 > ma60),
+        "aligned_down": (ma5 < ma20) & (ma20 < ma60),
+        "golden_cross": (ma5 > ma20) & (prev_ma5 <= prev_ma20),
+        "above_upper": close > v["Upper"],
+        "below_lower": close < v["Lower"],
+        "squeeze": v["BandWidth"] < SQUEEZE_WIDTH,
+        "macd_up": v["MACD"] > v["Signal"],
+        "hist_rising": (v["Hist"] > prev_hist) & (v["Hist"] > 0),
+        "overbought": v["RSI"] >= 70,
+        "oversold": v["RSI"] <= 30,
+        "vol_spike": vol_ratio > 200,
+        "vol_dry": vol_ratio < 50,
+        "up_day": close > _prev(close),
+        "near_high": (v["High60"] > 0) & (dist_high < NEAR_PCT),
+        "near_low": (v["Low60"] > 0) & (dist_low < NEAR_PCT),
+    }
+    s["vol_ratio"] = vol_ratio
+
+    trend = 50 + np.where(s["above_ma20"], 10, -10) + 10 * s["aligned_up"] - 10 * s["aligned_down"] + 5 * s["golden_cross"]
+    score = (trend - 5 * s["above_upper"] + 5 * (s["below_lower"] & ~s["above_upper"])
+             - 10 * s["overbought"] + 10 * (s["oversold"] & ~s["overbought"])
+             + s["vol_spike"] * np.where(s["up_day"], 5, -5))
+    score = np.clip(score, 0, 100)
+    s["trend_score"] = trend
+    s["score"] = score
+    s["level"] = np.select([score >= 80, score >= 60, score <= 20, score <= 40], [2, 1, -2, -1], 0).astype(np.int8)
+    return s
+
+
+def score_frame(df):
+    """종목 하나(calculate_indicators 결과) → 봉마다 점수/단계/조건 열이 있는 DataFrame."""
+    v = {name: df[name].to_numpy(dtype=np.float64) for name in PRICE_COLUMNS + INDICATOR_COLUMNS}
+    return pd.DataFrame(score_signals(v), index=df.index)
+
+
+def sentiment(level):
+    """단계 → (판정, 색)."""
+    return LEVELS[int(level)]
+
+
+# --- 신호별 이후 수익률 ---
+def forward_returns(close, horizon):
+    """h봉 뒤 종가 / 오늘 종가 - 1 (끝부분 h봉은 NaN)."""
+    out = np.full_like(close, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., :-horizon] = close[..., horizon:] / close[..., :-horizon] - 1
+    return out
+
+
+def backtest(panel, values=None, horizons=HORIZONS):
+    """패널의 모든 종목·모든 봉에서 판정 단계별 이후 수익률 통계.
+    진입은 신호가 난 봉의 종가, 청산은 h봉 뒤 종가 (수수료/슬리피지 없음).
+    지표가 다 채워진 봉(MA60/RSI/Vol_MA20 존재)만 센다. 결과 행: 판정 + "전체" 기준선."""
+    values = values if values is not None else compute_panel(panel)
+    v = dict(panel.arrays, **values)
+    s = score_signals(v)
+    valid = np.isfinite(v["MA60"]) & np.isfinite(v["RSI"]) & np.isfinite(v["Vol_MA20"]) & np.isfinite(v["Close"])
+    fwd = {h: forward_returns(v["Close"], h) for h in horizons}
+
+    rows, index = [], []
+    groups = [(label, valid & (s["level"] == level)) for level, (label, _) in LEVELS.items()] + [("전체", valid)]
+    for label, mask in groups:
+        row = {"신호 수": int(mask.sum())}
+        for h in horizons:
+            r = fwd[h][mask & np.isfinite(fwd[h])]
+            row[f"{h}일 평균(%)"] = r.mean() * 100 if r.size else np.nan
+            row[f"{h}일 중앙(%)"] = np.median(r) * 100 if r.size else np.nan
+            row[f"{h}일 상승비율(%)"] = (r > 0).mean() * 100 if r.size else np.nan
+        rows.append(row)
+        index.append(label)
+    result = pd.DataFrame(rows, index=index)
+    for h in horizons:  # 기준선(모든 봉) 대비 초과 수익
+        result[f"{h}일 초과(%p)"] = result[f"{h}일 평균(%)"] - result.loc["전체", f"{h}일 평균(%)"]
+    return result
+
+
+def backtest_frames(frames, horizons=HORIZONS, dtype=np.float64):
+    """{ticker: OHLCV DataFrame} → backtest 결과."""
+    panel = build_panel(frames, dtype=dtype)
+    return backtest(panel, compute_panel(panel), horizons)
+
+
+# 사용법:
+#   python -m core.scoring              # 로컬 일봉 저장소(core.price_store)의 모든 종목으로 (네트워크 없음)
+#   python -m core.scoring 005930 000660
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from core.price_store import get_price_store
+
+    store = get_price_store()
+    codes = sys.argv[1:] or store.codes()
+    t0 = time.perf_counter()
+    frames = {}
+    for code in codes:
+        df, _ = store.history(code, max_age=None)
+        if df is not None:
+            frames[code] = df
+    t1 = time.perf_counter()
+    result = backtest_frames(frames)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.2f}".format):
+        print(result)
+    print(f"{len(frames)}종목 — 읽기 {t1 - t0:.2f}s, 지표+점수+백테스트 {time.perf_counter() - t1:.2f}s")
@@ -0,0 +1,168 @@
+import argparse
+import datetime
+import functools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import build_panel, compute_panel
+from core.price_store import MAX_AGE, PriceStore, get_price_store, market_suffixes
+from core.scoring import LEVELS, score_signals
+
+# --- 전 종목 스크리너 (기술적 점수 순위) ---
+# 상장 종목 전체에 pages/2와 같은 지표(core.indicators)와 점수 규칙(core.scoring)을 적용해 순위를 매긴다.
+#   1) 일봉 저장소(core.price_store)를 갱신 — 오래된 종목만, 묶음 요청으로 (장중에는 마지막 봉만 다시 받는다)
+#   2) 저장 내용이 바뀐 종목만 다시 계산 — 지난 스캔 결과를 종목별 fingerprint와 함께 들고 있다
+#   3) 계산은 종목 묶음별로 프로세스 풀에서: 각 프로세스가 저장소 파일을 직접 mmap으로 읽으므로 큰 데이터를 주고받지 않는다
+# 바뀐 종목이 적으면(장중 재스캔) 프로세스를 띄우지 않고 이 프로세스에서 바로 계산한다.
+
+PERIOD_DAYS = 300     # pages/2의 get_stock_data(user_input, 300)과 같은 구간
+CHUNK = 200           # 프로세스 하나가 한 번에 계산하는 종목 수
+FETCH_BATCH = 200     # 저장소 갱신 묶음 요청 하나의 종목 수
+INLINE_MAX = 100      # 바뀐 종목이 이보다 적으면 프로세스 풀 없이 계산
+FLAGS = ("golden_cross", "squeeze", "vol_spike", "oversold", "overbought", "aligned_up")
+COLUMNS = ["code", "date", "close", "change", "score", "level", "rsi", "vol_ratio", "bandwidth", *FLAGS, "fingerprint"]
+
+
+def _start_dt(period_days):
+    return datetime.datetime.now() - datetime.timedelta(days=period_days * 2)
+
+
+# 프로세스 풀 작업: 종목 묶음의 마지막 봉 점수/조건 (spawn으로 띄우므로 모듈 최상위 함수)
+def _score_chunk(root, codes, start_dt):
+    store = PriceStore(root)
+    frames, prints = {}, {}
+    for code in codes:
+        fp = store.fingerprint(code)
+        df, _ = store.history(code, start_dt, max_age=None)
+        if df is not None and len(df) >= 2:
+            frames[code], prints[code] = df, fp
+    if not frames:
+        return []
+    panel = build_panel(frames)
+    values = compute_panel(panel)
+    s = score_signals(dict(panel.arrays, **values))
+    close = panel.arrays["Close"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (close[:, -1] / close[:, -2] - 1) * 100
+    rows = []
+    for i, code in enumerate(panel.tickers):
+        rows.append({
+            "code": code, "date": panel.dates[i][-1], "close": float(close[i, -1]), "change": float(change[i]),
+            "score": int(s["score"][i, -1]), "level": int(s["level"][i, -1]), "rsi": float(values["RSI"][i, -1]),
+            "vol_ratio": float(s["vol_ratio"][i, -1]), "bandwidth": float(values["BandWidth"][i, -1]),
+            **{flag: bool(s[flag][i, -1]) for flag in FLAGS},
+            "fingerprint": prints[code],
+        })
+    return rows
+
+
+def apply_filters(df, rsi_max=None, golden_cross=False, squeeze=False, vol_spike=False, min_score=None, levels=None):
+    """조건을 모두 만족하는 종목만 (점수 높은 순, 같으면 거래량 비율 순)."""
+    mask = pd.Series(True, index=df.index)
+    if rsi_max is not None:
+        mask &= df["rsi"] <= rsi_max
+    if golden_cross:
+        mask &= df["golden_cross"]
+    if squeeze:
+        mask &= df["squeeze"]
+    if vol_spike:
+        mask &= df["vol_spike"]
+    if min_score is not None:
+        mask &= df["score"] >= min_score
+    if levels:
+        mask &= df["level"].isin(levels)
+    return df[mask].sort_values(["score", "vol_ratio"], ascending=False)
+
+
+class Screener:
+    def __init__(self, store=None, procs=None):
+        self.store = store or get_price_store()
+        self.procs = procs or os.cpu_count() or 1
+        self._rows = {}     # code → 마지막 스캔 결과 행
+        self._day = None    # 날짜가 바뀌면 구간 시작일도 바뀌므로 처음부터
+        self._lock = threading.Lock()
+        self.scanned_at = None
+        self.stats = {}
+
+    def scan(self, codes=None, names=None, period_days=PERIOD_DAYS, refresh=True, max_age=MAX_AGE, log=None):
+        """codes(기본: KRX 상장 전체)의 최신 점수표 DataFrame (index=종목코드). names={code: 회사명}이면 이름 열을 붙인다."""
+        with self._lock:
+            codes = list(codes if codes is not None else market_suffixes())
+            start_dt = _start_dt(period_days)
+            today = datetime.date.today()
+            if self._day != today:
+                self._rows, self._day = {}, today
+            t0 = time.perf_counter()
+
+            if refresh:
+                for i in range(0, len(codes), FETCH_BATCH):
+                    self.store.history_many(codes[i:i + FETCH_BATCH], start_dt, max_age=max_age)
+                    if log:
+                        log(f"시세 갱신 {min(i + FETCH_BATCH, len(codes))}/{len(codes)}")
+            t1 = time.perf_counter()
+
+            changed = [c for c in codes if c not in self._rows or self._rows[c]["fingerprint"] != self.store.fingerprint(c)]
+            chunks = [changed[i:i + CHUNK] for i in range(0, len(changed), CHUNK)]
+            if len(changed) <= INLINE_MAX or self.procs == 1:
+                results = [_score_chunk(self.store.root, chunk, start_dt) for chunk in chunks]
+            else:
+                ctx = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=min(self.procs, len(chunks)), mp_context=ctx) as pool:
+                    results = list(pool.map(_score_chunk, [self.store.root] * len(chunks), chunks,
+                                            [start_dt] * len(chunks)))
+            for rows in results:
+                for row in rows:
+                    self._rows[row["code"]] = row
+            t2 = time.perf_counter()
+
+            self.scanned_at = time.time()
+            self.stats = {"codes": len(codes), "scored": sum(c in self._rows for c in codes), "recomputed": len(changed),
+                          "fetch_s": round(t1 - t0, 2), "score_s": round(t2 - t1, 2)}
+            rows = [self._rows[c] for c in codes if c in self._rows]
+        df = pd.DataFrame(rows, columns=COLUMNS).drop(columns="fingerprint").set_index("code")
+        df.insert(0, "name", [names.get(c, c) for c in df.index] if names else df.index)
+        df["sentiment"] = [LEVELS[level][0] for level in df["level"]]
+        return df.sort_values(["score", "vol_ratio"], ascending=False)
+
+
+@functools.lru_cache(maxsize=None)
+def get_screener():
+    return Screener()
+
+
+# 사용법:
+#   python -m core.screener --rsi-max 30 --top 30          # 상장 전체 (처음에는 시세를 받느라 오래 걸린다)
+#   python -m core.screener --golden-cross --vol-spike --no-refresh   # 저장된 시세만으로
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전 종목 기술적 점수 스크리너")
+    parser.add_argument("codes", nargs="*", help="종목코드 (기본: KRX 상장 전체)")
+    parser.add_argument("--rsi-max", type=float)
+    parser.add_argument("--golden-cross", action="store_true")
+    parser.add_argument("--squeeze", action="store_true")
+    parser.add_argument("--vol-spike", action="store_true", help="거래량 20일 평균의 200%% 초과")
+    parser.add_argument("--min-score", type=int)
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--procs", type=int, default=None)
+    parser.add_argument("--no-refresh", action="store_true", help="시세를 받지 않고 저장된 것만")
+    args = parser.parse_args(argv)
+
+    screener = Screener(procs=args.procs)
+    codes = args.codes or (screener.store.codes() if args.no_refresh else None)
+    df = screener.scan(codes, refresh=not args.no_refresh, log=print)
+    df = apply_filters(df, rsi_max=args.rsi_max, golden_cross=args.golden_cross, squeeze=args.squeeze,
+                       vol_spike=args.vol_spike, min_score=args.min_score)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(df.head(args.top).round(2))
+    print(f"{len(df)}종목 일치 / {screener.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import functools
+import re
+import sqlite3
+import threading
+import time
+
+from core import config
+
+# --- 로컬 전문 검색 색인 (SQLite FTS5, trigram) ---
+# 번들 작업이 보고서를 추출할 때마다 장(section) 단위로 색인에 넣는다 (rcept_no + 장 번호가 키).
+#   - trigram 토크나이저: 띄어쓰기/조사와 상관없이 3글자 조각으로 찾으므로 한국어에 맞고 형태소 분석기가 필요 없다
+#   - 3글자 미만 검색어(예: "매출")는 trigram으로 찾을 수 없어 LIKE 조건으로 걸러낸다
+#   - 같은 추출기 버전으로 이미 색인된 보고서는 건너뛰고, 버전이 바뀌면 그 보고서만 다시 넣는다
+#     (ai 텍스트로 색인된 보고서를 full 텍스트로 덮어쓰지는 않는다)
+#   - 순위는 bm25 (장 제목 가중치 2배), 결과에는 검색어 주변 스니펫을 붙인다
+# 캐시에만 있고 색인에 없는 보고서는 `python -m core.search_index backfill` 로 채운다 (메타데이터는 카탈로그에서).
+
+SNIPPET_TOKENS = 24
+MIN_TRIGRAM = 3
+HEAD_TITLE = "머리말"  # 첫 장 앞부분
+EXTRACTOR_RANK = {"ai": 0, "full": 1}  # 같은 보고서가 두 추출기로 들어오면 장 색인이 있는 ai 텍스트를 남긴다
+
+
+def _terms(query):
+    return [quoted or word for quoted, word in re.findall(r'"([^"]+)"|(\S+)', query) if quoted or word]
+
+
+def _extractor_rank(version):
+    return EXTRACTOR_RANK.get(version.split("-", 1)[0], len(EXTRACTOR_RANK))
+
+
+def _split_sections(text, sections):
+    """(장 제목, 본문) 목록. 장 색인이 없으면 전체를 한 덩어리로."""
+    if not sections:
+        return [(HEAD_TITLE, text)] if text.strip() else []
+    parts = []
+    if sections[0]["start"] > 0 and text[:sections[0]["start"]].strip():
+        parts.append((HEAD_TITLE, text[:sections[0]["start"]]))
+    parts.extend((s["title"], text[s["start"]:s["end"]]) for s in sections)
+    return parts
+
+
+class SearchIndex:
+    def __init__(self, path=None):
+        self.path = path or config.data_path("search.sqlite3")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " rcept_no TEXT PRIMARY KEY, corp_code TEXT, corp_name TEXT, report_nm TEXT, rcept_dt TEXT,"
+            " version TEXT NOT NULL, indexed_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5("
+            " title, body, rcept_no UNINDEXED, section_no UNINDEXED, tokenize = 'trigram')"
+        )
+        self._db.commit()
+
+    def version_of(self, rcept_no):
+        with self._lock:
+            row = self._db.execute("SELECT version FROM docs WHERE rcept_no = ?", (rcept_no,)).fetchone()
+        return row[0] if row else None
+
+    # 보고서 1건 색인 (이미 같은 버전이거나 더 나은 추출기로 색인돼 있으면 아무것도 하지 않고 False)
+    def add(self, rcept_no, text, sections, meta, version):
+        current = self.version_of(rcept_no)
+        if current == version or current is not None and _extractor_rank(current) < _extractor_rank(version):
+            return False
+        rows = [(title, body, rcept_no, i) for i, (title, body) in enumerate(_split_sections(text, sections))]
+        with self._lock:
+            self._db.execute("DELETE FROM sections WHERE rcept_no = ?", (rcept_no,))
+            self._db.executemany("INSERT INTO sections (title, body, rcept_no, section_no) VALUES (?, ?, ?, ?)", rows)
+            self._db.execute(
+                "INSERT OR REPLACE INTO docs (rcept_no, corp_code, corp_name, report_nm, rcept_dt, version, indexed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rcept_no, meta.get("corp_code"), meta.get("corp_name"), meta.get("report_nm"), meta.get("rcept_dt"),
+                 version, time.time())
+            )
+            self._db.commit()
+        return True
+
+    def remove(self, rcept_no):
+        with self._lock:
+            self._db.execute("DELETE FROM sections WHERE rcept_no = ?", (rcept_no,))
+            self._db.execute("DELETE FROM docs WHERE rcept_no = ?", (rcept_no,))
+            self._db.commit()
+
+    def search(self, query, limit=50, corp_name=None, start_date=None, end_date=None):
+        """[{rcept_no, corp_name, report_nm, rcept_dt, section, snippet, score}] — 점수가 낮을수록 관련도가 높다."""
+        terms = _terms(query)
+        long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM]
+        short_terms = [t for t in terms if len(t) < MIN_TRIGRAM]
+        if not terms:
+            return []
+        where, params = [], []
+        if long_terms:
+            where.append("sections MATCH ?")
+            params.append(" ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+        for t in short_terms:
+            where.append("(sections.body LIKE ? OR sections.title LIKE ?)")
+            params += [f"%{t}%"] * 2
+        if corp_name:
+            where.append("d.corp_name LIKE ?")
+            params.append(f"%{corp_name}%")
+        if start_date:
+            where.append("d.rcept_dt >= ?")
+            params.append(start_date)
+        if end_date:
+            where.append("d.rcept_dt <= ?")
+            params.append(end_date)
+        if long_terms:
+            snippet = f"snippet(sections, 1, '**', '**', '…', {SNIPPET_TOKENS})"
+            score = "bm25(sections, 2.0, 1.0)"
+        else:  # 짧은 검색어만 있으면 trigram 순위를 쓸 수 없다 → 최신 공시 순
+            snippet = "substr(sections.body, max(1, instr(sections.body, ?) - 40), 120)"
+            params.insert(0, short_terms[0])
+            score = "0"
+        sql = (f"SELECT sections.rcept_no, d.corp_name, d.report_nm, d.rcept_dt, sections.title, {snippet}, {score} AS score"
+               " FROM sections JOIN docs d ON d.rcept_no = sections.rcept_no"
+               f" WHERE {' AND '.join(where)} ORDER BY score, d.rcept_dt DESC LIMIT ?")
+        with self._lock:
+            rows = self._db.execute(sql, (*params, limit)).fetchall()
+        keys = ["rcept_no", "corp_name", "report_nm", "rcept_dt", "section", "snippet", "score"]
+        return [dict(zip(keys, r)) for r in rows]
+
+    def stats(self):
+        with self._lock:
+            docs = self._db.execute("SELECT COUNT(*), COUNT(DISTINCT corp_code) FROM docs").fetchone()
+            sections = self._db.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+        return {"docs": docs[0], "corps": docs[1], "sections": sections}
+
+    # 원문 캐시에는 있지만 색인에 없는 보고서를 카탈로그 메타데이터와 함께 넣는다
+    def backfill(self, extractor="ai", limit=None):
+        from core.catalog import get_filing_catalog
+        from core.doc_cache import get_document_cache
+        from core.extract import extractor_version
+
+        version = extractor_version(extractor, structured=True)  # 번들 작업/일괄 처리가 넣은 장 색인 포함 결과
+        cache = get_document_cache()
+        catalog = get_filing_catalog()
+        added = 0
+        for meta in catalog.iter_filings():
+            if limit is not None and added >= limit:
+                break
+            if self.version_of(meta["rcept_no"]) == version:
+                continue
+            text = cache.get_text(meta["rcept_no"], version)
+            if text is None:
+                continue
+            structure = cache.get_structure(meta["rcept_no"], version) or {}
+            added += self.add(meta["rcept_no"], text, structure.get("sections") or [], meta, version)
+        return added
+
+
+@functools.lru_cache(maxsize=None)
+def get_search_index():
+    return SearchIndex()
+
+
+# 사용법:
+#   python -m core.search_index backfill        # 캐시에 있는 추출 텍스트를 색인에 채우기
+#   python -m core.search_index search 반도체 수출
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    index = get_search_index()
+    if cmd == "backfill":
+        print(f"새로 색인한 보고서 {index.backfill()}건")
+    elif cmd == "search":
+        t0 = time.perf_counter()
+        hits = index.search(" ".join(sys.argv[2:]), limit=20)
+        for h in hits:
+            print(f"{h['rcept_dt']} {h['corp_name']} {h['report_nm']} [{h['section']}]\n    {h['snippet']}")
+        print(f"{len(hits)}건, {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(index.stats())
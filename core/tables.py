@@ -0,0 +1,257 @@
+import io
+import re
+
+# --- 표 구조 엔진 (셀 한 번 방문, 중첩 표 분리, colspan/rowspan 격자 배치) ---
+# core.extract_stream의 이벤트 처리기가 셀 문자열을 한 번씩만 넘겨 주고,
+# 여기서는 행/셀을 격자로 펼쳐 마크다운과 열 단위(타입 지정) 데이터로 바꾼다.
+#   - 중첩 표의 행/셀은 바깥 표에 섞이지 않고 자기 표에만 들어간다 (본문에는 바깥 표 바로 뒤에 출력)
+#   - colspan은 옆 칸으로, rowspan은 아래 행으로 같은 값을 채운다 (pandas.read_html과 같은 방식)
+#   - 머리글: <thead> 안의 행 또는 표 맨 앞에서 <th>로만 된 행들. 여러 줄이면 열마다 이어 붙인다.
+
+MAX_SPAN = 1000
+NUMBER_RE = re.compile(r"^[+-]?\d+(?:\.\d+)?$")
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _span(attrs, name):
+    try:
+        value = int(str(attrs.get(name, 1)).strip() or 1)
+    except (TypeError, ValueError):
+        return 1
+    return min(max(value, 1), MAX_SPAN)
+
+
+def _cell_text(parts):
+    # 셀 안 줄바꿈/파이프는 표 한 줄을 깨뜨리므로 공백/이스케이프로 바꾼다
+    text = "".join(parts).replace("\r", " ").replace("\n", " ").replace("|", "\\|")
+    return text.replace("\ue000", "").replace("\ue001", "")  # 추출기 위치 표식과 겹치지 않게
+
+
+class _Row:
+    __slots__ = ("cells", "head")
+
+    def __init__(self, head):
+        self.cells = []
+        self.head = head
+
+
+class _Cell:
+    __slots__ = ("parts", "colspan", "rowspan", "th")
+
+    def __init__(self, th, colspan, rowspan):
+        self.parts = []
+        self.th = th
+        self.colspan = colspan
+        self.rowspan = rowspan
+
+
+# --- 열린 <table> 하나 ---
+class TableBuilder:
+    def __init__(self, section=None, depth=0):
+        self.section = section
+        self.depth = depth
+        self.rows = []
+        self.open_rows = []
+        self.open_cells = []
+        self.loose = []  # 셀 밖 문자열 (행이 하나도 없는 표일 때만 본문으로 나간다)
+        self.children = []
+        self.thead = 0
+
+    def start_row(self):
+        row = _Row(self.thead > 0)
+        self.rows.append(row)
+        self.open_rows.append(row)
+        return row
+
+    def end_row(self, row):
+        self.open_rows.remove(row)
+
+    def start_cell(self, th, attrs):
+        if not self.open_rows:  # <tr> 없이 나온 셀은 새 행으로
+            self.rows.append(_Row(self.thead > 0))
+            self.open_rows.append(self.rows[-1])
+        attrs = dict(attrs or ())
+        cell = _Cell(th, _span(attrs, "colspan"), _span(attrs, "rowspan"))
+        self.open_rows[-1].cells.append(cell)
+        self.open_cells.append(cell)
+        return cell
+
+    def end_cell(self, cell):
+        self.open_cells.remove(cell)
+
+    def text(self, s):
+        stripped = s.strip()
+        if self.open_cells:
+            if stripped:
+                self.open_cells[-1].parts.append(stripped)
+        else:
+            self.loose.append(s)
+
+    def has_rows(self):
+        return any(row.cells for row in self.rows)
+
+    def finish(self):
+        grid, head_rows, carry = [], 0, {}
+        leading = True
+        for row in self.rows:
+            if not row.cells and not carry:
+                continue
+            out, c = [], 0
+            for cell in row.cells:
+                while c in carry:
+                    out.append(carry[c][1])
+                    c = self._step(carry, c)
+                text = _cell_text(cell.parts)
+                for k in range(cell.colspan):
+                    out.append(text)
+                    if cell.rowspan > 1:
+                        carry[c + k] = [cell.rowspan - 1, text]
+                c += cell.colspan
+            while carry and c <= max(carry):
+                out.append(carry[c][1] if c in carry else "")
+                c = self._step(carry, c) if c in carry else c + 1
+            is_head = row.head or (bool(row.cells) and all(cell.th for cell in row.cells))
+            if leading and is_head:
+                head_rows += 1
+            else:
+                leading = False
+            grid.append(out)
+        return Table(grid[:head_rows], grid[head_rows:], section=self.section, depth=self.depth)
+
+    @staticmethod
+    def _step(carry, c):
+        carry[c][0] -= 1
+        if carry[c][0] <= 0:
+            del carry[c]
+        return c + 1
+
+
+# --- 완성된 표 ---
+class Table:
+    def __init__(self, header_rows, rows, section=None, depth=0, index=None):
+        width = max((len(r) for r in header_rows + rows), default=0)
+        self.header_rows = [r + [""] * (width - len(r)) for r in header_rows]
+        self.rows = [r + [""] * (width - len(r)) for r in rows]
+        self.width = width
+        self.section = section
+        self.depth = depth
+        self.index = index
+        self.start = None  # 최종 텍스트에서의 위치 (추출기가 채움)
+        self.end = None
+
+    @property
+    def header(self):
+        names = []
+        for col in range(self.width):
+            seen = []
+            for r in self.header_rows:
+                if r[col] and r[col] not in seen:
+                    seen.append(r[col])
+            names.append(" ".join(seen))
+        return names
+
+    def markdown(self):
+        lines = []
+        if self.header_rows:
+            lines.append("| " + " | ".join(self.header) + " |")
+            lines.append("| " + " | ".join(["---"] * self.width) + " |")
+        for r in self.rows:
+            lines.append("| " + " | ".join(r) + " |")
+        return "\n".join(lines)
+
+    # 중복/빈 머리글은 열 이름으로 쓸 수 있게 바꾼다
+    def column_names(self):
+        names, used = [], {}
+        for i, name in enumerate(self.header if self.header_rows else [""] * self.width):
+            name = name.replace("\\|", "|") or f"col{i}"
+            if name in used:
+                used[name] += 1
+                name = f"{name}_{used[name]}"
+            else:
+                used[name] = 1
+            names.append(name)
+        return names
+
+    # 열마다 정수/실수/문자열 중 하나로 (숫자 열: 1,234 / (1,234) / △1,234 / - → None)
+    def columns(self):
+        out = []
+        for i, name in enumerate(self.column_names()):
+            raw = [r[i].replace("\\|", "|") for r in self.rows]
+            nums = [parse_number(v) for v in raw]
+            if any(v is not None for v in nums) and all(n is not None or not v.strip() or v.strip() == "-"
+                                                         for n, v in zip(nums, raw)):
+                if all(n is None or isinstance(n, int) for n in nums):
+                    if all(n is None or INT64_MIN <= n <= INT64_MAX for n in nums):
+                        out.append((name, "int64", nums))
+                    else:  # int64를 넘는 값은 잘리지 않게 문자열 그대로
+                        out.append((name, "string", raw))
+                else:
+                    out.append((name, "float64", [None if n is None else float(n) for n in nums]))
+            else:
+                out.append((name, "string", raw))
+        return out
+
+    def to_frame(self):
+        import pandas as pd
+        data = {}
+        for name, kind, values in self.columns():
+            dtype = {"int64": "Int64", "float64": "float64", "string": "string"}[kind]
+            data[name] = pd.array(values, dtype=dtype)
+        return pd.DataFrame(data)
+
+    def to_dict(self):
+        return {"header_rows": self.header_rows, "rows": self.rows, "section": self.section,
+                "depth": self.depth, "index": self.index, "start": self.start, "end": self.end}
+
+    @classmethod
+    def from_dict(cls, d):
+        table = cls(d["header_rows"], d["rows"], section=d.get("section"), depth=d.get("depth", 0), index=d.get("index"))
+        table.start, table.end = d.get("start"), d.get("end")
+        return table
+
+
+def parse_number(value):
+    s = value.strip().replace(",", "").replace(" ", "")
+    if not s or s == "-":
+        return None
+    sign = 1
+    if s.startswith("(") and s.endswith(")"):
+        s, sign = s[1:-1], -1
+    if s[:1] in ("△", "▲"):
+        s, sign = s[1:], -sign
+    if s.endswith("%"):
+        s = s[:-1]
+    if not NUMBER_RE.match(s):
+        return None
+    # 소수점 없는 값은 int로 (float를 거치면 2**53을 넘는 금액이 바뀐다)
+    number = float(s) if "." in s else int(s)
+    return sign * number
+
+
+# --- 열 단위 파일 (pyarrow 필요: Parquet / Arrow IPC) ---
+TABLE_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def table_bytes(table, fmt="parquet", metadata=None):
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("표를 Parquet/Arrow로 저장하려면 pyarrow가 필요합니다 (pip install pyarrow)") from e
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string()}
+    cols = table.columns()
+    meta = {"section": table.section or "", "index": str(table.index), "depth": str(table.depth)}
+    meta.update(metadata or {})
+    arrow_table = pa.table(
+        {name: pa.array(values, type=types[kind]) for name, kind, values in cols},
+        metadata={k: str(v) for k, v in meta.items()},
+    )
+    buf = io.BytesIO()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(arrow_table, buf)
+    elif fmt == "arrow":
+        with pa.ipc.new_file(buf, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+    else:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    return buf.getvalue()
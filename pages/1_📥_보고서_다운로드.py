@@ -1,12 +1,15 @@
 import streamlit as st
-import OpenDartReader
 import pandas as pd
-import io
-import zipfile
 import re
 import datetime
-import requests
-from bs4 import BeautifulSoup
+from core.catalog import get_filing_catalog
+from core.classify import select_reports
+from core.corp_index import get_corp_index
+from core.dart_api import make_session
+from core.job_view import remember_job, show_jobs
+from core.jobs import get_job_manager, make_spec
+from core.metrics import stage, track_cache
+from core.metrics_view import show_metrics
 
 # --- [핵심 수정] 페이지 설정: 사이드바를 기본적으로 '접음(collapsed)' 상태로 시작 ---
 st.set_page_config(
@@ -29,39 +32,20 @@ if 'api_key' not in st.session_state:
 
 api_key = st.session_state.api_key
 
-# --- 2. DART 객체 생성 ---
+# --- 2. HTTP 세션 ---
 @st.cache_resource
-def get_dart_system(key):
-    return OpenDartReader(key)
+def get_http_session():
+    return make_session(pool_size=4)
 
 # --- 3. 보고서 목록 조회 ---
-@st.cache_data(ttl=3600)
+@track_cache("fetch_report_list_clean", st.cache_data(ttl=3600))
 def fetch_report_list_clean(corp_name, start_date, end_date):
-    dart = get_dart_system(api_key)
-    return dart.list(corp_name, start=start_date, end=end_date, kind='A')
-
-# --- 4. 텍스트 변환 함수 ---
-def extract_ai_friendly_text(html_content):
-    soup = BeautifulSoup(html_content, "html.parser")
-    for s in soup(["script", "style", "head", "svg", "img"]):
-        s.decompose()
-    
-    # 표를 마크다운 스타일로 변환
-    for table in soup.find_all("table"):
-        rows = []
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        if headers:
-            rows.append("| " + " | ".join(headers) + " |")
-            rows.append("| " + " | ".join(["---"] * len(headers)) + " |")
-        for tr in table.find_all("tr"):
-            cells = [td.get_text(strip=True) for td in tr.find_all("td")]
-            if cells:
-                rows.append("| " + " | ".join(cells) + " |")
-        table_md = "\n" + "\n".join(rows) + "\n"
-        table.replace_with(table_md)
-
-    text = soup.get_text(separator="\n")
-    return re.sub(r'\n\s*\n+', '\n\n', text).strip()
+    with stage("corp_lookup", key=corp_name):
+        corp = get_corp_index(api_key).resolve(corp_name)
+    if corp is None:
+        return pd.DataFrame()
+    return get_filing_catalog().report_list(get_http_session(), api_key, corp['corp_code'], start_date, end_date, kind='A',
+                                             final=True)  # 정정된 원본 제외 (예전 dart.list 기본값)
 
 # --- 메인 검색 화면 구성 (사이드바 아님) ---
 # 컨테이너로 감싸서 시각적으로 깔끔하게 정리
@@ -87,6 +71,7 @@ with st.container(border=True):
         with opt_col3:
             report_options = ["1분기보고서", "반기보고서", "3분기보고서", "사업보고서"]
             selected_types = st.multiselect("종류", report_options, default=["사업보고서"], label_visibility="collapsed", placeholder="보고서 종류 선택")
+        save_tables = st.checkbox("📊 표를 Parquet 파일로 함께 저장", help="보고서마다 표를 열 단위 파일로 ZIP에 함께 넣습니다 (pyarrow 필요).")
 
 # --- 검색 로직 처리 ---
 # 버튼을 누르거나, 이전에 검색한 기록이 있으면 실행
@@ -105,25 +90,8 @@ if btn_search or ('target_df' in st.session_state and st.session_state.target_df
                 df = fetch_report_list_clean(corp_name, start_date, end_date)
                 
                 if df is not None and len(df) > 0:
-                    conditions = []
-                    if "사업보고서" in selected_types:
-                        conditions.append(df['report_nm'].str.contains("사업보고서"))
-                    if "반기보고서" in selected_types:
-                        conditions.append(df['report_nm'].str.contains("반기보고서"))
-                    if "1분기보고서" in selected_types:
-                        cond_q1 = (df['report_nm'].str.contains("분기보고서")) & \
-                                  (df['report_nm'].str.contains(r"\.03|\.3월", regex=True))
-                        conditions.append(cond_q1)
-                    if "3분기보고서" in selected_types:
-                        cond_q3 = (df['report_nm'].str.contains("분기보고서")) & \
-                                  (df['report_nm'].str.contains(r"\.09|\.9월", regex=True))
-                        conditions.append(cond_q3)
-
-                    if conditions:
-                        final_mask = pd.concat(conditions, axis=1).any(axis=1)
-                        filtered_df = df[final_mask].copy().reset_index(drop=True)
-                    else:
-                        filtered_df = pd.DataFrame()
+                    # 보고서명/접수일 기준 공용 분류 (app.py와 동일 규칙), 해당 종류 전체를 최신순으로
+                    filtered_df = select_reports(df, selected_types, latest_per_year=False)
 
                     st.session_state.target_df = filtered_df
                     st.session_state.current_corp = corp_name # 현재 검색한 회사명 저장
@@ -147,51 +115,23 @@ if 'target_df' in st.session_state and st.session_state.target_df is not None:
     
     if len(df) > 0:
         if st.button("🚀 전체 다운로드 (ZIP 파일 생성)", type="primary", use_container_width=True):
-            
-            zip_buffer = io.BytesIO()
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            total = len(df)
-            
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-                for idx, row in df.iterrows():
-                    report_name = row['report_nm']
-                    file_name = f"{corp_name_fixed}_{report_name}.txt"
-                    file_name = re.sub(r'[\\/*?:"<>|]', "", file_name)
-
-                    status_text.info(f"⏳ ({idx+1}/{total}) {file_name} 추출 중...")
-                    
-                    try:
-                        url = f"https://opendart.fss.or.kr/api/document.xml?crtfc_key={api_key}&rcept_no={row['rcept_no']}"
-                        res = requests.get(url, timeout=10)
-                        
-                        with zipfile.ZipFile(io.BytesIO(res.content)) as z_orig:
-                            target_file = max(z_orig.infolist(), key=lambda f: f.file_size).filename
-                            raw_data = z_orig.read(target_file)
-                            try: content_html = raw_data.decode('utf-8')
-                            except: content_html = raw_data.decode('euc-kr', 'ignore')
-                            
-                            clean_text = extract_ai_friendly_text(content_html)
-                            
-                            final_content = f"### {corp_name_fixed} {report_name} ###\n"
-                            final_content += f"접수일: {row['rcept_dt']}\n\n"
-                            final_content += clean_text
-                            
-                            zip_file.writestr(file_name, final_content)
-                            
-                    except Exception as e:
-                        st.error(f"실패: {file_name} - {e}")
-                    
-                    progress_bar.progress((idx + 1) / total)
-
-            status_text.success("완료! 버튼을 눌러 저장하세요.")
-            
-            # 최종 다운로드 버튼
-            st.download_button(
-                label="💾 ZIP 파일 저장하기",
-                data=zip_buffer.getvalue(),
-                file_name=f"{corp_name_fixed}_Reports.zip",
-                mime="application/zip",
-                type="primary",
-                use_container_width=True
-            )
+            # 번들은 백그라운드 작업으로 만든다 (버튼을 다시 눌러도 같은 작업을 이어서 보여 줌)
+            items = []
+            for _, row in df.iterrows():
+                report_name = row['report_nm']
+                file_name = f"{corp_name_fixed}_{report_name}.txt"
+                file_name = re.sub(r'[\\/*?:"<>|]', "", file_name)
+
+                header_info = f"### {corp_name_fixed} {report_name} ###\n"
+                header_info += f"접수일: {row['rcept_dt']}\n\n"
+                items.append({"rcept_no": row['rcept_no'], "file_name": file_name, "header": header_info,
+                              "meta": {"corp_name": corp_name_fixed, "corp_code": row.get('corp_code'),
+                                       "rcept_dt": row['rcept_dt'], "report_nm": report_name}})
+
+            spec = make_spec(items, title=f"{corp_name_fixed} 보고서 {len(items)}건", zip_name=f"{corp_name_fixed}_Reports.zip",
+                             extractor="full", save_tables=save_tables)
+            remember_job(get_job_manager().submit(spec, api_key))
+
+# --- 백그라운드 작업 진행 상황 / 완성된 ZIP ---
+show_jobs(api_key)
+show_metrics()  # 주소에 ?debug=1 을 붙이면 단계별 성능 지표
@@ -3,168 +3,132 @@ import FinanceDataReader as fdr
 import pandas as pd
 import numpy as np
 import datetime
-import yfinance as yf
-import OpenDartReader
+from core.corp_index import get_corp_index
+from core.indicators import IndicatorState, calculate_indicators as compute_indicators
+from core.metrics import keyed, stage, track_cache
+from core.metrics_view import debug_toggle, show_metrics
+from core.price_store import get_price_store
+from core.scoring import backtest_frames, score_frame, sentiment as level_sentiment
 
 st.set_page_config(page_title="종합 차트 분석", page_icon="📈", layout="centered")
 st.title("📈 AI 기술적 심층 정밀 진단")
 
-# --- 1. DART 전 종목 리스트 ---
-@st.cache_data(show_spinner=False)
-def get_corp_dict():
+# --- 1. DART 전 종목 리스트 (로컬 색인, mmap) ---
+def get_index():
     api_key = st.session_state.get("api_key")
-    if not api_key:
-        if "dart_api_key" in st.secrets: api_key = st.secrets["dart_api_key"]
-        else: return None
-    try:
-        dart = OpenDartReader(api_key)
-        corp_list = dart.corp_codes
-        listed_df = corp_list[corp_list['stock_code'].notnull()]
-        return dict(zip(listed_df['corp_name'], listed_df['stock_code']))
+    if not api_key and "dart_api_key" in st.secrets: api_key = st.secrets["dart_api_key"]
+    try: return get_corp_index(api_key)
     except: return None
 
+@track_cache("get_corp_dict", st.cache_data(show_spinner=False))
+def get_corp_dict():
+    index = get_index()
+    return index.listed_names() if index else None
+
 # --- 2. 데이터 수집 ---
-@st.cache_data(ttl=600)
-def get_stock_data(user_input, period_days):
-    df = pd.DataFrame()
+# 일봉은 로컬 저장소(core.price_store, 종목별 열 파일 mmap)에서 읽고, 10분이 지났을 때만 빠진 봉을 받아 덧붙인다.
+@track_cache("get_krx_listing", st.cache_data(ttl=86400, show_spinner=False))
+def get_krx_listing():
+    return fdr.StockListing('KRX')
+
+def get_stock_data(user_input, period_days, refresh=False):
     code = ""
     name = user_input
-    source = ""
     
-    corp_dict = get_corp_dict()
+    index = get_index()
+    corp = index.by_name(user_input) if index else None
     
     if user_input.isdigit() and len(user_input) == 6:
         code = user_input
         name = f"Code: {code}"
-    elif corp_dict and user_input in corp_dict:
-        code = corp_dict[user_input]
+    elif corp and corp['stock_code']:
+        code = corp['stock_code']
         name = user_input
+    elif index:
+        # 색인에 없으면 KRX 전체 목록을 다시 받지 않고 비슷한 이름을 제안
+        similar = [c['corp_name'] for c in index.search_fuzzy(user_input, limit=3, listed_only=True)]
+        hint = f" 혹시: {', '.join(similar)}?" if similar else ""
+        return None, None, None, f"'{user_input}'을 찾을 수 없습니다.{hint}"
     else:
         try:
-            krx = fdr.StockListing('KRX')
+            krx = get_krx_listing()
             target = krx[krx['Name'] == user_input]
             if target.empty: return None, None, None, f"'{user_input}'을 찾을 수 없습니다."
             code = target.iloc[0]['Code']
             name = user_input
         except: return None, None, None, "검색 실패."
 
-    end_dt = datetime.datetime.now() + datetime.timedelta(days=1)
+    store = get_price_store()
+    if refresh: store.invalidate(code)  # 이 종목만 새로 받는다
     start_dt = datetime.datetime.now() - datetime.timedelta(days=period_days*2)
-    
-    try:
-        candidates = [f"{code}.KS", f"{code}.KQ"]
-        for ticker in candidates:
-            temp_df = yf.download(ticker, start=start_dt, end=end_dt, progress=False, auto_adjust=True)
-            if not temp_df.empty:
-                df = temp_df
-                source = "Yahoo Finance"
-                if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-                break
-    except: pass
-
-    if df.empty:
-        try:
-            df = fdr.DataReader(code, start_dt)
-            source = "Naver Finance"
-        except: pass
-    
-    if df.empty: return None, None, None, "데이터 수집 실패."
-        
-    df = df.dropna()
-    if df.index.tz is None: df.index = df.index.tz_localize('UTC').tz_convert('Asia/Seoul')
-    else: df.index = df.index.tz_convert('Asia/Seoul')
-    df.index = df.index.strftime('%Y-%m-%d')
+    df, source = store.history(code, start_dt)
+    if df is None: return None, None, None, "데이터 수집 실패."
         
     return df, name, code, source
 
 # --- 3. [핵심] 모든 지표 총동원 계산 ---
+# 이동평균/볼린저/MACD/RSI/거래량 평균/60일 고저를 한 번에 (core.indicators, 여러 종목 패널과 같은 계산)
 def calculate_indicators(df):
-    df = df.copy()
-    close = df['Close']
-    
-    # (1) 이동평균선 (단기/중기/장기/초장기)
-    df['MA5'] = close.rolling(5).mean()
-    df['MA20'] = close.rolling(20).mean()
-    df['MA60'] = close.rolling(60).mean()
-    df['MA120'] = close.rolling(120).mean()
-    
-    # (2) 볼린저 밴드
-    df['std'] = close.rolling(20).std()
-    df['Upper'] = df['MA20'] + (df['std'] * 2)
-    df['Lower'] = df['MA20'] - (df['std'] * 2)
-    df['BandWidth'] = (df['Upper'] - df['Lower']) / df['MA20'] * 100 # 밴드폭(%)
-    
-    # (3) MACD
-    df['EMA12'] = close.ewm(span=12).mean()
-    df['EMA26'] = close.ewm(span=26).mean()
-    df['MACD'] = df['EMA12'] - df['EMA26']
-    df['Signal'] = df['MACD'].ewm(span=9).mean()
-    df['Hist'] = df['MACD'] - df['Signal']
-    
-    # (4) RSI
-    delta = close.diff(1)
-    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
-    # (5) 거래량 이평
-    df['Vol_MA5'] = df['Volume'].rolling(5).mean()
-    df['Vol_MA20'] = df['Volume'].rolling(20).mean()
-    
-    # (6) 지지/저항 (최근 60일 기준)
-    df['High60'] = df['High'].rolling(60).max()
-    df['Low60'] = df['Low'].rolling(60).min()
-    
-    return df
+    return compute_indicators(df)
+
+# 종목별 지표 상태 (이동합/EMA/RSI 누적/60일 고저 덱) — 새 봉은 추가, 오늘 봉은 수정만 하므로 갱신이 상수 시간
+@st.cache_resource
+def get_indicator_states():
+    return {}
+
+def calculate_indicators_live(code, df):
+    states = get_indicator_states()
+    key = (df.index[0], get_price_store().generation(code))
+    entry = states.get(code)
+    if entry is None or entry[0] != key:  # 저장소를 다시 썼거나(수정주가) 시작일이 바뀌었으면 한 번만 전체 계산
+        entry = (key, calculate_indicators(df), IndicatorState.from_frame(df))
+    key, frame, state = entry
+    changed = state.catch_up(df)  # 마지막으로 반영한 봉 이후만 (여러 날 만에 열어도 빠진 봉 없이)
+    if not changed.empty:
+        frame = pd.concat([frame.drop(changed.index, errors='ignore'), changed])
+    states[code] = (key, frame, state)
+    return frame
 
 # --- 4. [복구] 심층 정밀 분석 엔진 (모든 데이터 해석) ---
+# 점수/조건은 core.scoring이 모든 봉에 대해 배열로 계산하고, 여기서는 마지막 봉의 결과를 문장으로 풀어 쓴다.
 def analyze_market_deep(df):
     curr = df.iloc[-1]
-    prev = df.iloc[-2]
-    score = 50
+    sig = score_frame(df).iloc[-1]
     report = []
     
     # --- [1] 추세 분석 (이동평균선 & 배열) ---
     trend_msg = []
     # 20일선 (생명선)
-    if curr['Close'] > curr['MA20']:
-        score += 10
+    if sig['above_ma20']:
         trend_msg.append("✅ 주가가 **20일선(생명선)** 위에 안착해 상승 추세를 유지 중입니다.")
     else:
-        score -= 10
         trend_msg.append("⛔ 주가가 **20일선** 아래로 무너져 단기적으로 약세입니다.")
     
     # 정배열/역배열 (5 > 20 > 60)
-    if curr['MA5'] > curr['MA20'] > curr['MA60']:
-        score += 10
+    if sig['aligned_up']:
         trend_msg.append("✅ **완벽한 정배열** 상태입니다. (5일>20일>60일) 상승 에너지가 가장 강한 구간입니다.")
-    elif curr['MA5'] < curr['MA20'] < curr['MA60']:
-        score -= 10
+    elif sig['aligned_down']:
         trend_msg.append("⛔ **완벽한 역배열** 상태입니다. (5일<20일<60일) 하락 압력이 강해 바닥을 논하기 이릅니다.")
     
     # 골든/데드 크로스
-    if curr['MA5'] > curr['MA20'] and prev['MA5'] <= prev['MA20']:
-        score += 5
+    if sig['golden_cross']:
         trend_msg.append("🔥 방금 **5일선이 20일선을 돌파(골든크로스)**했습니다! 단기 급등 신호일 수 있습니다.")
     
-    report.append({"title": "1. 추세 (Trend)", "content": " ".join(trend_msg), "score": score})
+    report.append({"title": "1. 추세 (Trend)", "content": " ".join(trend_msg), "score": int(sig['trend_score'])})
 
 
     # --- [2] 변동성 분석 (볼린저 밴드) ---
     vol_msg = []
     # 위치 파악
-    if curr['Close'] > curr['Upper']:
-        score -= 5
+    if sig['above_upper']:
         vol_msg.append("🔴 주가가 **밴드 상단**을 뚫었습니다. 단기 과열로 인해 밴드 안쪽으로 회귀하려는 성질이 강합니다 (조정 주의).")
-    elif curr['Close'] < curr['Lower']:
-        score += 5
+    elif sig['below_lower']:
         vol_msg.append("🔵 주가가 **밴드 하단**을 뚫고 내려갔습니다. 통계적으로 과도한 하락이라 기술적 반등이 나올 확률이 높습니다.")
     else:
         vol_msg.append("⚪ 주가가 밴드 내부에서 안정적으로 움직이고 있습니다.")
         
     # 밴드폭 (스퀴즈)
-    if curr['BandWidth'] < 10: # 밴드폭이 매우 좁음
+    if sig['squeeze']: # 밴드폭이 매우 좁음
         vol_msg.append("⚡ **밴드폭이 극도로 좁아졌습니다(스퀴즈).** 조만간 위든 아래든 큰 방향성이 터질 전조 증상입니다.")
         
     report.append({"title": "2. 변동성 (Volatility)", "content": " ".join(vol_msg)})
@@ -173,19 +137,17 @@ def analyze_market_deep(df):
     # --- [3] 모멘텀 & 심리 (MACD + RSI) ---
     mom_msg = []
     # MACD
-    if curr['MACD'] > curr['Signal']:
+    if sig['macd_up']:
         mom_msg.append("✅ **MACD**가 시그널 선 위에 있어 상승 모멘텀이 살아있습니다.")
-        if curr['Hist'] > prev['Hist'] and curr['Hist'] > 0:
+        if sig['hist_rising']:
              mom_msg.append("(상승 강도가 점점 세지고 있습니다.)")
     else:
         mom_msg.append("⛔ **MACD**가 시그널 선 아래에 있어 하락 모멘텀이 우세합니다.")
 
     # RSI
-    if curr['RSI'] >= 70:
-        score -= 10
+    if sig['overbought']:
         mom_msg.append(f"⚠️ **RSI({curr['RSI']:.0f}) 과매수!** 매수세가 너무 뜨겁습니다. 신규 진입은 자제하고 차익 실현을 고려하세요.")
-    elif curr['RSI'] <= 30:
-        score += 10
+    elif sig['oversold']:
         mom_msg.append(f"💎 **RSI({curr['RSI']:.0f}) 과매도!** 공포에 질려 투매가 나왔습니다. 저점 매수의 기회일 수 있습니다.")
     else:
         mom_msg.append(f"⚪ RSI는 {curr['RSI']:.0f}로 과열/침체 없는 중립 구간입니다.")
@@ -195,17 +157,15 @@ def analyze_market_deep(df):
 
     # --- [4] 수급 & 거래량 (Volume) ---
     vol_analysis = []
-    vol_ratio = (curr['Volume'] / curr['Vol_MA20']) * 100
+    vol_ratio = sig['vol_ratio']
     
-    if vol_ratio > 200:
+    if sig['vol_spike']:
         vol_analysis.append(f"📢 **거래량 폭발({vol_ratio:.0f}%)!** 평소의 2배가 넘는 거래량이 터졌습니다.")
-        if curr['Close'] > prev['Close']:
-            score += 5
+        if sig['up_day']:
             vol_analysis.append("양봉에 대량 거래가 실렸으니 **강력한 매수세(세력)**가 유입된 것으로 보입니다.")
         else:
-            score -= 5
             vol_analysis.append("음봉에 대량 거래가 실렸으니 **강력한 매도세(실망 매물)**가 쏟아진 것입니다.")
-    elif vol_ratio < 50:
+    elif sig['vol_dry']:
         vol_analysis.append(f"☁️ 거래량이 평소의 {vol_ratio:.0f}% 수준으로 매우 적습니다. 시장의 관심에서 멀어져 있습니다.")
         
     report.append({"title": "4. 수급 (Volume)", "content": " ".join(vol_analysis) if vol_analysis else "평이한 거래량 흐름입니다."})
@@ -214,29 +174,20 @@ def analyze_market_deep(df):
     # --- [5] 지지 & 저항 (Support/Resistance) ---
     sr_msg = []
     # 현재가가 저항선 근처인가?
-    if curr['High60'] > 0:
-        dist_res = (curr['High60'] - curr['Close']) / curr['Close'] * 100
-        if dist_res < 3: # 3% 이내 접근
-            sr_msg.append(f"🚧 주가가 **60일 최고가({curr['High60']:,.0f}원)**인 저항선에 근접했습니다. 여기를 뚫으면 신고가 랠리가 가능합니다.")
+    if sig['near_high']: # 3% 이내 접근
+        sr_msg.append(f"🚧 주가가 **60일 최고가({curr['High60']:,.0f}원)**인 저항선에 근접했습니다. 여기를 뚫으면 신고가 랠리가 가능합니다.")
     
     # 현재가가 지지선 근처인가?
-    if curr['Low60'] > 0:
-        dist_sup = (curr['Close'] - curr['Low60']) / curr['Close'] * 100
-        if dist_sup < 3:
-            sr_msg.append(f"🛡️ 주가가 **60일 최저가({curr['Low60']:,.0f}원)**인 바닥권에 근접했습니다. 지지 여부를 잘 봐야 합니다.")
+    if sig['near_low']:
+        sr_msg.append(f"🛡️ 주가가 **60일 최저가({curr['Low60']:,.0f}원)**인 바닥권에 근접했습니다. 지지 여부를 잘 봐야 합니다.")
             
     if not sr_msg: sr_msg.append("현재 의미 있는 지지/저항선과 거리가 있어 자유로운 구간입니다.")
     
     report.append({"title": "5. 지지 & 저항", "content": " ".join(sr_msg)})
 
-    # 점수 최종 보정
-    score = max(0, min(100, score))
-    sentiment = "관망 (Hold)"
-    color = "gray"
-    if score >= 80: sentiment, color = "강력 매수", "green"
-    elif score >= 60: sentiment, color = "매수 우위", "blue"
-    elif score <= 20: sentiment, color = "강력 매도", "red"
-    elif score <= 40: sentiment, color = "매도 우위", "orange"
+    # 점수 (0~100으로 자른 값) → 판정
+    score = int(sig['score'])
+    sentiment, color = level_sentiment(sig['level'])
         
     return score, sentiment, color, report, curr['Low60'], curr['High60']
 
@@ -246,19 +197,24 @@ with st.sidebar:
     corp_dict = get_corp_dict()
     if corp_dict: st.caption(f"DB 연동 완료 ({len(corp_dict):,}개)")
     user_input = st.text_input("종목명/코드", "삼성전자")
-    if st.button("🔄 새로고침"): st.cache_data.clear()
+    refresh = st.button("🔄 새로고침")  # 이 종목의 저장된 일봉만 지우고 다시 받는다
+    debug_toggle()
 
 # --- 메인 ---
 if user_input:
-    with st.spinner(f"'{user_input}'의 모든 데이터를 샅샅이 뒤지는 중..."):
-        df, name, code, msg = get_stock_data(user_input, 300)
+    # 단계 지표(조회/지표/분석)는 입력한 종목명을 키로 남긴다 (🛠 성능 지표)
+    with keyed(user_input), st.spinner(f"'{user_input}'의 모든 데이터를 샅샅이 뒤지는 중..."):
+        with stage("chart_fetch"):
+            df, name, code, msg = get_stock_data(user_input, 300, refresh=refresh)
         
         if df is None:
             st.error(msg)
         else:
             try:
-                df = calculate_indicators(df)
-                score, sentiment, color, report_data, support, resistance = analyze_market_deep(df)
+                with stage("chart_indicators"):
+                    df = calculate_indicators_live(code, df)
+                with stage("chart_analysis"):
+                    score, sentiment, color, report_data, support, resistance = analyze_market_deep(df)
                 
                 latest = df.iloc[-1]
                 prev = df.iloc[-2]
@@ -298,8 +254,17 @@ if user_input:
                         else:
                             st.info(content)
 
+                # 같은 규칙으로 이 종목의 과거 모든 봉을 판정했을 때 이후 수익률
+                with st.expander("📊 과거 신호 성과 (이 종목, 같은 점수 규칙)"):
+                    st.dataframe(backtest_frames({code: df[['Open', 'High', 'Low', 'Close', 'Volume']]}).round(2),
+                                 use_container_width=True)
+                    st.caption("신호가 난 날 종가에 사서 5/20/60거래일 뒤 종가에 판 수익률 (수수료 제외). "
+                               "여러 종목 통계는 `python -m core.scoring`")
+
                 st.divider()
                 st.caption(f"※ 60일 최저가(지지): {support:,.0f}원 / 60일 최고가(저항): {resistance:,.0f}원")
                 st.caption(f"※ 기준일: {df.index[-1]} | 데이터: {msg}")
 
             except Exception as e: st.error(f"Error: {e}")
+
+    show_metrics(key=user_input)
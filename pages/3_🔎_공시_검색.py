@@ -0,0 +1,53 @@
+import time
+import streamlit as st
+import pandas as pd
+from core.search_index import get_search_index
+
+# --- 페이지 설정 ---
+st.set_page_config(page_title="공시 본문 검색", page_icon="🔎", layout="wide", initial_sidebar_state="collapsed")
+st.title("🔎 내려받은 보고서 본문 검색")
+
+index = get_search_index()
+stats = index.stats()
+st.caption(f"로컬 색인: 보고서 {stats['docs']:,}건 · 회사 {stats['corps']:,}곳 · 장 {stats['sections']:,}개 "
+           "(보고서를 내려받을 때마다 자동으로 추가됩니다)")
+
+# --- 검색창 ---
+with st.container(border=True):
+    col_input, col_btn = st.columns([4, 1])
+    with col_input:
+        query = st.text_input("검색어", placeholder='예: 반도체 수출  /  "종속회사 지분"', label_visibility="collapsed")
+    with col_btn:
+        st.button("검색", type="primary", use_container_width=True)
+
+    with st.expander("🔧 검색 조건"):
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        with col1:
+            corp_filter = st.text_input("회사명 포함")
+        with col2:
+            start_year = st.number_input("시작 연도", 1990, 2030, 2000)
+        with col3:
+            end_year = st.number_input("종료 연도", 1990, 2030, 2030)
+        with col4:
+            limit = st.number_input("최대 결과", 10, 500, 50, step=10)
+
+# --- 결과 ---
+if query.strip():
+    t0 = time.perf_counter()
+    hits = index.search(query, limit=int(limit), corp_name=corp_filter.strip() or None,
+                        start_date=f"{start_year}0101", end_date=f"{end_year}1231")
+    elapsed = (time.perf_counter() - t0) * 1000
+
+    st.subheader(f"결과 {len(hits)}건 ({elapsed:.0f} ms)")
+    if not hits:
+        st.info("일치하는 문단이 없습니다. 3글자 이상 검색어가 더 정확하게 찾아집니다.")
+    for hit in hits:
+        with st.container(border=True):
+            st.markdown(f"**{hit['corp_name'] or ''}** · {hit['report_nm'] or ''} · {hit['rcept_dt'] or ''} · 📑 {hit['section']}")
+            st.markdown(hit["snippet"].replace("\n", " "))
+            st.caption(f"접수번호 {hit['rcept_no']} · [DART 원문](https://dart.fss.or.kr/dsaf001/main.do?rcpNo={hit['rcept_no']})")
+
+    if hits:
+        with st.expander("표로 보기"):
+            st.dataframe(pd.DataFrame(hits)[['rcept_dt', 'corp_name', 'report_nm', 'section', 'rcept_no']],
+                         use_container_width=True, hide_index=True)
@@ -0,0 +1,81 @@
+import time
+import datetime
+import streamlit as st
+from core.corp_index import get_corp_index
+from core.metrics import track_cache
+from core.scoring import LEVELS
+from core.screener import apply_filters, get_screener
+
+# --- 페이지 설정 ---
+st.set_page_config(page_title="전 종목 스크리너", page_icon="🏁", layout="wide", initial_sidebar_state="collapsed")
+st.title("🏁 전 종목 기술적 점수 스크리너")
+st.caption("종합 차트분석과 같은 지표·점수 규칙을 상장 전 종목에 적용합니다. "
+           "시세는 로컬 저장소에서 읽고, 다시 스캔하면 바뀐 종목만 새로 계산합니다.")
+
+# --- 1. 회사명 (DART 로컬 색인) ---
+@track_cache("get_names", st.cache_data(show_spinner=False, ttl=86400))
+def get_names():
+    api_key = st.session_state.get("api_key")
+    if not api_key and "dart_api_key" in st.secrets: api_key = st.secrets["dart_api_key"]
+    try: return {code: name for name, code in get_corp_index(api_key).listed_names().items()}
+    except: return {}
+
+# --- 2. 조건 ---
+with st.container(border=True):
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        use_rsi = st.checkbox("RSI 과매도")
+        rsi_max = st.number_input("RSI 이하", 5, 70, 30, disabled=not use_rsi)
+    with col2:
+        golden = st.checkbox("골든크로스 (5일선 ↗ 20일선)")
+        squeeze = st.checkbox("밴드 스퀴즈 (폭 10% 미만)")
+    with col3:
+        vol_spike = st.checkbox("거래량 폭발 (20일 평균 200% 초과)")
+        min_score = st.slider("최소 점수", 0, 100, 0, step=5)
+    with col4:
+        level_names = {label: level for level, (label, _) in LEVELS.items()}
+        levels = st.multiselect("판정", list(level_names))
+    scan = st.button("🔍 스캔 / 갱신", type="primary", use_container_width=True)
+
+# --- 3. 스캔 (처음에는 전 종목 시세를 받느라 오래 걸리고, 이후에는 바뀐 종목만) ---
+screener = get_screener()
+if scan:
+    t0 = time.perf_counter()
+    status = st.empty()
+    with st.spinner("전 종목 점수 계산 중..."):
+        st.session_state.screen_df = screener.scan(names=get_names(), log=lambda msg: status.caption(msg))
+    status.empty()
+    st.session_state.screen_elapsed = time.perf_counter() - t0
+
+# --- 4. 결과 ---
+df = st.session_state.get("screen_df")
+if df is None:
+    st.info("조건을 고른 뒤 [스캔 / 갱신]을 누르세요.")
+else:
+    stats = screener.stats
+    scanned = datetime.datetime.fromtimestamp(screener.scanned_at).strftime('%H:%M:%S') if screener.scanned_at else "-"
+    st.caption(f"마지막 스캔 {scanned} · {stats.get('scored', 0):,}/{stats.get('codes', 0):,}종목 · "
+               f"새로 계산 {stats.get('recomputed', 0):,}종목 · 시세 갱신 {stats.get('fetch_s', 0)}s · "
+               f"점수 계산 {stats.get('score_s', 0)}s (전체 {st.session_state.get('screen_elapsed', 0):.1f}s)")
+
+    hits = apply_filters(df, rsi_max=rsi_max if use_rsi else None, golden_cross=golden, squeeze=squeeze,
+                         vol_spike=vol_spike, min_score=min_score or None,
+                         levels=[level_names[name] for name in levels])
+    st.subheader(f"조건 일치 {len(hits):,}종목")
+    view = hits.reset_index()[['code', 'name', 'sentiment', 'score', 'close', 'change', 'rsi', 'vol_ratio', 'bandwidth',
+                               'golden_cross', 'squeeze', 'vol_spike', 'date']]
+    st.dataframe(
+        view, use_container_width=True, hide_index=True, height=600,
+        column_config={
+            "code": "종목코드", "name": "종목명", "sentiment": "판정", "date": "기준일",
+            "score": st.column_config.ProgressColumn("점수", min_value=0, max_value=100, format="%d"),
+            "close": st.column_config.NumberColumn("종가", format="%.0f"),
+            "change": st.column_config.NumberColumn("등락률(%)", format="%.2f"),
+            "rsi": st.column_config.NumberColumn("RSI", format="%.0f"),
+            "vol_ratio": st.column_config.NumberColumn("거래량(%)", format="%.0f"),
+            "bandwidth": st.column_config.NumberColumn("밴드폭(%)", format="%.1f"),
+            "golden_cross": "골든크로스", "squeeze": "스퀴즈", "vol_spike": "거래량 폭발",
+        },
+    )
+    st.download_button("💾 CSV 저장", view.to_csv(index=False).encode("utf-8-sig"), file_name="screener.csv",
+                       mime="text/csv")
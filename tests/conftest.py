@@ -0,0 +1,19 @@
+import os
+import socket
+import tempfile
+import threading
+
+# 테스트는 임시 저장소와 로컬 OpenDART 대역 서버(benchmarks/dart_server.py)로 돈다.
+# core.config는 import 시점에 환경변수를 읽으므로 core를 불러오기 전에 정해 둔다.
+os.environ.setdefault("DART_DATA_DIR", tempfile.mkdtemp(prefix="dart-test-"))
+os.environ.setdefault("DART_METRICS_EXPORT", "")
+os.environ.setdefault("DART_RATE_LIMIT", "0")
+with socket.socket() as _sock:
+    _sock.bind(("127.0.0.1", 0))
+    _port = _sock.getsockname()[1]
+os.environ["DART_BASE_URL"] = f"http://127.0.0.1:{_port}/api"
+
+from benchmarks.dart_server import make_server  # noqa: E402
+
+_server = make_server(port=_port, latency_ms=0, jitter_ms=0, doc_mb=0.02, n_corps=30)
+threading.Thread(target=_server.serve_forever, name="fake-dart", daemon=True).start()
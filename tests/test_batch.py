@@ -0,0 +1,44 @@
+import os
+import zipfile
+
+from core import batch
+
+
+def _run(tmp_path, queries, **kwargs):
+    logs = []
+    summary = batch.run(queries, "test-key", 2023, 2024, types=("사업보고서",), out_dir=str(tmp_path),
+                        workers=2, procs=1, log=logs.append, **kwargs)
+    return summary, logs
+
+
+def test_duplicate_queries_resolve_once():
+    # 회사명과 종목코드로 같은 회사를 두 번, A, B, A 순서
+    corps, missing = batch.resolve_corps(["테스트기업1", "000001", "테스트기업2", "테스트기업1", "없는회사"], "test-key")
+    assert [c["corp_code"] for c in corps] == ["00000001", "00000002"]
+    assert missing == ["없는회사"]
+
+
+def test_duplicate_queries_write_one_output_per_corp(tmp_path):
+    summary, _ = _run(tmp_path, ["테스트기업1", "테스트기업2", "000001"])
+    assert summary["failed"] == 0
+    assert len(summary["outputs"]) == len(set(summary["outputs"])) == 2
+    assert all("_0000000" in os.path.basename(p) for p in summary["outputs"])
+    for path in summary["outputs"]:
+        with zipfile.ZipFile(path) as z:
+            names = [n for n in z.namelist() if n.endswith(".txt")]
+        assert len(names) == len(set(names)) == 2   # 2023·2024 사업보고서가 한 번씩
+
+
+def test_index_failure_does_not_abort_batch(tmp_path, monkeypatch):
+    import sqlite3
+
+    class BrokenIndex:
+        def add(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(batch.config, "SEARCH_INDEX", True)
+    monkeypatch.setattr(batch, "get_search_index", lambda: BrokenIndex())
+    summary, logs = _run(tmp_path, ["테스트기업3"], fmt="tree")
+    assert summary["reports"] == 2 and summary["failed"] == 0
+    assert sum("색인 실패" in line for line in logs) == 2
+    assert os.path.basename(summary["outputs"][0]) == "테스트기업3_00000003"
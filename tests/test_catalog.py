@@ -0,0 +1,28 @@
+import pandas as pd
+
+from core import catalog
+from core.catalog import FilingCatalog
+
+ROWS = [  # 최신순: 2023 사업보고서는 정정본이 나중에 들어왔다
+    ("00000001", "[기재정정]사업보고서 (2023.12)", "20240520000001", "20240520"),
+    ("00000001", "분기보고서 (2024.03)", "20240514000001", "20240514"),
+    ("00000001", "사업보고서 (2023.12)", "20240315000001", "20240315"),
+    ("00000001", "사업보고서 (2022.12)", "20230314000001", "20230314"),
+]
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["corp_code", "report_nm", "rcept_no", "rcept_dt"])
+
+
+def test_drop_superseded_keeps_latest_amendment_per_report():
+    out = catalog.drop_superseded(_frame(ROWS))
+    assert list(out["rcept_no"]) == ["20240520000001", "20240514000001", "20230314000001"]
+
+
+def test_report_list_final_option(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "fetch_report_list", lambda *args, **kwargs: _frame(ROWS))
+    cat = FilingCatalog(str(tmp_path / "catalog.sqlite3"))
+    full = cat.report_list(None, "key", "00000001", "20230101", "20241231")
+    final = cat.report_list(None, "key", "00000001", "20230101", "20241231", final=True)
+    assert len(full) == 4 and "20240315000001" not in set(final["rcept_no"]) and len(final) == 3
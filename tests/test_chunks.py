@@ -0,0 +1,34 @@
+import json
+
+from core.chunks import ChunkWriter
+from core.reports import Report
+from tests.test_dedupe import _report
+
+
+def _write(tmp_path, dedupe, reports):
+    path = tmp_path / "chunks.jsonl"
+    with ChunkWriter(str(path), budget=80, dedupe=dedupe) as w:
+        for rcept_no, smart_type, year in reports:
+            w.write_report(Report(_report(year), [], []), {"rcept_no": rcept_no, "smart_type": smart_type})
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def _refs(records, rcept_no):
+    return [r.get("duplicate_of") for r in records if r["rcept_no"] == rcept_no]
+
+
+def test_delta_scope_compares_previous_report_of_same_type(tmp_path):
+    records = _write(tmp_path, "delta", [("A", "사업보고서", 2020), ("B", "분기보고서", 2021),
+                                         ("C", "사업보고서", 2022), ("D", "사업보고서", 2023)])
+    assert _refs(records, "A") == [None, None, None]
+    assert _refs(records, "B") == [None, None, None]  # 종류가 다르면 비교하지 않는다
+    # 연쇄되어도 처음 원문을 가진 청크를 가리킨다
+    assert _refs(records, "C") == ["A#0", "A#1", None]
+    assert _refs(records, "D") == ["A#0", "A#1", None]
+
+
+def test_bundle_scope_compares_every_earlier_report(tmp_path):
+    records = _write(tmp_path, "bundle", [("A", "사업보고서", 2020), ("B", "분기보고서", 2021)])
+    assert _refs(records, "B") == ["A#0", "A#1", None]
+    assert all(r["text"] == "" for r in records if r.get("duplicate_of"))
+    assert _refs(_write(tmp_path, None, [("A", "x", 2020), ("B", "x", 2021)]), "B") == [None, None, None]
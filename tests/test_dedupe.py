@@ -0,0 +1,67 @@
+from core.dedupe import ParagraphDeduper
+
+COMPANY = "회사의 개요: 당사는 반도체와 디스플레이 패널을 제조·판매하며 본사는 경기도 수원시에 있습니다."
+POLICY = "회계정책: 재고자산은 총평균법으로 평가하며 순실현가능가치가 취득원가보다 낮으면 평가손실을 인식합니다."
+
+
+def _report(year):
+    return f"{COMPANY}\n\n{POLICY}\n\n{year}년 매출은 전년 대비 증가하였으며 주요 제품의 판매량이 늘었습니다. ({year})"
+
+
+def test_delta_chain_references_original_every_report():
+    dd = ParagraphDeduper(scope="delta")
+    outs = [dd.process(_report(2020 + i), f"R{i}", group="사업보고서") for i in range(5)]
+
+    assert COMPANY in outs[0] and POLICY in outs[0]
+    for out in outs[1:]:
+        # 직전 보고서가 참조로 바꿨던 문단도 다시 원문으로 나오지 않고, 처음 원문을 가진 보고서를 가리킨다
+        assert COMPANY not in out and POLICY not in out
+        assert "[중복 문단 2개 생략 → R0 문단 1~2 참조]" in out
+    assert dd.stats()["removed"] == 8
+
+
+def test_delta_is_per_group_and_bundle_scope_keeps_first():
+    dd = ParagraphDeduper(scope="delta")
+    dd.process(_report(2020), "A", group="사업보고서")
+    assert COMPANY in dd.process(_report(2021), "B", group="분기보고서")
+
+    bundle = ParagraphDeduper(scope="bundle")
+    bundle.process(_report(2020), "A")
+    out = bundle.process(_report(2021), "B", group="분기보고서")
+    assert COMPANY not in out and "A 문단 1~2" in out
+
+
+def _expand(files, label):
+    """파일의 참조 줄을 가리키는 문단들로 풀어 본문 문단 목록으로 (참조가 가리키는 곳이 맞는지 확인용)."""
+    import re
+
+    header, _, body = files[label]
+    paragraphs = re.split(r"\n\s*\n", header + body)
+    out = []
+    for para in paragraphs[len(re.split(r"\n\s*\n", header + "\0")) - 1:]:
+        if not para.startswith("[중복 문단"):
+            out.append(para)
+            continue
+        for src, a, b in re.findall(r"(\S+) 문단 (\d+)(?:~(\d+))?", para.split("→", 1)[1]):
+            src_paras = re.split(r"\n\s*\n", files[src][0] + files[src][2])
+            for no in range(int(a), int(b or a) + 1):
+                assert not src_paras[no - 1].startswith("[중복 문단")
+                out.append(src_paras[no - 1])
+    return out
+
+
+def _check_references(scope):
+    dd = ParagraphDeduper(scope=scope)
+    files = {}
+    for i in range(5):
+        label = f"R{i}"
+        header = f"### 테스트 {label} ###\n접수일: 2024\n분류: 사업보고서\n\n"
+        # 앞 보고서와 겹치는 문단 사이에 새 문단과 짧은 문단을 섞어 번호가 밀리게 한다
+        text = f"{label} 새 문단: 올해 달라진 내용을 설명하는 충분히 긴 문단입니다. 숫자 {i}\n\n장 제목\n\n{_report(2020 + i)}"
+        files[label] = (header, text, dd.process(text, label, group="사업보고서", header=header))
+        assert _expand(files, label) == text.split("\n\n")
+
+
+def test_references_resolve_against_written_files():
+    _check_references("delta")
+    _check_references("bundle")
@@ -0,0 +1,12 @@
+from core import extract
+from core.reports import ReportLoader
+
+
+def test_cache_key_follows_engine_that_built_payload(monkeypatch):
+    assert extract.extractor_version("ai") == extract.extractor_version("ai", structured=True)
+
+    monkeypatch.setattr(extract, "DEFAULT_ENGINE", "bs4")
+    plain = ReportLoader(None, None, structured=False).version
+    structured = ReportLoader(None, None, structured=True).version
+    assert plain.endswith("-bs4") and plain != structured
+    assert structured == extract.extractor_version("ai", engine="stream")
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from core.indicators import INDICATOR_COLUMNS, IndicatorState, build_panel, calculate_indicators, compute_panel
+from core.price_store import OVERLAP_BARS
+
+
+def _bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    index = pd.bdate_range("2022-01-03", periods=n).strftime("%Y-%m-%d")
+    return pd.DataFrame({"Open": close * rng.uniform(0.98, 1.02, n), "High": close * 1.03, "Low": close * 0.97,
+                         "Close": close, "Volume": rng.integers(1_000, 100_000, n).astype(float)}, index=index)
+
+
+def test_incremental_state_matches_batch_engine():
+    df = _bars(700)
+    state = IndicatorState.from_frame(df.iloc[:600])
+    # 겹치는 과거 봉은 건너뛰고, 장중 수정(같은 날 두 번) 뒤 새 봉들을 덧붙인다
+    intraday = df.iloc[595:601].copy()
+    intraday.iloc[-1, intraday.columns.get_loc("Close")] *= 1.05
+    state.update(intraday)
+    rows = state.update(df.iloc[600:])
+
+    expected = calculate_indicators(df).iloc[600:]
+    assert list(rows.index) == list(expected.index)
+    np.testing.assert_allclose(rows[INDICATOR_COLUMNS].to_numpy(), expected[INDICATOR_COLUMNS].to_numpy(),
+                               rtol=1e-9, equal_nan=True)
+
+
+def test_catch_up_after_gap_longer_than_overlap():
+    df = _bars(700)
+    state = IndicatorState.from_frame(df.iloc[:600])
+    # 여러 날 만에 다시 열면 저장소 끝에 OVERLAP_BARS보다 많은 봉이 붙어 있다
+    rows = state.catch_up(df.iloc[:600 + OVERLAP_BARS * 4])
+
+    expected = calculate_indicators(df).iloc[600:600 + OVERLAP_BARS * 4]
+    assert list(rows.index) == list(expected.index)
+    np.testing.assert_allclose(rows[INDICATOR_COLUMNS].to_numpy(), expected[INDICATOR_COLUMNS].to_numpy(),
+                               rtol=1e-9, equal_nan=True)
+
+
+def test_empty_input_returns_empty_indicators():
+    empty = _bars(0)
+    out = calculate_indicators(empty)
+    assert out.empty and set(INDICATOR_COLUMNS) <= set(out.columns)
+    values = compute_panel(build_panel({"A": empty, "B": empty}))
+    assert all(v.shape == (2, 0) for v in values.values())
@@ -0,0 +1,34 @@
+import zipfile
+
+from core.jobs import JobManager, JobStore, make_spec
+
+
+def _spec(n=2):
+    items = [{"rcept_no": f"2024031400000{i}", "file_name": f"보고서{i}.txt", "header": f"### 보고서{i} ###\n",
+              "meta": {"report_nm": f"보고서{i}"}} for i in range(n)]
+    return make_spec(items, title="테스트", zip_name="test.zip")
+
+
+def _manager(tmp_path):
+    return JobManager(store=JobStore(str(tmp_path / "jobs.sqlite3")), root=str(tmp_path / "jobs"))
+
+
+def test_fetch_workers_do_not_create_new_job(tmp_path):
+    manager = _manager(tmp_path)
+    job_id = manager.submit(_spec(), "key-a", fetch_workers=2)
+    manager.active[job_id].result(timeout=60)
+    assert manager.progress(job_id, "key-a")["status"] == "done"
+    assert manager.submit(_spec(), "key-a", fetch_workers=8) == job_id
+    with zipfile.ZipFile(manager.progress(job_id, "key-a")["bundle_path"]) as z:
+        assert z.namelist() == ["보고서0.txt", "보고서1.txt"]
+
+
+def test_jobs_are_scoped_to_api_key(tmp_path):
+    manager = _manager(tmp_path)
+    job_id = manager.submit(_spec(1), "key-a")
+    manager.active[job_id].result(timeout=60)
+    assert manager.progress(job_id, "key-b") is None
+    manager.cancel(job_id, "key-b")
+    manager.resume(job_id, "key-b", retry_failed=True)
+    assert manager.progress(job_id, "key-a")["status"] == "done"
+    assert manager.submit(_spec(1), "key-b") != job_id
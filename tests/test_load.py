@@ -0,0 +1,10 @@
+from benchmarks import load
+
+
+def test_load_harness_hits_its_own_stand_in_server(tmp_path):
+    # core는 이미 불러와져 있고 기본 주소는 conftest의 서버다 → 하네스가 띄운 서버로 가야만 통계가 잡힌다
+    report = load.run(users=2, rounds=1, years=1, workers=2, out=str(tmp_path / "load.json"),
+                      server_options={"latency_ms": 0, "jitter_ms": 0, "doc_mb": 0.02})
+    assert report["errors"] == {} and report["reports"] > 0
+    assert report["server_stats"]["list.json"]["ok"] == 2
+    assert report["server_stats"]["document.xml"]["ok"] == report["reports"]
@@ -0,0 +1,65 @@
+import functools
+
+import pytest
+
+from core.metrics import Metrics, get_metrics, track_cache
+
+
+def _memo(fn):
+    """st.cache_data 대역 (인자별로 한 번만 본문 실행, .clear() 지원)."""
+    store = {}
+
+    @functools.wraps(fn)
+    def wrapper(*args):
+        if args not in store:
+            store[args] = fn(*args)
+        return store[args]
+
+    wrapper.clear = store.clear
+    return wrapper
+
+
+def _cache_counts(name):
+    return {c["cache"]: (c["hits"], c["misses"]) for c in get_metrics().snapshot()["caches"]}[name]
+
+
+def test_track_cache_counts_hits_and_misses():
+    @track_cache("test_square", _memo)
+    def square(x):
+        return x * x
+
+    assert square(3) == 9 and square(3) == 9
+    assert _cache_counts("test_square") == (1, 1)
+    square.clear()
+    square(3)
+    assert _cache_counts("test_square") == (1, 2)
+
+
+def test_track_cache_nested_calls_keep_their_own_flag():
+    @track_cache("test_fib", _memo)
+    def fib(n):
+        return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+    assert fib(5) == 5
+    # 본문은 0~5에 한 번씩, fib(3)/fib(2)/fib(1)은 두 번째 호출이 적중
+    assert _cache_counts("test_fib") == (3, 6)
+
+
+def test_stage_counters_and_prometheus():
+    m = Metrics(export="")
+    with m.stage("download", key="2024") as s:
+        s.bytes = 100
+    with pytest.raises(ValueError), m.stage("download"):
+        raise ValueError
+    m.cache_event("doc_text", True)
+    m.cache_event("doc_text", False)
+    m.merge([{"stage": "extract", "seconds": 0.2, "bytes": 5, "outcome": "ok", "key": "2024"}])
+
+    stages = {st["stage"]: st for st in m.snapshot()["stages"]}
+    assert stages["download"]["count"] == 2 and stages["download"]["errors"] == 1
+    assert stages["download"]["bytes"] == 100 and stages["download"]["outcomes"] == {"ok": 1, "error": 1}
+    assert stages["extract"]["count"] == 1
+    prom = m.prometheus()
+    assert 'dart_stage_seconds_bucket{stage="extract",le="0.25"} 1' in prom
+    assert 'dart_cache_requests_total{cache="doc_text",result="hit"} 1' in prom
+    assert 'dart_stage_total{stage="download",outcome="error"} 1' in prom
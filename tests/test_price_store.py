@@ -0,0 +1,131 @@
+import datetime
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.price_store import PriceStore
+
+START = datetime.datetime(2024, 1, 1)
+
+
+class FakeMarket:
+    """downloader/batch_downloader 대역 — 받은 구간과 횟수를 남긴다."""
+
+    def __init__(self, bars):
+        self.df = self._frame(np.arange(bars, dtype=float) + 100)
+        self.calls = []
+
+    @staticmethod
+    def _frame(close, start="2024-01-02"):
+        index = pd.bdate_range(start, periods=len(close)).strftime("%Y-%m-%d")
+        return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                             "Volume": np.full(len(close), 1000.0)}, index=index)
+
+    def add_bar(self, close):
+        nxt = (pd.Timestamp(self.df.index[-1]) + pd.offsets.BDay()).strftime("%Y-%m-%d")
+        self.df = pd.concat([self.df, self._frame(np.array([close]), nxt)])
+
+    def download(self, code, start_dt, sources):
+        self.calls.append(start_dt.strftime("%Y-%m-%d"))
+        return self.df[self.df.index >= start_dt.strftime("%Y-%m-%d")].copy(), "Yahoo Finance"
+
+    def download_many(self, codes, start_dt, sources):
+        return {code: self.download(code, start_dt, sources) for code in codes}
+
+
+def _store(tmp_path, market):
+    return PriceStore(str(tmp_path), downloader=market.download, batch_downloader=market.download_many)
+
+
+def test_append_revise_and_adjust(tmp_path):
+    market = FakeMarket(30)
+    store = _store(tmp_path, market)
+    df, source = store.history("005930", START, max_age=0)
+    pd.testing.assert_frame_equal(df, market.df)
+    generation = store.generation("005930")
+
+    # 장중 마지막 봉 수정 + 새 봉: 겹치는 몇 봉만 다시 받고 같은 세대 파일에 덧붙인다
+    market.df.iloc[-1, market.df.columns.get_loc("Close")] = 555.0
+    market.add_bar(556.0)
+    df, _ = store.history("005930", START, max_age=0)
+    pd.testing.assert_frame_equal(df, market.df)
+    assert market.calls[-1] > market.df.index[0] and store.generation("005930") == generation
+
+    # 과거 종가가 바뀌면(수정주가) 새 세대로 전체를 다시 쓰고 이전 세대 파일은 지운다
+    market.df["Close"] *= 0.5
+    df, _ = store.history("005930", START, max_age=0)
+    pd.testing.assert_frame_equal(df, market.df)
+    assert store.generation("005930") != generation
+    files = [f for f in os.listdir(tmp_path / "005930") if f.endswith(".bin")]
+    assert len(files) == 6 and all(str(store.generation("005930")) in f for f in files)
+
+    assert store.history("005930", START, max_age=None)[0].equals(df)
+    store.invalidate("005930")
+    assert store.history("005930", START, max_age=None) == (None, "")
+
+
+def test_history_many_fetches_only_stale_tail(tmp_path):
+    market = FakeMarket(40)
+    store = _store(tmp_path, market)
+    store.history_many(["000660", "005930"], START, max_age=0)
+    market.add_bar(200.0)
+    market.calls.clear()
+    out = store.history_many(["000660", "005930"], START, max_age=0)
+    assert len(market.calls) == 2 and all(day > "2024-02-01" for day in market.calls)
+    for df, _ in out.values():
+        pd.testing.assert_frame_equal(df, market.df)
+
+
+def test_reads_stay_consistent_during_rewrites(tmp_path):
+    market = FakeMarket(300)
+    store = _store(tmp_path, market)
+    store.history("005930", START, max_age=0)
+    stop, errors = threading.Event(), []
+
+    def reader():
+        while not stop.is_set():
+            try:
+                df, _ = store.history("005930", START, max_age=None)
+                # 한 번 읽은 결과는 한 세대에서만 나온다: 모든 열이 같은 배율
+                scale = df["Close"].iloc[0] / 100
+                assert np.allclose(df["Close"], (np.arange(len(df)) + 100) * scale)
+                assert np.allclose(df["Open"], df["Close"]) and len(df) == 300
+            except Exception as e:  # noqa: BLE001 — 스레드 밖에서 확인
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(30):
+        market.df[["Open", "High", "Low", "Close"]] *= 1.5 if i % 2 else 1 / 1.5
+        store.sync("005930", START)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_download_prefers_yahoo_and_falls_back_on_error(monkeypatch):
+    from core import price_store
+
+    yahoo_df, naver_df = FakeMarket(5).df, FakeMarket(6).df
+    naver_calls = []
+
+    def naver(code, start_dt):
+        naver_calls.append(code)
+        return naver_df
+
+    monkeypatch.setattr(price_store, "_yahoo_many", lambda codes, start_dt: {codes[0]: yahoo_df})
+    monkeypatch.setattr(price_store, "_naver", naver)
+    assert price_store.download("005930", START)[1] == "Yahoo Finance"
+    assert naver_calls == []  # Yahoo가 주면 Naver는 요청하지 않는다
+
+    def broken_yahoo(codes, start_dt):
+        raise RuntimeError("yfinance 오류")
+
+    monkeypatch.setattr(price_store, "_yahoo_many", broken_yahoo)
+    df, source = price_store.download("005930", START)
+    assert source == "Naver Finance" and df is naver_df and naver_calls == ["005930"]
@@ -0,0 +1,23 @@
+from core.tables import Table, parse_number
+
+
+def test_parse_number_keeps_large_integers_exact():
+    assert parse_number("9,007,199,254,740,993") == 9007199254740993
+    assert parse_number("(1,234)") == -1234 and isinstance(parse_number("△12"), int)
+    assert parse_number("1.5%") == 1.5 and parse_number("-") is None
+
+
+def test_columns_int64_float_and_overflow_to_string():
+    table = Table([["금액", "비율", "큰값"]], [
+        ["9,007,199,254,740,993", "1.5", "99,999,999,999,999,999,999"],
+        ["(1,234)", "2", "1"],
+        ["-", "", ""],
+    ])
+    cols = {name: (kind, values) for name, kind, values in table.columns()}
+    assert cols["금액"] == ("int64", [9007199254740993, -1234, None])
+    assert cols["비율"] == ("float64", [1.5, 2.0, None])
+    assert cols["큰값"][0] == "string"
+
+    df = table.to_frame()
+    assert df["금액"].iloc[0] == 9007199254740993
+    assert str(df["큰값"].dtype) == "string"